@@ -0,0 +1,354 @@
+"""
+Asyncio client for the BountyBoard contract in bounty_contract.py
+Blocking algod calls run on a thread pool over one pooled keep-alive
+HTTP session, so a single event loop can keep hundreds of task
+operations in flight
+"""
+
+import asyncio
+import functools
+import http.client
+import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from urllib import parse
+
+from algosdk import account, constants, error
+from algosdk.v2client import algod
+
+import bounty_client
+from local_algod import make_algod_client
+from params_cache import params_provider
+from submission_queue import is_transient
+
+
+DEFAULT_POOL_SIZE = 32
+ROUND_SECONDS = 3.0  # waited in place of a round when algod status is unavailable
+
+# Errors raised when a kept-alive connection was closed by the server
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class PooledAlgodClient(algod.AlgodClient):
+    """AlgodClient that reuses keep-alive HTTP connections
+
+    The stock client opens a new connection (and TLS handshake) for every
+    request. This one keeps up to `pool_size` idle connections and is
+    safe to share between threads.
+    """
+
+    def __init__(self, algod_token, algod_address, headers=None, pool_size=DEFAULT_POOL_SIZE):
+        super().__init__(algod_token, algod_address, headers)
+        url = parse.urlsplit(algod_address)
+        self._https = url.scheme == "https"
+        self._netloc = url.netloc
+        self._base_path = url.path.rstrip("/")
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+
+    def _new_connection(self, timeout):
+        if self._https:
+            return http.client.HTTPSConnection(self._netloc, timeout=timeout)
+        return http.client.HTTPConnection(self._netloc, timeout=timeout)
+
+    def _release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _send(self, method, path, data, headers, timeout):
+        """Issue one request, retrying once if a reused connection went stale"""
+        try:
+            conn, reused = self._idle.get_nowait(), True
+            conn.timeout = timeout
+        except queue.Empty:
+            conn, reused = self._new_connection(timeout), False
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except _STALE_CONNECTION_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+            return self._send(method, path, data, headers, timeout)
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        return response.status, body
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None,
+                      response_format="json", timeout=30):
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        if requrl not in constants.unversioned_paths:
+            requrl = algod.api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        status, body = self._send(method, self._base_path + requrl, data, header, timeout)
+        if status >= 400:
+            try:
+                payload = json.loads(body)
+                message = payload["message"]
+            except (ValueError, KeyError, TypeError):
+                payload = {}
+                message = body.decode("utf-8", "replace")
+            raise error.AlgodHTTPError(message, status, payload.get("data"))
+        if response_format != "json":
+            return body
+        if not body:
+            return {}
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise error.AlgodResponseError("Failed to parse JSON response from algod") from e
+
+
+class BountyBoardClient:
+    """Asyncio client for the six BountyBoard methods and task box reads
+
+    Every method sends its transactions as soon as they are built and
+    returns once they are confirmed, so callers can gather hundreds of
+    operations at once. A single watcher polls all in-flight
+    transactions together, once per round, instead of one wait loop per
+    transaction.
+
+        async with BountyBoardClient.connect(private_key, app_id) as board:
+            task_ids = await asyncio.gather(*(board.create_task(...) for ...))
+    """
+
+    def __init__(self, algod_client, private_key, app_id, max_workers=DEFAULT_POOL_SIZE, wait_rounds=4):
+        self.algod = algod_client
+        self.private_key = private_key
+        self.sender = account.address_from_private_key(private_key)
+        self.app_id = app_id
+        self.wait_rounds = wait_rounds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="bountyboard")
+        self._params = params_provider(algod_client)
+        self._task_ids = bounty_client.TaskIds()
+        self._create_lock = asyncio.Lock()
+        self._pending = {}
+        self._watcher = None
+
+    @classmethod
+    def connect(cls, private_key, app_id, network=None, pool_size=DEFAULT_POOL_SIZE):
+        """Client over a pooled HTTP session to a named network
+
+        `network` is resolved like make_algod_client(); the in-memory
+        "local" stand-in is used as is.
+        """
+        algod_client = make_algod_client(network)
+        if isinstance(algod_client, algod.AlgodClient):
+            algod_client = PooledAlgodClient(algod_client.algod_token, algod_client.algod_address,
+                                             algod_client.headers, pool_size)
+        return cls(algod_client, private_key, app_id, max_workers=pool_size)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._watcher is not None:
+            await asyncio.gather(self._watcher, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+        if isinstance(self.algod, PooledAlgodClient):
+            self.algod.close()
+
+    async def _run(self, fn, *args, **kwargs):
+        """Run a blocking algod call on the client's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def suggested_params(self):
+        return await self._params.aget()
+
+    # ----- confirmations -----
+
+    async def wait_for_confirmation(self, txid):
+        """Pending transaction info once `txid` is confirmed
+
+        Every caller waiting on the same txid shares one future; shielding
+        it means cancelling one waiter leaves the others waiting.
+        """
+        entry = self._pending.get(txid)
+        if entry is None:
+            entry = self._pending[txid] = [asyncio.get_running_loop().create_future(), None]
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.ensure_future(self._watch())
+        return await asyncio.shield(entry[0])
+
+    async def _watch(self):
+        """Poll every pending transaction each round until none are left
+
+        Transient algod errors (see submission_queue.is_transient) count
+        as "not confirmed yet" and are retried the next round; any other
+        error fails every waiter instead of leaving them to hang.
+        """
+        try:
+            await self._poll()
+        except Exception as e:
+            pending, self._pending = self._pending, {}
+            for future, _ in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _poll(self):
+        current_round = None
+        for attempt in range(self.wait_rounds + 1):
+            try:
+                current_round = (await self._run(self.algod.status))["last-round"]
+                break
+            except Exception as e:
+                if not is_transient(e) or attempt == self.wait_rounds:
+                    raise
+                await asyncio.sleep(ROUND_SECONDS)
+        self._params.observe_round(current_round)
+        while self._pending:
+            txids = list(self._pending)
+            infos = await asyncio.gather(
+                *(self._run(self.algod.pending_transaction_info, txid) for txid in txids),
+                return_exceptions=True,
+            )
+            for txid, info in zip(txids, infos):
+                entry = self._pending[txid]
+                future, last_round = entry
+                if last_round is None:
+                    last_round = entry[1] = current_round + self.wait_rounds
+                if isinstance(info, Exception) and not is_transient(info):
+                    outcome = info
+                elif isinstance(info, Exception):
+                    outcome = None
+                elif info.get("confirmed-round", 0) > 0:
+                    outcome = info
+                elif info.get("pool-error"):
+                    outcome = error.TransactionRejectedError(info["pool-error"])
+                else:
+                    outcome = None
+                if outcome is None:
+                    if current_round < last_round:
+                        continue
+                    outcome = error.ConfirmationTimeoutError(
+                        f"Wait for transaction id {txid} timed out")
+                del self._pending[txid]
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+            if self._pending:
+                current_round = await self._next_round(current_round)
+                self._params.observe_round(current_round)
+
+    async def _next_round(self, current_round):
+        """Round after `current_round`; a transient status error counts as one round passing"""
+        try:
+            status = await self._run(self.algod.status_after_block, current_round)
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            await asyncio.sleep(ROUND_SECONDS)
+            return current_round + 1
+        return max(current_round + 1, status["last-round"])
+
+    # ----- submissions -----
+
+    async def _submit(self, method_name, args, task_id, payment=0):
+        """Build, sign and send one method call; returns the app call's txid
+
+        If cached params have expired under us the call is rebuilt once
+        with fresh params.
+        """
+        for attempt in range(2):
+            params = await self.suggested_params()
+            txns = bounty_client.build_method_call(params, self.sender, self.app_id,
+                                                   method_name, args, task_id, payment)
+            signed = [txn.sign(self.private_key) for txn in txns]
+            try:
+                await self._run(self.algod.send_transactions, signed)
+            except error.AlgodHTTPError as e:
+                if attempt or "txn dead" not in str(e):
+                    raise
+                self._params.invalidate()
+                continue
+            return signed[-1].get_txid()
+
+    async def call(self, method_name, args, task_id, payment=0):
+        """Send one method call and return its confirmed tx info"""
+        txid = await self._submit(method_name, args, task_id, payment)
+        return await self.wait_for_confirmation(txid)
+
+    async def create_task(self, title, description, deadline, amount):
+        """Create a task escrowing `amount` microAlgos; returns the new task id
+
+        Task ids are reserved locally so concurrent creates reference the
+        right boxes; sends are ordered, confirmations are awaited in parallel.
+        """
+        async with self._create_lock:
+            counter = None
+            if self._task_ids.needs_counter():
+                counter = await self._run(bounty_client.read_task_counter, self.algod, self.app_id)
+            reserved = self._task_ids.reserve(counter=counter)
+            try:
+                txid = await self._submit("create_task", [title, description, deadline],
+                                          reserved, payment=amount)
+            except Exception as e:
+                rejected = isinstance(e, error.AlgodHTTPError)
+                self._task_ids.release(reserved, landed=False if rejected else None)
+                raise
+        try:
+            task_id = bounty_client.task_id_from_logs(await self.wait_for_confirmation(txid))
+        except Exception:
+            self._task_ids.release(reserved, landed=None)
+            raise
+        self._task_ids.release(reserved, landed=True if task_id == reserved else None)
+        return task_id
+
+    async def claim_task(self, task_id):
+        return await self.call("claim_task", [task_id], task_id)
+
+    async def submit_work(self, task_id, proof_hash):
+        return await self.call("submit_work", [task_id, proof_hash], task_id)
+
+    async def approve_task(self, task_id):
+        return await self.call("approve_task", [task_id], task_id)
+
+    async def reject_task(self, task_id):
+        return await self.call("reject_task", [task_id], task_id)
+
+    async def refund_task(self, task_id):
+        return await self.call("refund_task", [task_id], task_id)
+
+    # ----- reads -----
+
+    async def task_counter(self):
+        return await self._run(bounty_client.read_task_counter, self.algod, self.app_id)
+
+    async def read_task(self, task_id):
+        """Decoded TaskRecord for one task"""
+        return await self._run(bounty_client.read_task, self.algod, self.app_id, task_id)
+
+    async def read_tasks(self, task_ids):
+        """Decoded TaskRecords for several tasks, fetched concurrently"""
+        return await asyncio.gather(*(self.read_task(task_id) for task_id in task_ids))
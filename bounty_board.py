@@ -4,7 +4,6 @@ A decentralized escrow marketplace for micro-tasks
 """
 
 from algosdk import account, mnemonic, transaction
-from algosdk.v2client import algod
 from algosdk.atomic_transaction_composer import (
     AtomicTransactionComposer,
     TransactionWithSigner,
@@ -13,7 +12,10 @@ from algosdk.atomic_transaction_composer import (
 from algosdk.abi import Contract, Method
 from algosdk.encoding import decode_address, encode_address
 import json
-import base64
+
+from compile_cache import compile_bytes
+from params_cache import suggested_params
+from local_algod import make_algod_client
 
 
 # Task Status Enum
@@ -34,18 +36,30 @@ CONTRACT_ABI = {
         {
             "name": "create_task",
             "args": [
-                {"type": "string", "name": "title"},
-                {"type": "string", "name": "description"},
-                {"type": "uint64", "name": "deadline"},
-                {"type": "pay", "name": "payment"}
+                {"type": "string", "name": "title", "desc": "Task title"},
+                {"type": "string", "name": "description", "desc": "Task description"},
+                {"type": "uint64", "name": "deadline", "desc": "Unix timestamp deadline"},
+                {"type": "pay", "name": "payment", "desc": "Escrow payment to the application"}
             ],
-            "returns": {"type": "uint64"},
+            "returns": {"type": "uint64", "desc": "Task ID"},
             "desc": "Create a new task with escrow payment"
         },
+        {
+            "name": "create_tasks_batch",
+            "args": [
+                {"type": "string[]", "name": "titles", "desc": "Task titles"},
+                {"type": "string[]", "name": "descriptions", "desc": "Task descriptions"},
+                {"type": "uint64[]", "name": "deadlines", "desc": "Unix timestamp deadlines"},
+                {"type": "uint64[]", "name": "amounts", "desc": "Escrow per task in microAlgos"},
+                {"type": "pay", "name": "payment", "desc": "Escrow payment to the application"}
+            ],
+            "returns": {"type": "void"},
+            "desc": "Create several tasks escrowed by one payment; task ids are logged"
+        },
         {
             "name": "claim_task",
             "args": [
-                {"type": "uint64", "name": "task_id"}
+                {"type": "uint64", "name": "task_id", "desc": "Task ID"}
             ],
             "returns": {"type": "void"},
             "desc": "Claim an open task"
@@ -53,8 +67,8 @@ CONTRACT_ABI = {
         {
             "name": "submit_work",
             "args": [
-                {"type": "uint64", "name": "task_id"},
-                {"type": "string", "name": "proof_hash"}
+                {"type": "uint64", "name": "task_id", "desc": "Task ID"},
+                {"type": "string", "name": "proof_hash", "desc": "IPFS hash or URL of work proof"}
             ],
             "returns": {"type": "void"},
             "desc": "Submit work proof for a claimed task"
@@ -62,7 +76,7 @@ CONTRACT_ABI = {
         {
             "name": "approve_task",
             "args": [
-                {"type": "uint64", "name": "task_id"}
+                {"type": "uint64", "name": "task_id", "desc": "Task ID"}
             ],
             "returns": {"type": "void"},
             "desc": "Approve completed task and release payment"
@@ -70,7 +84,7 @@ CONTRACT_ABI = {
         {
             "name": "reject_task",
             "args": [
-                {"type": "uint64", "name": "task_id"}
+                {"type": "uint64", "name": "task_id", "desc": "Task ID"}
             ],
             "returns": {"type": "void"},
             "desc": "Reject submitted work"
@@ -78,328 +92,467 @@ CONTRACT_ABI = {
         {
             "name": "refund_task",
             "args": [
-                {"type": "uint64", "name": "task_id"}
+                {"type": "uint64", "name": "task_id", "desc": "Task ID"}
             ],
             "returns": {"type": "void"},
             "desc": "Refund task if deadline passed or by client"
+        },
+        {
+            "name": "get_tasks",
+            "args": [
+                {"type": "uint64", "name": "start", "desc": "First task ID"},
+                {"type": "uint64", "name": "count", "desc": "Number of tasks to read"}
+            ],
+            "returns": {"type": "byte[]", "desc": "Task records, each behind a 2-byte length, for consecutive IDs from start"},
+            "readonly": True,
+            "desc": "Read a range of task records in one call (meant for simulate); stops at the last task or when the return value is full"
+        },
+        {
+            "name": "increase_budget",
+            "args": [],
+            "returns": {"type": "void"},
+            "desc": "No-op call that adds opcode budget to its group"
         }
     ],
     "networks": {}
 }
 
 
-# TEAL Smart Contract Code
-APPROVAL_PROGRAM = """#pragma version 10
+def method_signature(method):
+    """ARC-4 signature string for a method entry of CONTRACT_ABI"""
+    arg_types = ",".join(arg["type"] for arg in method["args"])
+    return f"{method['name']}({arg_types}){method['returns']['type']}"
 
-// BountyBoard Contract - Approval Program
 
-txn ApplicationID
-int 0
-==
-bnz create_app
+METHOD_SIGNATURES = {m["name"]: method_signature(m) for m in CONTRACT_ABI["methods"]}
 
-// Router for method calls
-txna ApplicationArgs 0
-method "create_task(string,string,uint64,pay)uint64"
-==
-bnz create_task_method
+# Router order: per-task calls that run most often come first, so they
+# match after the fewest comparisons
+DISPATCH_ORDER = (
+    "claim_task",
+    "submit_work",
+    "approve_task",
+    "create_task",
+    "reject_task",
+    "refund_task",
+    "create_tasks_batch",
+    "get_tasks",
+    "increase_budget",
+)
 
-txna ApplicationArgs 0
-method "claim_task(uint64)void"
-==
-bnz claim_task_method
+assert sorted(DISPATCH_ORDER) == sorted(METHOD_SIGNATURES), "DISPATCH_ORDER out of sync with CONTRACT_ABI"
 
-txna ApplicationArgs 0
-method "submit_work(uint64,string)void"
-==
-bnz submit_work_method
 
-txna ApplicationArgs 0
-method "approve_task(uint64)void"
-==
-bnz approve_task_method
+def method_selector(name):
+    """ARC-4 4-byte selector of a CONTRACT_ABI method"""
+    return Method.from_signature(METHOD_SIGNATURES[name]).get_selector()
+
+
+def selector_router(method_names, labels):
+    """TEAL dispatching on the ARC-4 selector in ApplicationArgs 0
 
-txna ApplicationArgs 0
-method "reject_task(uint64)void"
+    One pushbytess loads every selector and a single match branches to
+    the method's label, so routing costs three opcodes for any method.
+    """
+    selectors = " ".join("0x" + method_selector(name).hex() for name in method_names)
+    return (
+        "// Router for method calls (generated from CONTRACT_ABI)\n"
+        f"// {' '.join(method_names)}\n"
+        f"pushbytess {selectors}\n"
+        "txna ApplicationArgs 0\n"
+        f"match {' '.join(labels)}\n"
+        "err\n"
+    )
+
+
+# TEAL Smart Contract Code
+# Hand-written counterpart of bounty_contract.approval_program() for the
+# task lifecycle methods: same selectors, logs and packed task boxes
+# (see bounty_contract.TaskBox), so the same clients can call either.
+# Deployments use the PyTeal build (approval_source()), which also
+# implements create_tasks_batch, get_tasks and increase_budget.
+_APPROVAL_HEADER = """#pragma version 10
+
+// BountyBoard Contract - Approval Program
+
+txn ApplicationID
+int 0
 ==
-bnz reject_task_method
+bnz create_app
 
-txna ApplicationArgs 0
-method "refund_task(uint64)void"
+// Only NoOp method calls; no update, delete, opt-in or close-out
+txn OnCompletion
+int NoOp
 ==
-bnz refund_task_method
+assert
 
-err
+"""
 
-create_app:
+_APPROVAL_METHODS = """create_app:
+    byte "task_counter"
+    int 0
+    app_global_put
     int 1
     return
 
 create_task_method:
-    // Verify grouped payment transaction
-    global GroupSize
+    // Escrow payment: the transaction right before this call
+    txn GroupIndex
+    int 1
+    -
+    dup
+    gtxns TypeEnum
+    int pay
+    ==
+    assert
+    dup
+    gtxns Receiver
+    global CurrentApplicationAddress
+    ==
+    assert
+    gtxns Amount
+    dup
+    assert
+    store 1  // amount
+
+    // title and description are ARC-4 strings, deadline a uint64
+    txna ApplicationArgs 1
+    dup
+    len
+    swap
+    int 0
+    extract_uint16
     int 2
+    +
     ==
     assert
-    
-    gtxn 0 TypeEnum
-    int pay
+    txna ApplicationArgs 2
+    dup
+    len
+    swap
+    int 0
+    extract_uint16
+    int 2
+    +
     ==
     assert
-    
-    gtxn 0 Receiver
-    global CurrentApplicationAddress
+    txna ApplicationArgs 3
+    len
+    int 8
     ==
     assert
-    
-    // Extract arguments
-    txna ApplicationArgs 1  // title
-    txna ApplicationArgs 2  // description
-    txna ApplicationArgs 3  // deadline
-    btoi
-    store 0  // deadline in scratch
-    
-    gtxn 0 Amount
-    store 1  // amount in scratch
-    
-    // Generate task ID (using global state counter)
+
+    // Take the next task id from the counter
     byte "task_counter"
+    dup
     app_global_get
-    store 2  // task_id
-    
-    // Increment counter
-    byte "task_counter"
-    load 2
+    dup
+    itob
+    store 0  // task id, 8 bytes
     int 1
     +
     app_global_put
-    
-    // Create task box
-    load 2
-    itob
-    dup
-    box_create
-    int 300  // box size
-    ==
-    assert
-    
-    // Store task data in box
-    load 2
-    itob
-    byte "client:"
-    txn Sender
-    concat
-    byte ",freelancer:"
-    concat
-    byte "AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA"
+
+    // Write the whole record with one box_put; the id is fresh
+    byte "task_"
+    load 0
     concat
-    byte ",amount:"
+    txn Sender
+    global ZeroAddress
     concat
     load 1
     itob
     concat
-    byte ",deadline:"
+    txna ApplicationArgs 3
     concat
-    load 0
-    itob
+    byte 0x00  // OPEN
     concat
-    byte ",status:"
-    concat
-    int 0  // OPEN
-    itob
-    concat
-    byte ",title:"
+    int 65  // proof length and proof slot
+    bzero
     concat
     txna ApplicationArgs 1
     concat
-    byte ",description:"
-    concat
     txna ApplicationArgs 2
     concat
     box_put
-    
-    // Return task ID
+
+    byte "task_created:"
+    load 0
+    concat
+    log
     byte 0x151f7c75  // ARC-4 return prefix
-    load 2
-    itob
+    load 0
     concat
     log
-    
     int 1
     return
 
 claim_task_method:
-    // Extract task_id
+    // The uint64 argument is already the 8-byte id of the box name
+    byte "task_"
     txna ApplicationArgs 1
-    btoi
-    store 3
-    
-    // Load task box
+    concat
+    dup
+    store 2  // box name
+    int 0
+    int 81
+    box_extract
+    store 3  // client, freelancer, amount, deadline, status
+
+    // OPEN, and not claimed by its own client
     load 3
-    itob
-    box_get
-    assert  // task must exist
-    store 4  // task data
-    
-    // Verify status is OPEN (0)
-    // Parse status from box data (simplified - in production use proper parsing)
-    load 4
-    extract 0 1
-    btoi
+    int 80
+    getbyte
     int 0
     ==
     assert
-    
-    // Update freelancer and status
     load 3
-    itob
-    byte "claimed_by:"
+    extract 0 32
+    txn Sender
+    !=
+    assert
+
+    load 2
+    int 32
     txn Sender
-    concat
-    byte ",status:"
-    concat
-    int 1  // CLAIMED
-    itob
-    concat
     box_replace
-    
+    load 2
+    int 80
+    byte 0x01  // CLAIMED
+    box_replace
+
+    byte "task_claimed:"
+    txna ApplicationArgs 1
+    concat
+    log
     int 1
     return
 
 submit_work_method:
-    // Extract task_id and proof_hash
-    txna ApplicationArgs 1
-    btoi
-    store 5
-    
+    // Proof is an ARC-4 string that fits the proof slot
     txna ApplicationArgs 2
-    store 6  // proof_hash
-    
-    // Load task box
-    load 5
-    itob
-    box_get
+    dup
+    len
+    dup
+    int 66
+    <=
     assert
-    store 7
-    
-    // Verify caller is freelancer
-    // Verify status is CLAIMED
-    
-    // Update proof_hash and status to SUBMITTED
-    load 5
-    itob
-    byte "proof:"
-    load 6
+    swap
+    int 0
+    extract_uint16
+    int 2
+    +
+    ==
+    assert
+
+    byte "task_"
+    txna ApplicationArgs 1
     concat
-    byte ",status:"
+    dup
+    store 2
+    int 0
+    int 81
+    box_extract
+    store 3
+
+    // Called by the freelancer on a CLAIMED task
+    load 3
+    extract 32 32
+    txn Sender
+    ==
+    assert
+    load 3
+    int 80
+    getbyte
+    int 1
+    ==
+    assert
+
+    // Status, proof length and proof slot are adjacent: one write
+    load 2
+    int 80
+    byte 0x02  // SUBMITTED
+    txna ApplicationArgs 2
+    extract 1 0  // low byte of the ARC-4 length, then the proof
     concat
-    int 2  // SUBMITTED
-    itob
+    int 66
+    txna ApplicationArgs 2
+    len
+    -
+    bzero
     concat
     box_replace
-    
+
+    byte "work_submitted:"
+    txna ApplicationArgs 1
+    concat
+    log
     int 1
     return
 
 approve_task_method:
-    // Extract task_id
+    byte "task_"
     txna ApplicationArgs 1
-    btoi
-    store 8
-    
-    // Load task
-    load 8
-    itob
-    box_get
-    assert
-    store 9
-    
-    // Verify caller is client
-    // Verify status is SUBMITTED
-    
-    // Update status to APPROVED first
-    load 8
-    itob
-    byte "status:"
-    int 3  // APPROVED
-    itob
     concat
+    dup
+    store 2
+    int 0
+    int 81
+    box_extract
+    store 3
+
+    // Called by the client on a SUBMITTED task
+    load 3
+    extract 0 32
+    txn Sender
+    ==
+    assert
+    load 3
+    int 80
+    getbyte
+    int 2
+    ==
+    assert
+
+    // Update status before paying out
+    load 2
+    int 80
+    byte 0x03  // APPROVED
     box_replace
-    
-    // Transfer payment to freelancer
+
+    // Pay the escrow to the freelancer
     itxn_begin
     int pay
     itxn_field TypeEnum
-    
-    // Get freelancer address from box (parse box data)
-    byte "freelancer_address"  // placeholder
+    load 3
+    extract 32 32
     itxn_field Receiver
-    
-    // Get amount from box
-    int 1000000  // placeholder - parse from box
+    load 3
+    int 64
+    extract_uint64
     itxn_field Amount
-    
+    int 0
+    itxn_field Fee
     itxn_submit
-    
+
+    byte "task_approved:"
+    txna ApplicationArgs 1
+    concat
+    log
     int 1
     return
 
 reject_task_method:
-    // Extract task_id
+    byte "task_"
     txna ApplicationArgs 1
-    btoi
-    store 10
-    
-    // Verify caller is client
-    // Verify status is SUBMITTED
-    
-    // Update status back to CLAIMED
-    load 10
-    itob
-    byte "status:"
-    int 1  // CLAIMED
-    itob
+    concat
+    dup
+    store 2
+    int 0
+    int 81
+    box_extract
+    store 3
+
+    // Called by the client on a SUBMITTED task
+    load 3
+    extract 0 32
+    txn Sender
+    ==
+    assert
+    load 3
+    int 80
+    getbyte
+    int 2
+    ==
+    assert
+
+    // Back to CLAIMED for resubmission, with the proof cleared
+    load 2
+    int 80
+    byte 0x01  // CLAIMED
+    int 65
+    bzero
     concat
     box_replace
-    
+
+    byte "task_rejected:"
+    txna ApplicationArgs 1
+    concat
+    log
     int 1
     return
 
 refund_task_method:
-    // Extract task_id
+    byte "task_"
     txna ApplicationArgs 1
-    btoi
-    store 11
-    
-    // Verify caller is client OR deadline passed
-    // Verify status is OPEN or CLAIMED
-    
-    // Update status to REFUNDED
-    load 11
-    itob
-    byte "status:"
-    int 5  // REFUNDED
-    itob
     concat
+    dup
+    store 2
+    int 0
+    int 81
+    box_extract
+    store 3
+
+    // Called by the client, or by anyone once the deadline has passed
+    load 3
+    extract 0 32
+    txn Sender
+    ==
+    global LatestTimestamp
+    load 3
+    int 72
+    extract_uint64
+    >
+    ||
+    assert
+
+    // Only OPEN (0) or CLAIMED (1) tasks
+    load 3
+    int 80
+    getbyte
+    int 1
+    <=
+    assert
+
+    // Update status before refunding
+    load 2
+    int 80
+    byte 0x05  // REFUNDED
     box_replace
-    
-    // Refund to client
+
+    // Refund the escrow to the client
     itxn_begin
     int pay
     itxn_field TypeEnum
-    
-    txn Sender
+    load 3
+    extract 0 32
     itxn_field Receiver
-    
-    int 1000000  // Get from box
+    load 3
+    int 64
+    extract_uint64
     itxn_field Amount
-    
+    int 0
+    itxn_field Fee
     itxn_submit
-    
+
+    byte "task_refunded:"
+    txna ApplicationArgs 1
+    concat
+    log
     int 1
     return
 """
 
+APPROVAL_ROUTES = [name for name in DISPATCH_ORDER if f"\n{name}_method:" in _APPROVAL_METHODS]
+
+APPROVAL_PROGRAM = (
+    _APPROVAL_HEADER
+    + selector_router(APPROVAL_ROUTES, [f"{name}_method" for name in APPROVAL_ROUTES])
+    + "\n"
+    + _APPROVAL_METHODS
+)
+
+# Matches bounty_contract.clear_program()
 CLEAR_PROGRAM = """#pragma version 10
 // Clear program - always allow clearing
 int 1
@@ -407,17 +560,20 @@ return
 """
 
 
-def get_algod_client():
-    """Connect to Algorand TestNet"""
-    algod_address = "https://testnet-api.algonode.cloud"
-    algod_token = ""
-    return algod.AlgodClient(algod_token, algod_address)
+def get_algod_client(network=None):
+    """Connect to Algorand TestNet, or the network named by BOUNTYBOARD_NETWORK"""
+    return make_algod_client(network)
 
 
 def compile_program(client, source_code):
-    """Compile TEAL source code"""
-    compile_response = client.compile(source_code)
-    return base64.b64decode(compile_response['result'])
+    """Compile TEAL source code (cached on disk by source hash)"""
+    return compile_bytes(client, source_code)
+
+
+def approval_source():
+    """Approval program TEAL, built from the PyTeal contract"""
+    from bounty_contract import approval_teal
+    return approval_teal()
 
 
 def create_app(client, creator_private_key):
@@ -425,10 +581,10 @@ def create_app(client, creator_private_key):
     creator_address = account.address_from_private_key(creator_private_key)
     
     # Get suggested parameters
-    params = client.suggested_params()
+    params = suggested_params(client)
     
     # Compile programs
-    approval_program = compile_program(client, APPROVAL_PROGRAM)
+    approval_program = compile_program(client, approval_source())
     clear_program = compile_program(client, CLEAR_PROGRAM)
     
     # Define schema
@@ -471,7 +627,7 @@ def get_application_address(app_id):
 def fund_application(client, funder_private_key, app_address, amount):
     """Fund the application account for box storage and transactions"""
     funder_address = account.address_from_private_key(funder_private_key)
-    params = client.suggested_params()
+    params = suggested_params(client)
     
     txn = transaction.PaymentTxn(
         sender=funder_address,
@@ -487,6 +643,22 @@ def fund_application(client, funder_private_key, app_address, amount):
     print(f"Funded application with {amount} microAlgos")
 
 
+def create_and_fund_app(client, creator_private_key, amount):
+    """Deploy the BountyBoard application and fund it with `amount` microAlgos
+
+    One params fetch and one confirmation wait per step, instead of
+    create_app() followed by fund_application().
+    """
+    from deploy import deploy_and_fund
+    result = deploy_and_fund(client, creator_private_key, amount / 1_000_000,
+                             approval_source(), CLEAR_PROGRAM)
+    if not result.ok:
+        raise RuntimeError(result.error)
+    print(f"Created BountyBoard application with ID: {result.app_id}")
+    print(f"Funded application with {amount} microAlgos")
+    return result.app_id
+
+
 def save_deployment_info(app_id, app_address, abi):
     """Save deployment information for frontend integration"""
     deployment_info = {
@@ -531,17 +703,13 @@ if __name__ == "__main__":
             print("Visit: https://bank.testnet.algorand.network/")
             exit(1)
         
-        # Deploy application
-        print("\nDeploying BountyBoard contract...")
-        app_id = create_app(client, deployer_private_key)
+        # Deploy application and fund it for box storage and inner transactions
+        print("\nDeploying and funding BountyBoard contract...")
+        app_id = create_and_fund_app(client, deployer_private_key, 500_000)
         
         # Get application address
         app_address = get_application_address(app_id)
         
-        # Fund application for box storage and inner transactions
-        print("\nFunding application account...")
-        fund_application(client, deployer_private_key, app_address, 500_000)
-        
         # Save deployment information
         save_deployment_info(app_id, app_address, CONTRACT_ABI)
         
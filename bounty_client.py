@@ -0,0 +1,449 @@
+"""
+Python client helpers for the BountyBoard contract in bounty_contract.py
+Builds, signs and submits the six ARC-4 method calls
+"""
+
+import base64
+import copy
+import os
+from typing import NamedTuple
+
+from algosdk import account, encoding, transaction
+from algosdk.logic import get_application_address
+
+from bounty_board import CONTRACT_ABI, method_selector
+from bounty_contract import GET_TASKS_MAX_BYTES, TaskBox
+from params_cache import params_provider
+
+
+METHODS = {m["name"]: m for m in CONTRACT_ABI["methods"]}
+
+# Methods whose inner payment fee must be pooled into the outer call
+INNER_TXNS = {"approve_task": 1, "refund_task": 1}
+
+TASK_COUNTER_KEY = "task_counter"
+
+# Protocol limits that bound how many tasks fit in one atomic group
+MAX_GROUP_SIZE = 16
+MAX_BOX_REFS = 8
+MAX_APP_ARGS_BYTES = 2048
+APP_CALL_BUDGET = 700
+BOX_IO_QUOTA = 1024  # bytes of box I/O each box reference buys
+
+# Largest task box create_task's arguments can produce: selector, two
+# string lengths and the deadline leave the rest of the args for text
+MAX_TASK_BOX_SIZE = TaskBox.size(MAX_APP_ARGS_BYTES - 4 - 2 - 2 - 8, 0)
+
+# Opcode cost of create_tasks_batch as measured by teal_profiler's VM
+BATCH_BASE_COST = 120
+BATCH_TASK_COST = 110
+
+
+def _as_bytes(value):
+    return value.encode() if isinstance(value, str) else bytes(value)
+
+
+def encode_value(type_name, value):
+    """ARC-4 encoding of one argument"""
+    if type_name == "uint64":
+        return int(value).to_bytes(8, "big")
+    if type_name == "string":
+        raw = _as_bytes(value)
+        return len(raw).to_bytes(2, "big") + raw
+    if type_name == "uint64[]":
+        return len(value).to_bytes(2, "big") + b"".join(int(v).to_bytes(8, "big") for v in value)
+    if type_name == "string[]":
+        elements = [_as_bytes(v) for v in value]
+        heads = b""
+        tails = b""
+        offset = 2 * len(elements)
+        for element in elements:
+            heads += offset.to_bytes(2, "big")
+            tail = len(element).to_bytes(2, "big") + element
+            tails += tail
+            offset += len(tail)
+        return len(elements).to_bytes(2, "big") + heads + tails
+    raise ValueError(f"unsupported ABI type {type_name}")
+
+
+def encode_args(method_name, args):
+    """Application args for an ARC-4 call: selector followed by encoded values"""
+    method = METHODS[method_name]
+    encoded = [method_selector(method_name)]
+    abi_args = [a for a in method["args"] if a["type"] != "pay"]
+    if len(args) != len(abi_args):
+        raise ValueError(f"{method_name} expects {len(abi_args)} args, got {len(args)}")
+    for spec, value in zip(abi_args, args):
+        encoded.append(encode_value(spec["type"], value))
+    return encoded
+
+
+def task_box_refs(app_id, *task_ids, io_bytes=0):
+    """Box references covering the packed record of each task
+
+    Empty references are added when `io_bytes` of box I/O need more of
+    the per-reference quota than the named boxes buy.
+    """
+    refs = [(app_id, TaskBox.name(task_id)) for task_id in task_ids]
+    missing = -(-io_bytes // BOX_IO_QUOTA) - len(refs)
+    return refs + [(app_id, b"")] * missing
+
+
+def method_box_refs(app_id, method_name, args, task_id=None):
+    """Box references one method call needs, `task_id` defaulting to args[0]
+
+    They cover the whole record of every task touched: its size is known
+    for create_task and bounded by MAX_TASK_BOX_SIZE otherwise. get_tasks
+    reads up to a page of records plus the one that did not fit.
+    """
+    if method_name == "get_tasks":
+        start, count = args
+        return task_box_refs(app_id, *range(start, start + min(count, MAX_BOX_REFS)),
+                             io_bytes=GET_TASKS_MAX_BYTES + MAX_TASK_BOX_SIZE)
+    if method_name == "increase_budget":
+        return []
+    if method_name == "create_task":
+        if task_id is None:
+            raise ValueError("create_task box references need the id the task will get")
+        io_bytes = TaskBox.size(len(_as_bytes(args[0])), len(_as_bytes(args[1])))
+    else:
+        io_bytes = MAX_TASK_BOX_SIZE
+    return task_box_refs(app_id, args[0] if task_id is None else task_id, io_bytes=io_bytes)
+
+
+def read_task_counter(client, app_id):
+    """Current value of the task counter (the id the next task will get)"""
+    app_info = client.application_info(app_id)
+    for item in app_info["params"].get("global-state", []):
+        if base64.b64decode(item["key"]) == TASK_COUNTER_KEY.encode():
+            return item["value"]["uint"]
+    return 0
+
+
+class TaskIds:
+    """Task ids reserved locally for creates sent before earlier ones confirm
+
+    The on-chain counter only counts confirmed creates, so it is read for
+    the first reservation and afterwards only to resync after a failure,
+    once no reserved create is still in flight. Until then ids keep
+    counting on from the last reservation. Ids of a create that was
+    rejected before anything was reserved after it are handed out again.
+    Callers serialize reserve() and release().
+    """
+
+    def __init__(self):
+        self.next_id = None
+        self.in_flight = 0
+        self.stale = False
+
+    def needs_counter(self):
+        """Whether reserve() must be given the on-chain counter"""
+        return self.next_id is None or (self.stale and not self.in_flight)
+
+    def reserve(self, count=1, counter=None):
+        """First of `count` consecutive ids, resyncing to `counter` when given"""
+        if counter is not None:
+            self.next_id = counter
+            self.stale = False
+        first = self.next_id
+        self.next_id += count
+        self.in_flight += count
+        return first
+
+    def release(self, first, count=1, landed=True):
+        """Record how the creates of a reservation ended
+
+        `landed` is False when they were rejected, None when unknown
+        (timed out, or confirmed with ids other than the reserved ones).
+        """
+        self.in_flight -= count
+        if landed:
+            return
+        if landed is False and first + count == self.next_id:
+            self.next_id = first
+        else:
+            self.stale = True
+
+
+class TaskRecord(NamedTuple):
+    """Decoded contents of one task box"""
+    task_id: int
+    client: str
+    freelancer: str
+    amount: int
+    deadline: int
+    status: int
+    proof_hash: str
+    title: str
+    description: str
+
+
+def decode_task(task_id, value):
+    """Decode a packed task record (see bounty_contract.TaskBox)"""
+    proof_len = value[TaskBox.PROOF]
+    title_len = int.from_bytes(value[TaskBox.TITLE:TaskBox.TITLE + 2], "big")
+    description_at = TaskBox.TITLE + 2 + title_len
+    description_len = int.from_bytes(value[description_at:description_at + 2], "big")
+    return TaskRecord(
+        task_id=task_id,
+        client=encoding.encode_address(bytes(value[TaskBox.CLIENT:TaskBox.CLIENT + 32])),
+        freelancer=encoding.encode_address(bytes(value[TaskBox.FREELANCER:TaskBox.FREELANCER + 32])),
+        amount=int.from_bytes(value[TaskBox.AMOUNT:TaskBox.AMOUNT + 8], "big"),
+        deadline=int.from_bytes(value[TaskBox.DEADLINE:TaskBox.DEADLINE + 8], "big"),
+        status=value[TaskBox.STATUS],
+        proof_hash=bytes(value[TaskBox.PROOF + 1:TaskBox.PROOF + 1 + proof_len]).decode(),
+        title=bytes(value[TaskBox.TITLE + 2:description_at]).decode(),
+        description=bytes(value[description_at + 2:description_at + 2 + description_len]).decode(),
+    )
+
+
+def decode_task_page(start, value):
+    """Decode a get_tasks return value: records of consecutive tasks from `start`"""
+    records = []
+    offset = 0
+    while offset < len(value):
+        length = int.from_bytes(value[offset:offset + 2], "big")
+        offset += 2
+        records.append(decode_task(start + len(records), value[offset:offset + length]))
+        offset += length
+    return records
+
+
+def read_task(client, app_id, task_id):
+    """Fetch and decode one task box"""
+    response = client.application_box_by_name(app_id, TaskBox.name(task_id))
+    return decode_task(task_id, base64.b64decode(response["value"]))
+
+
+def task_ids_from_logs(tx_info):
+    """Task ids from the `task_created:` logs of a confirmed app call"""
+    prefix = b"task_created:"
+    task_ids = []
+    for log in tx_info.get("logs", []):
+        raw = base64.b64decode(log)
+        if raw.startswith(prefix):
+            task_ids.append(int.from_bytes(raw[len(prefix):], "big"))
+    return task_ids
+
+
+def task_id_from_logs(tx_info):
+    """Task id from the `task_created:` log of a confirmed create_task call"""
+    task_ids = task_ids_from_logs(tx_info)
+    return task_ids[0] if task_ids else None
+
+
+def _call_params(params, method_name):
+    """Copy of the suggested params with fees covering any inner payment"""
+    inner = INNER_TXNS.get(method_name, 0)
+    if not inner:
+        return params
+    sp = copy.copy(params)
+    sp.flat_fee = True
+    sp.fee = (sp.min_fee or 1000) * (1 + inner)
+    return sp
+
+
+def pool_fees(params, txns, inner=0):
+    """Put the fee of a whole group, `inner` inner transactions included, on its first transaction
+
+    Fees are pooled across an atomic group, so the other transactions
+    pay nothing. Call before assigning the group id.
+    """
+    min_fee = params.min_fee or 1000
+    total = inner * min_fee
+    for txn in txns:
+        if params.fee and not params.flat_fee:
+            total += max(min_fee, params.fee * txn.estimate_size())
+        else:
+            total += min_fee
+        txn.fee = 0
+    txns[0].fee = total
+    return txns
+
+
+def build_method_call(params, sender, app_id, method_name, args, task_id, payment=0):
+    """Unsigned transactions for one method call, grouped with its payment
+
+    A random note keeps a repeated call (a second reject_task, the same
+    proof submitted again) from reusing the txid of the first.
+    """
+    call = transaction.ApplicationNoOpTxn(
+        sender=sender,
+        sp=_call_params(params, method_name),
+        index=app_id,
+        app_args=encode_args(method_name, args),
+        boxes=method_box_refs(app_id, method_name, args, task_id),
+        note=os.urandom(8),
+    )
+    if not payment:
+        return [call]
+    pay = transaction.PaymentTxn(
+        sender=sender,
+        sp=params,
+        receiver=get_application_address(app_id),
+        amt=payment,
+    )
+    return transaction.assign_group_id([pay, call])
+
+
+def call_method(client, private_key, app_id, method_name, args, payment=0, params=None):
+    """Sign, submit and confirm a method call; returns the app call's tx info"""
+    sender = account.address_from_private_key(private_key)
+    provider = params_provider(client)
+    params = params or provider.get()
+    if method_name == "create_task":
+        task_id = read_task_counter(client, app_id)
+    else:
+        task_id = args[0]
+    txns = build_method_call(params, sender, app_id, method_name, args, task_id, payment)
+    signed = [txn.sign(private_key) for txn in txns]
+    client.send_transactions(signed)
+    info = transaction.wait_for_confirmation(client, signed[-1].get_txid(), 4)
+    provider.observe_round(info.get("confirmed-round", 0))
+    return info
+
+
+def create_task(client, private_key, app_id, title, description, deadline, amount):
+    """Create a task escrowing `amount` microAlgos; returns the new task id"""
+    info = call_method(client, private_key, app_id, "create_task",
+                       [title, description, deadline], payment=amount)
+    return task_id_from_logs(info)
+
+
+def claim_task(client, private_key, app_id, task_id):
+    return call_method(client, private_key, app_id, "claim_task", [task_id])
+
+
+def submit_work(client, private_key, app_id, task_id, proof_hash):
+    return call_method(client, private_key, app_id, "submit_work", [task_id, proof_hash])
+
+
+def approve_task(client, private_key, app_id, task_id):
+    return call_method(client, private_key, app_id, "approve_task", [task_id])
+
+
+def reject_task(client, private_key, app_id, task_id):
+    return call_method(client, private_key, app_id, "reject_task", [task_id])
+
+
+def refund_task(client, private_key, app_id, task_id):
+    return call_method(client, private_key, app_id, "refund_task", [task_id])
+
+
+# ========== BATCH CREATION ==========
+
+def _pooled_chunks(tasks):
+    """Split tasks into create_tasks_batch calls within box-ref and arg limits"""
+    chunk = []
+    for task in tasks:
+        candidate = chunk + [task]
+        if len(candidate) > MAX_BOX_REFS or _batch_args_size(candidate) > MAX_APP_ARGS_BYTES:
+            if not chunk:
+                raise ValueError(f"task {task[0]!r} alone exceeds the {MAX_APP_ARGS_BYTES}-byte arg limit")
+            yield chunk
+            chunk = [task]
+        else:
+            chunk = candidate
+    if chunk:
+        yield chunk
+
+
+def _batch_args(tasks):
+    titles, descriptions, deadlines, amounts = zip(*tasks)
+    return [list(titles), list(descriptions), list(deadlines), list(amounts)]
+
+
+def _batch_args_size(tasks):
+    return sum(len(arg) for arg in encode_args("create_tasks_batch", _batch_args(tasks)))
+
+
+def budget_calls_needed(task_count):
+    """increase_budget calls a create_tasks_batch call of task_count needs"""
+    cost = BATCH_BASE_COST + BATCH_TASK_COST * task_count
+    return -(-cost // APP_CALL_BUDGET) - 1
+
+
+def build_create_group(params, sender, app_id, tasks, first_task_id, pooled=False):
+    """Unsigned atomic group creating `tasks`, whose ids start at first_task_id
+
+    Without pooling each task is a pay/call pair (8 pairs per group).
+    With pooling one payment covers a single create_tasks_batch call,
+    followed by increase_budget calls when the batch needs more than
+    one call's opcode budget.
+    """
+    if pooled:
+        call = transaction.ApplicationNoOpTxn(
+            sender=sender,
+            sp=params,
+            index=app_id,
+            app_args=encode_args("create_tasks_batch", _batch_args(tasks)),
+            boxes=task_box_refs(app_id, *range(first_task_id, first_task_id + len(tasks)),
+                                io_bytes=sum(TaskBox.size(len(_as_bytes(t[0])), len(_as_bytes(t[1])))
+                                             for t in tasks)),
+        )
+        pay = transaction.PaymentTxn(
+            sender=sender,
+            sp=params,
+            receiver=get_application_address(app_id),
+            amt=sum(task[3] for task in tasks),
+        )
+        padding = [
+            transaction.ApplicationNoOpTxn(
+                sender=sender,
+                sp=params,
+                index=app_id,
+                app_args=encode_args("increase_budget", []),
+                note=i.to_bytes(1, "big"),
+            )
+            for i in range(budget_calls_needed(len(tasks)))
+        ]
+        return transaction.assign_group_id([pay, call] + padding)
+
+    if 2 * len(tasks) > MAX_GROUP_SIZE:
+        raise ValueError(f"at most {MAX_GROUP_SIZE // 2} pay/call pairs fit in one group")
+    txns = []
+    for offset, (title, description, deadline, amount) in enumerate(tasks):
+        txns += build_method_call(params, sender, app_id, "create_task",
+                                  [title, description, deadline],
+                                  first_task_id + offset, payment=amount)
+    for txn in txns:
+        txn.group = None
+    return transaction.assign_group_id(txns)
+
+
+def create_tasks_batch(client, private_key, app_id, tasks, pooled=False):
+    """Create many tasks with one submission per atomic group
+
+    `tasks` is a sequence of (title, description, deadline, amount).
+    Every group is submitted before waiting, so the whole batch costs
+    about one confirmation wait. Box references assume no other client
+    creates tasks concurrently. Returns the task ids in input order.
+    """
+    tasks = list(tasks)
+    sender = account.address_from_private_key(private_key)
+    provider = params_provider(client)
+    params = provider.get()
+    next_task_id = read_task_counter(client, app_id)
+
+    if pooled:
+        chunks = list(_pooled_chunks(tasks))
+    else:
+        size = MAX_GROUP_SIZE // 2
+        chunks = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+
+    submitted = []
+    for chunk in chunks:
+        group = build_create_group(params, sender, app_id, chunk, next_task_id, pooled)
+        signed = [txn.sign(private_key) for txn in group]
+        client.send_transactions(signed)
+        submitted.append(signed)
+        next_task_id += len(chunk)
+
+    task_ids = []
+    for signed in submitted:
+        info = transaction.wait_for_confirmation(client, signed[-1].get_txid(), 4)
+        provider.observe_round(info.get("confirmed-round", 0))
+        for stxn in signed:
+            if isinstance(stxn.transaction, transaction.ApplicationCallTxn):
+                task_ids += task_ids_from_logs(client.pending_transaction_info(stxn.get_txid()))
+    return task_ids
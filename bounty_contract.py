@@ -3,8 +3,13 @@ BountyBoard Smart Contract using PyTeal
 Escrow marketplace for micro-tasks on Algorand TestNet
 """
 
+import re
+from functools import lru_cache
+
 from pyteal import *
 
+from bounty_board import DISPATCH_ORDER, METHOD_SIGNATURES, selector_router
+
 
 class TaskStatus:
     """Task status enumeration"""
@@ -16,56 +21,130 @@ class TaskStatus:
     REFUNDED = Int(5)
 
 
+class TaskBox:
+    """Byte layout of the packed task record (one box per task)
+
+    Fixed-width fields come first so they can be read with box_extract and
+    updated in place with box_replace. Title and description follow as
+    2-byte length-prefixed strings.
+    """
+    PREFIX = b"task_"
+    CLIENT = 0          # 32-byte address
+    FREELANCER = 32     # 32-byte address (zero address until claimed)
+    AMOUNT = 64         # uint64 escrowed microAlgos
+    DEADLINE = 72       # uint64 unix timestamp
+    STATUS = 80         # 1-byte TaskStatus
+    PROOF = 81          # 1-byte length + fixed proof slot
+    PROOF_MAX = 64
+    TITLE = 146         # 2-byte length + title, 2-byte length + description
+    HEADER_SIZE = 146
+
+    @staticmethod
+    def name(task_id):
+        """Off-chain box name for a task id"""
+        return TaskBox.PREFIX + task_id.to_bytes(8, "big")
+
+    @staticmethod
+    def size(title_len, description_len):
+        """Total box size for a task with the given string lengths"""
+        return TaskBox.HEADER_SIZE + 2 + title_len + 2 + description_len
+
+
+ARC4_RETURN_PREFIX = Bytes("base16", "151f7c75")
+
+# A get_tasks page must fit in one 1024-byte log next to the return
+# prefix and its own 2-byte byte[] length
+GET_TASKS_MAX_BYTES = 1024 - 4 - 2
+
+
+def status_byte(status):
+    """Single-byte encoding of a TaskStatus value"""
+    return Bytes("base16", "%02x" % status.value)
+
+
+def arc4_string(value):
+    """Assert an ARC-4 string argument's 2-byte length prefix matches its size"""
+    return Assert(Len(value) == Int(2) + ExtractUint16(value, Int(0)))
+
+
 def approval_program():
     """Main approval program for BountyBoard contract"""
     
     # Global state keys
     task_counter = Bytes("task_counter")
     
-    # Local task box keys
-    client_key = Bytes("client")
-    freelancer_key = Bytes("freelancer")
-    amount_key = Bytes("amount")
-    deadline_key = Bytes("deadline")
-    status_key = Bytes("status")
-    title_key = Bytes("title")
-    description_key = Bytes("description")
-    proof_hash_key = Bytes("proof_hash")
-    
     # Scratch variables
     task_id_var = ScratchVar(TealType.uint64)
     client_var = ScratchVar(TealType.bytes)
     freelancer_var = ScratchVar(TealType.bytes)
     amount_var = ScratchVar(TealType.uint64)
     status_var = ScratchVar(TealType.uint64)
-    deadline_var = ScratchVar(TealType.uint64)
+    box_name_var = ScratchVar(TealType.bytes)
+    record_var = ScratchVar(TealType.bytes)
     
-    @Subroutine(TealType.bytes)
     def task_box_name(task_id: Expr) -> Expr:
         """Generate box name for a task"""
-        return Concat(Bytes("task_"), Itob(task_id))
+        return Concat(Bytes(TaskBox.PREFIX), Itob(task_id))
     
     @Subroutine(TealType.none)
-    def set_task_field(task_id: Expr, key: Expr, value: Expr):
-        """Set a field in task box storage"""
-        return App.box_put(
-            Concat(task_box_name(task_id), key),
-            value
-        )
+    def load_task():
+        """Load the task in task_id_var: one box read for every method
+        
+        Reads the fixed-width header (client through status) with a
+        single box_extract, which fails on a missing box and so doubles
+        as the existence check. Leaves the box name, the header, and the
+        status, client and freelancer in scratch.
+        """
+        return Seq([
+            box_name_var.store(task_box_name(task_id_var.load())),
+            record_var.store(App.box_extract(box_name_var.load(), Int(0), Int(TaskBox.STATUS + 1))),
+            status_var.store(GetByte(record_var.load(), Int(TaskBox.STATUS))),
+            client_var.store(Extract(record_var.load(), Int(TaskBox.CLIENT), Int(32))),
+            freelancer_var.store(Extract(record_var.load(), Int(TaskBox.FREELANCER), Int(32))),
+        ])
+    
+    def load_task_arg():
+        """Load the task named by the first method argument"""
+        return Seq([task_id_var.store(Btoi(Txn.application_args[1])), load_task()])
+    
+    def record_uint(offset: int) -> Expr:
+        """uint64 field of the loaded task header"""
+        return ExtractUint64(record_var.load(), Int(offset))
+    
+    def set_task_field(offset: int, value: Expr) -> Expr:
+        """Overwrite a fixed-width field of the loaded task in place"""
+        return App.box_replace(box_name_var.load(), Int(offset), value)
+    
+    def payment_txn():
+        """Escrow payment: the transaction right before this app call
+        
+        Pairing each call with its preceding payment lets a group carry
+        up to 8 pay/call pairs; group index 0 underflows and fails.
+        """
+        return Gtxn[Txn.group_index() - Int(1)]
     
-    @Subroutine(TealType.bytes)
-    def get_task_field(task_id: Expr, key: Expr) -> Expr:
-        """Get a field from task box storage"""
-        box_value = App.box_get(Concat(task_box_name(task_id), key))
-        return box_value.value()
+    def verify_payment():
+        return Seq([
+            Assert(payment_txn().type_enum() == TxnType.Payment),
+            Assert(payment_txn().receiver() == Global.current_application_address()),
+        ])
+    
+    def array_uint(array: Expr, index: Expr) -> Expr:
+        """Element of an ARC-4 uint64[] argument"""
+        return ExtractUint64(array, Int(2) + index * Int(8))
+    
+    def array_string(array: Expr, start: ScratchVar) -> Expr:
+        """Length-prefixed element of an ARC-4 string[] argument at `start`"""
+        return Extract(array, start.load(), Int(2) + ExtractUint16(array, start.load()))
     
     # ========== CREATE TASK ==========
     on_create_task = Seq([
         # Verify grouped payment transaction
-        Assert(Global.group_size() == Int(2)),
-        Assert(Gtxn[0].type_enum() == TxnType.Payment),
-        Assert(Gtxn[0].receiver() == Global.current_application_address()),
-        Assert(Gtxn[0].amount() > Int(0)),
+        verify_payment(),
+        Assert(payment_txn().amount() > Int(0)),
+        Assert(Len(Txn.application_args[3]) == Int(8)),
+        arc4_string(Txn.application_args[1]),
+        arc4_string(Txn.application_args[2]),
         
         # Get current task counter
         task_id_var.store(App.globalGet(task_counter)),
@@ -73,42 +152,104 @@ def approval_program():
         # Increment counter
         App.globalPut(task_counter, task_id_var.load() + Int(1)),
         
-        # Create task box
-        Assert(App.box_create(task_box_name(task_id_var.load()), Int(512))),
-        
-        # Store task fields
-        set_task_field(task_id_var.load(), client_key, Txn.sender()),
-        set_task_field(task_id_var.load(), freelancer_key, Global.zero_address()),
-        set_task_field(task_id_var.load(), amount_key, Itob(Gtxn[0].amount())),
-        set_task_field(task_id_var.load(), deadline_key, Txn.application_args[3]),
-        set_task_field(task_id_var.load(), status_key, Itob(TaskStatus.OPEN)),
-        set_task_field(task_id_var.load(), title_key, Txn.application_args[1]),
-        set_task_field(task_id_var.load(), description_key, Txn.application_args[2]),
-        set_task_field(task_id_var.load(), proof_hash_key, Bytes("")),
+        # Write the whole record in one box_put; the counter guarantees
+        # the box name is fresh
+        App.box_put(
+            task_box_name(task_id_var.load()),
+            Concat(
+                Txn.sender(),
+                Global.zero_address(),
+                Itob(payment_txn().amount()),
+                Txn.application_args[3],
+                status_byte(TaskStatus.OPEN),
+                BytesZero(Int(1 + TaskBox.PROOF_MAX)),
+                # ARC-4 strings are already 2-byte length prefixed
+                Txn.application_args[1],
+                Txn.application_args[2],
+            )
+        ),
         
         # Return task ID
         Log(Concat(Bytes("task_created:"), Itob(task_id_var.load()))),
+        Log(Concat(ARC4_RETURN_PREFIX, Itob(task_id_var.load()))),
+        Approve()
+    ])
+    
+    # ========== CREATE TASKS BATCH ==========
+    # One payment escrows several tasks. Args are ARC-4 string[] titles,
+    # string[] descriptions, uint64[] deadlines and uint64[] amounts; the
+    # payment must equal the sum of the amounts.
+    titles = Txn.application_args[1]
+    descriptions = Txn.application_args[2]
+    deadlines = Txn.application_args[3]
+    amounts = Txn.application_args[4]
+    batch_size_var = ScratchVar(TealType.uint64)
+    index_var = ScratchVar(TealType.uint64)
+    total_var = ScratchVar(TealType.uint64)
+    title_start_var = ScratchVar(TealType.uint64)
+    description_start_var = ScratchVar(TealType.uint64)
+    
+    on_create_tasks_batch = Seq([
+        verify_payment(),
+        
+        # All four arrays must describe the same number of tasks
+        batch_size_var.store(ExtractUint16(titles, Int(0))),
+        Assert(batch_size_var.load() > Int(0)),
+        Assert(ExtractUint16(descriptions, Int(0)) == batch_size_var.load()),
+        Assert(Len(deadlines) == Int(2) + batch_size_var.load() * Int(8)),
+        Assert(Len(amounts) == Int(2) + batch_size_var.load() * Int(8)),
+        
+        task_id_var.store(App.globalGet(task_counter)),
+        total_var.store(Int(0)),
+        
+        For(
+            index_var.store(Int(0)),
+            index_var.load() < batch_size_var.load(),
+            index_var.store(index_var.load() + Int(1))
+        ).Do(Seq([
+            amount_var.store(array_uint(amounts, index_var.load())),
+            Assert(amount_var.load() > Int(0)),
+            total_var.store(total_var.load() + amount_var.load()),
+            title_start_var.store(Int(2) + ExtractUint16(titles, Int(2) + index_var.load() * Int(2))),
+            description_start_var.store(
+                Int(2) + ExtractUint16(descriptions, Int(2) + index_var.load() * Int(2))
+            ),
+            
+            App.box_put(
+                task_box_name(task_id_var.load() + index_var.load()),
+                Concat(
+                    Txn.sender(),
+                    Global.zero_address(),
+                    Itob(amount_var.load()),
+                    Extract(deadlines, Int(2) + index_var.load() * Int(8), Int(8)),
+                    status_byte(TaskStatus.OPEN),
+                    BytesZero(Int(1 + TaskBox.PROOF_MAX)),
+                    array_string(titles, title_start_var),
+                    array_string(descriptions, description_start_var),
+                )
+            ),
+            Log(Concat(Bytes("task_created:"), Itob(task_id_var.load() + index_var.load()))),
+        ])),
+        
+        # The single payment must cover exactly the escrow of every task
+        Assert(payment_txn().amount() == total_var.load()),
+        App.globalPut(task_counter, task_id_var.load() + batch_size_var.load()),
         Approve()
     ])
     
     # ========== CLAIM TASK ==========
     on_claim_task = Seq([
-        task_id_var.store(Btoi(Txn.application_args[1])),
-        
-        # Verify task exists
-        Assert(App.box_length(task_box_name(task_id_var.load())).hasValue()),
+        load_task_arg(),
         
         # Verify status is OPEN
-        status_var.store(Btoi(get_task_field(task_id_var.load(), status_key))),
         Assert(status_var.load() == TaskStatus.OPEN),
         
         # Verify not the client claiming their own task
-        client_var.store(get_task_field(task_id_var.load(), client_key)),
         Assert(Txn.sender() != client_var.load()),
         
         # Update freelancer and status
-        set_task_field(task_id_var.load(), freelancer_key, Txn.sender()),
-        set_task_field(task_id_var.load(), status_key, Itob(TaskStatus.CLAIMED)),
+        set_task_field(TaskBox.FREELANCER, Txn.sender()),
+        set_task_field(TaskBox.STATUS, status_byte(TaskStatus.CLAIMED)),
         
         Log(Concat(Bytes("task_claimed:"), Itob(task_id_var.load()))),
         Approve()
@@ -116,22 +257,26 @@ def approval_program():
     
     # ========== SUBMIT WORK ==========
     on_submit_work = Seq([
-        task_id_var.store(Btoi(Txn.application_args[1])),
-        
-        # Verify task exists
-        Assert(App.box_length(task_box_name(task_id_var.load())).hasValue()),
+        arc4_string(Txn.application_args[2]),
+        Assert(Len(Txn.application_args[2]) <= Int(2 + TaskBox.PROOF_MAX)),
+        load_task_arg(),
         
         # Verify caller is the freelancer
-        freelancer_var.store(get_task_field(task_id_var.load(), freelancer_key)),
         Assert(Txn.sender() == freelancer_var.load()),
         
         # Verify status is CLAIMED
-        status_var.store(Btoi(get_task_field(task_id_var.load(), status_key))),
         Assert(status_var.load() == TaskStatus.CLAIMED),
         
-        # Update proof hash and status
-        set_task_field(task_id_var.load(), proof_hash_key, Txn.application_args[2]),
-        set_task_field(task_id_var.load(), status_key, Itob(TaskStatus.SUBMITTED)),
+        # Status and proof slot are adjacent, so update both in one write
+        set_task_field(
+            TaskBox.STATUS,
+            Concat(
+                status_byte(TaskStatus.SUBMITTED),
+                # Low byte of the ARC-4 length prefix, then the proof
+                Suffix(Txn.application_args[2], Int(1)),
+                BytesZero(Int(2 + TaskBox.PROOF_MAX) - Len(Txn.application_args[2])),
+            )
+        ),
         
         Log(Concat(Bytes("work_submitted:"), Itob(task_id_var.load()))),
         Approve()
@@ -139,32 +284,23 @@ def approval_program():
     
     # ========== APPROVE TASK ==========
     on_approve_task = Seq([
-        task_id_var.store(Btoi(Txn.application_args[1])),
-        
-        # Verify task exists
-        Assert(App.box_length(task_box_name(task_id_var.load())).hasValue()),
+        load_task_arg(),
         
         # Verify caller is the client
-        client_var.store(get_task_field(task_id_var.load(), client_key)),
         Assert(Txn.sender() == client_var.load()),
         
         # Verify status is SUBMITTED
-        status_var.store(Btoi(get_task_field(task_id_var.load(), status_key))),
         Assert(status_var.load() == TaskStatus.SUBMITTED),
         
-        # Get payment details
-        freelancer_var.store(get_task_field(task_id_var.load(), freelancer_key)),
-        amount_var.store(Btoi(get_task_field(task_id_var.load(), amount_key))),
-        
         # Update status BEFORE transfer (security best practice)
-        set_task_field(task_id_var.load(), status_key, Itob(TaskStatus.APPROVED)),
+        set_task_field(TaskBox.STATUS, status_byte(TaskStatus.APPROVED)),
         
         # Transfer payment to freelancer
         InnerTxnBuilder.Begin(),
         InnerTxnBuilder.SetFields({
             TxnField.type_enum: TxnType.Payment,
             TxnField.receiver: freelancer_var.load(),
-            TxnField.amount: amount_var.load(),
+            TxnField.amount: record_uint(TaskBox.AMOUNT),
             TxnField.fee: Int(0)
         }),
         InnerTxnBuilder.Submit(),
@@ -175,22 +311,19 @@ def approval_program():
     
     # ========== REJECT TASK ==========
     on_reject_task = Seq([
-        task_id_var.store(Btoi(Txn.application_args[1])),
-        
-        # Verify task exists
-        Assert(App.box_length(task_box_name(task_id_var.load())).hasValue()),
+        load_task_arg(),
         
         # Verify caller is the client
-        client_var.store(get_task_field(task_id_var.load(), client_key)),
         Assert(Txn.sender() == client_var.load()),
         
         # Verify status is SUBMITTED
-        status_var.store(Btoi(get_task_field(task_id_var.load(), status_key))),
         Assert(status_var.load() == TaskStatus.SUBMITTED),
         
-        # Update status back to CLAIMED for resubmission
-        set_task_field(task_id_var.load(), status_key, Itob(TaskStatus.CLAIMED)),
-        set_task_field(task_id_var.load(), proof_hash_key, Bytes("")),
+        # Update status back to CLAIMED for resubmission and clear the proof
+        set_task_field(
+            TaskBox.STATUS,
+            Concat(status_byte(TaskStatus.CLAIMED), BytesZero(Int(1 + TaskBox.PROOF_MAX)))
+        ),
         
         Log(Concat(Bytes("task_rejected:"), Itob(task_id_var.load()))),
         Approve()
@@ -198,22 +331,13 @@ def approval_program():
     
     # ========== REFUND TASK ==========
     on_refund_task = Seq([
-        task_id_var.store(Btoi(Txn.application_args[1])),
-        
-        # Verify task exists
-        Assert(App.box_length(task_box_name(task_id_var.load())).hasValue()),
-        
-        # Get task details
-        client_var.store(get_task_field(task_id_var.load(), client_key)),
-        status_var.store(Btoi(get_task_field(task_id_var.load(), status_key))),
-        deadline_var.store(Btoi(get_task_field(task_id_var.load(), deadline_key))),
-        amount_var.store(Btoi(get_task_field(task_id_var.load(), amount_key))),
+        load_task_arg(),
         
         # Verify caller is client OR deadline has passed
         Assert(
             Or(
                 Txn.sender() == client_var.load(),
-                Global.latest_timestamp() > deadline_var.load()
+                Global.latest_timestamp() > record_uint(TaskBox.DEADLINE)
             )
         ),
         
@@ -226,14 +350,14 @@ def approval_program():
         ),
         
         # Update status BEFORE refund
-        set_task_field(task_id_var.load(), status_key, Itob(TaskStatus.REFUNDED)),
+        set_task_field(TaskBox.STATUS, status_byte(TaskStatus.REFUNDED)),
         
         # Refund to client
         InnerTxnBuilder.Begin(),
         InnerTxnBuilder.SetFields({
             TxnField.type_enum: TxnType.Payment,
             TxnField.receiver: client_var.load(),
-            TxnField.amount: amount_var.load(),
+            TxnField.amount: record_uint(TaskBox.AMOUNT),
             TxnField.fee: Int(0)
         }),
         InnerTxnBuilder.Submit(),
@@ -242,15 +366,62 @@ def approval_program():
         Approve()
     ])
     
+    # ========== GET TASKS ==========
+    # Read-only, meant for simulate: the records of consecutive tasks from
+    # `start`, each behind a 2-byte length, as one ARC-4 byte[]. Stops at
+    # the task counter, after `count` tasks, or before the page would
+    # outgrow a single log.
+    end_var = ScratchVar(TealType.uint64)
+    page_var = ScratchVar(TealType.bytes)
+    record = App.box_get(task_box_name(task_id_var.load()))
+    
+    def uint16(value: Expr) -> Expr:
+        return Extract(Itob(value), Int(6), Int(2))
+    
+    on_get_tasks = Seq([
+        task_id_var.store(Btoi(Txn.application_args[1])),
+        
+        # end = min(start + count, task_counter) without overflowing
+        end_var.store(App.globalGet(task_counter)),
+        If(end_var.load() < task_id_var.load()).Then(end_var.store(task_id_var.load())),
+        If(Btoi(Txn.application_args[2]) < end_var.load() - task_id_var.load()).Then(
+            end_var.store(task_id_var.load() + Btoi(Txn.application_args[2]))
+        ),
+        
+        page_var.store(Bytes("")),
+        While(task_id_var.load() < end_var.load()).Do(Seq([
+            record,
+            Assert(record.hasValue()),
+            If(Len(page_var.load()) + Int(2) + Len(record.value()) > Int(GET_TASKS_MAX_BYTES)).Then(
+                Break()
+            ),
+            page_var.store(Concat(page_var.load(), uint16(Len(record.value())), record.value())),
+            task_id_var.store(task_id_var.load() + Int(1)),
+        ])),
+        
+        Log(Concat(ARC4_RETURN_PREFIX, uint16(Len(page_var.load())), page_var.load())),
+        Approve()
+    ])
+    
     # ========== METHOD ROUTER ==========
-    router = Cond(
-        [Txn.application_args[0] == Bytes("create_task"), on_create_task],
-        [Txn.application_args[0] == Bytes("claim_task"), on_claim_task],
-        [Txn.application_args[0] == Bytes("submit_work"), on_submit_work],
-        [Txn.application_args[0] == Bytes("approve_task"), on_approve_task],
-        [Txn.application_args[0] == Bytes("reject_task"), on_reject_task],
-        [Txn.application_args[0] == Bytes("refund_task"), on_refund_task]
-    )
+    # Dispatch on ARC-4 selectors in DISPATCH_ORDER; approval_teal()
+    # collapses the comparisons into a single match
+    handlers = {
+        "create_task": on_create_task,
+        "create_tasks_batch": on_create_tasks_batch,
+        "claim_task": on_claim_task,
+        "submit_work": on_submit_work,
+        "approve_task": on_approve_task,
+        "reject_task": on_reject_task,
+        "refund_task": on_refund_task,
+        "get_tasks": on_get_tasks,
+        # No-op call that only adds its 700 opcode budget to the group pool
+        "increase_budget": Approve(),
+    }
+    router = Cond(*[
+        [Txn.application_args[0] == MethodSignature(METHOD_SIGNATURES[name]), handlers[name]]
+        for name in DISPATCH_ORDER
+    ])
     
     # ========== MAIN PROGRAM ==========
     program = Cond(
@@ -258,11 +429,12 @@ def approval_program():
             App.globalPut(task_counter, Int(0)),
             Approve()
         ])],
+        # Method calls are NoOp, so test for them before the rejected cases
+        [Txn.on_completion() == OnComplete.NoOp, router],
         [Txn.on_completion() == OnComplete.DeleteApplication, Reject()],
         [Txn.on_completion() == OnComplete.UpdateApplication, Reject()],
         [Txn.on_completion() == OnComplete.CloseOut, Reject()],
-        [Txn.on_completion() == OnComplete.OptIn, Reject()],
-        [Txn.on_completion() == OnComplete.NoOp, router]
+        [Txn.on_completion() == OnComplete.OptIn, Reject()]
     )
     
     return program
@@ -273,24 +445,70 @@ def clear_program():
     return Approve()
 
 
+# The Cond router as PyTeal compiles it: one compare-and-branch per method
+_SELECTOR_CHAIN = re.compile(r'(?:txna ApplicationArgs 0\nmethod "[^"]+"\n==\nbnz \w+\n)+err\n')
+_SELECTOR_CASE = re.compile(r'method "([^"]+)"\n==\nbnz (\w+)')
+
+
+def selector_match(teal):
+    """Replace the compiled selector compare chain with a single match
+
+    PyTeal has no match/switch expression, so the router is written as
+    a Cond and rewritten here after compilation.
+    """
+    names = {signature: name for name, signature in METHOD_SIGNATURES.items()}
+
+    def rewrite(chain):
+        cases = _SELECTOR_CASE.findall(chain.group(0))
+        return selector_router([names[signature] for signature, _ in cases],
+                               [label for _, label in cases])
+
+    teal, count = _SELECTOR_CHAIN.subn(rewrite, teal)
+    if count != 1:
+        raise ValueError(f"expected one selector router in the compiled program, found {count}")
+    return teal
+
+
+def build_teal(version=10):
+    """Approval and clear programs compiled from the PyTeal source"""
+    approval = selector_match(compileTeal(approval_program(), mode=Mode.Application, version=version))
+    clear = compileTeal(clear_program(), mode=Mode.Application, version=version)
+    return approval, clear
+
+
+@lru_cache(maxsize=None)
+def approval_teal(version=10):
+    """Approval program as TEAL, rebuilt only when the contract source changes"""
+    from contract_build import build
+    return build(version).approval
+
+
+@lru_cache(maxsize=None)
+def clear_teal(version=10):
+    """Clear state program as TEAL, rebuilt only when the contract source changes"""
+    from contract_build import build
+    return build(version).clear
+
+
 def compile_contract():
-    """Compile the contract to TEAL"""
-    approval_teal = compileTeal(approval_program(), mode=Mode.Application, version=10)
-    clear_teal = compileTeal(clear_program(), mode=Mode.Application, version=10)
-    
-    # Save TEAL files
-    with open("bounty_approval.teal", "w") as f:
-        f.write(approval_teal)
-    
-    with open("bounty_clear.teal", "w") as f:
-        f.write(clear_teal)
-    
-    print("✓ Contract compiled successfully!")
+    """Compile the contract to TEAL, rewriting the .teal files only when they change"""
+    from contract_build import build_contract
+    result, written = build_contract()
+
+    print("✓ Contract compiled successfully!" if not result.cached
+          else "✓ Contract unchanged, reused the previous build")
     print("  - bounty_approval.teal")
     print("  - bounty_clear.teal")
-    
-    return approval_teal, clear_teal
+    if not written:
+        print("  (files already up to date)")
+
+    return result.approval, result.clear
 
 
 if __name__ == "__main__":
-    compile_contract()
+    import sys
+    if len(sys.argv) > 1:
+        from contract_build import main
+        main()
+    else:
+        compile_contract()
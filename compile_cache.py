@@ -0,0 +1,150 @@
+"""
+On-disk cache of compiled TEAL programs
+Entries are content-addressed by source hash, compiler version and TEAL
+version, so an unchanged program never goes back to /v2/teal/compile.
+JsonCache is the generic store underneath, also used for simulations.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import weakref
+
+
+DEFAULT_CACHE_DIR = os.environ.get("BOUNTYBOARD_COMPILE_CACHE", ".teal_cache")
+DEFAULT_MAX_ENTRIES = 256
+
+_PRAGMA = re.compile(r"^\s*#pragma\s+version\s+(\d+)", re.MULTILINE)
+
+
+def teal_version(source):
+    """TEAL version declared by the source's #pragma (1 if absent)"""
+    match = _PRAGMA.search(source)
+    return int(match.group(1)) if match else 1
+
+
+_compiler_versions = weakref.WeakKeyDictionary()
+
+
+def compiler_version(client):
+    """Build string of the algod serving `client`, fetched once per client"""
+    try:
+        return _compiler_versions[client]
+    except (KeyError, TypeError):
+        pass
+    build = client.versions()["build"]
+    version = "{major}.{minor}.{build_number}+{commit_hash}".format(**build)
+    try:
+        _compiler_versions[client] = version
+    except TypeError:
+        pass
+    return version
+
+
+class JsonCache:
+    """Directory of JSON entries keyed by content hash
+
+    Hits refresh the file's mtime, and the least recently used entries
+    are evicted once the directory holds more than `max_entries`.
+    """
+
+    def __init__(self, directory, max_entries=DEFAULT_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries beyond max_entries"""
+        with self._lock:
+            try:
+                names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+            except OSError:
+                return
+            if len(names) <= self.max_entries:
+                return
+            paths = [os.path.join(self.directory, n) for n in names]
+            paths.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+            for path in paths[:len(paths) - self.max_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.directory, name))
+
+
+class CompileCache(JsonCache):
+    """Content-addressed store of algod compile responses"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(directory, max_entries)
+
+    @staticmethod
+    def key(source, compiler, version):
+        digest = hashlib.sha256()
+        for part in (compiler, str(version), source):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def compile(self, client, source, source_map=False):
+        """algod compile response for `source`, served from disk when possible"""
+        key = self.key(source, compiler_version(client), teal_version(source))
+        entry = self.get(key)
+        if entry is not None and (not source_map or "sourcemap" in entry):
+            self.hits += 1
+            return entry
+        self.misses += 1
+        response = client.compile(source, source_map=source_map)
+        entry = {"hash": response["hash"], "result": response["result"]}
+        if "sourcemap" in response:
+            entry["sourcemap"] = response["sourcemap"]
+        self.put(key, entry)
+        return entry
+
+
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = CompileCache()
+    return _default_cache
+
+
+def compile_bytes(client, source, cache=None):
+    """Compiled program bytes for TEAL source, using the compile cache"""
+    response = (cache or default_cache()).compile(client, source)
+    return base64.b64decode(response["result"])
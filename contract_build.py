@@ -0,0 +1,229 @@
+"""
+Incremental build of the PyTeal contract
+The TEAL produced for a given PyTeal source is stored under a fingerprint
+of that source (the contract modules, PyTeal version and TEAL version),
+so an unchanged contract is never recompiled and unchanged .teal files
+are never rewritten. Program bytes come from the compile cache.
+"""
+
+import argparse
+import hashlib
+import importlib
+import importlib.metadata
+import importlib.util
+import os
+import sys
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from compile_cache import JsonCache, compile_bytes
+
+
+DEFAULT_BUILD_CACHE_DIR = os.environ.get("BOUNTYBOARD_BUILD_CACHE", ".build_cache")
+DEFAULT_TEAL_VERSION = 10
+DEFAULT_POLL_INTERVAL = 0.2  # seconds between source checks in watch mode
+
+# Modules whose source determines the compiled programs, in reload order
+SOURCE_MODULES = ("bounty_board", "bounty_contract")
+
+APPROVAL_FILE = "bounty_approval.teal"
+CLEAR_FILE = "bounty_clear.teal"
+
+
+class Build(NamedTuple):
+    fingerprint: str
+    approval: str
+    clear: str
+    cached: bool                      # TEAL reused without running PyTeal
+    approval_program: Optional[bytes] = None
+    clear_program: Optional[bytes] = None
+
+
+def source_paths(modules=SOURCE_MODULES):
+    """Source file of each module, located without importing it"""
+    return [importlib.util.find_spec(name).origin for name in modules]
+
+
+def fingerprint(version=DEFAULT_TEAL_VERSION, paths=None):
+    """Hash of everything the compiled programs depend on"""
+    digest = hashlib.sha256()
+    digest.update(importlib.metadata.version("pyteal").encode())
+    digest.update(b"\0%d\0" % version)
+    for path in paths or source_paths():
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class BuildCache(JsonCache):
+    """Compiled TEAL keyed by source fingerprint"""
+
+    def __init__(self, directory=DEFAULT_BUILD_CACHE_DIR, max_entries=64):
+        super().__init__(directory, max_entries)
+
+
+_default_cache = None
+_memo = {}  # fingerprint -> (approval, clear), for this process
+_memo_lock = threading.Lock()
+_loaded_mtimes = None  # source mtimes when _compile() last imported the contract modules
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = BuildCache()
+    return _default_cache
+
+
+def _compile(version, reload=False):
+    """TEAL from the contract modules, re-imported first unless known to match their source
+
+    Modules imported elsewhere, or before their source last changed, may
+    be stale; only ones this function loaded from unchanged files are
+    compiled as they are.
+    """
+    global _loaded_mtimes
+    mtimes = _mtimes(source_paths())
+    if reload or (mtimes != _loaded_mtimes and any(name in sys.modules for name in SOURCE_MODULES)):
+        reload_sources()
+    import bounty_contract
+    _loaded_mtimes = mtimes
+    return bounty_contract.build_teal(version)
+
+
+def build(version=DEFAULT_TEAL_VERSION, client=None, cache=None, reload=False):
+    """TEAL for the current contract source, compiled only when the source changed
+
+    With an algod `client` the program bytes are included as well,
+    served from the compile cache for TEAL it has seen before. Contract
+    modules whose source changed since they were imported are re-imported
+    before compiling; `reload` forces that. TEAL is only cached when the
+    source was unchanged from fingerprint to compile.
+    """
+    cache = cache or default_cache()
+    key = fingerprint(version)
+    with _memo_lock:
+        programs = _memo.get(key)
+        cached = programs is not None
+        if programs is None:
+            entry = cache.get(key)
+            if entry is not None:
+                cache.hits += 1
+                programs = entry["approval"], entry["clear"]
+                cached = True
+                _memo[key] = programs
+            else:
+                cache.misses += 1
+                programs = _compile(version, reload)
+                if fingerprint(version) == key:
+                    cache.put(key, {"approval": programs[0], "clear": programs[1]})
+                    _memo[key] = programs
+    approval, clear = programs
+    result = Build(key, approval, clear, cached)
+    if client is not None:
+        result = result._replace(approval_program=compile_bytes(client, approval),
+                                 clear_program=compile_bytes(client, clear))
+    return result
+
+
+def write_if_changed(path, content):
+    """Write `content` unless the file already holds it; returns whether it was written"""
+    try:
+        with open(path, "r") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+def build_contract(version=DEFAULT_TEAL_VERSION, output_dir=".", cache=None, reload=False):
+    """Build and write the .teal files; returns (Build, [paths written])"""
+    result = build(version, cache=cache, reload=reload)
+    written = []
+    for name, content in ((APPROVAL_FILE, result.approval), (CLEAR_FILE, result.clear)):
+        path = os.path.join(output_dir, name)
+        if write_if_changed(path, content):
+            written.append(path)
+    return result, written
+
+
+def reload_sources(modules=SOURCE_MODULES):
+    """Re-import the contract modules so the next build sees edited source"""
+    for name in modules:
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+
+
+def _mtimes(paths):
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def watch(version=DEFAULT_TEAL_VERSION, output_dir=".", interval=DEFAULT_POLL_INTERVAL,
+          stop=None, on_build=None, cache=None):
+    """Rebuild whenever a contract module changes, until `stop` (a threading.Event) is set
+
+    `on_build(result, written, seconds)` is called after every build;
+    errors in the edited source are passed as `result` instead of raised.
+    """
+    stop = stop or threading.Event()
+    on_build = on_build or print_build
+    paths = source_paths()
+    seen = None
+    while not stop.is_set():
+        mtimes = _mtimes(paths)
+        if mtimes != seen:
+            reload = seen is not None
+            seen = mtimes
+            started = time.perf_counter()
+            try:
+                result, written = build_contract(version, output_dir, cache, reload)
+            except Exception as e:
+                result, written = e, []
+            on_build(result, written, time.perf_counter() - started)
+        stop.wait(interval)
+
+
+def print_build(result, written, seconds):
+    if isinstance(result, Exception):
+        print(f"✗ build failed: {type(result).__name__}: {result}")
+        return
+    source = "cached" if result.cached else "compiled"
+    files = ", ".join(os.path.basename(path) for path in written) or "no files changed"
+    print(f"✓ {result.fingerprint[:12]} {source} in {seconds * 1000:.1f} ms ({files})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the BountyBoard TEAL programs incrementally")
+    parser.add_argument("--watch", action="store_true", help="rebuild whenever the contract source changes")
+    parser.add_argument("--version", type=int, default=DEFAULT_TEAL_VERSION, help="TEAL version")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    options = parser.parse_args(argv)
+
+    if options.watch:
+        print(f"Watching {', '.join(os.path.basename(p) for p in source_paths())} (Ctrl+C to stop)")
+        try:
+            watch(options.version, options.output_dir, options.interval)
+        except KeyboardInterrupt:
+            pass
+        return
+    started = time.perf_counter()
+    result, written = build_contract(options.version, options.output_dir)
+    print_build(result, written, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
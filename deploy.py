@@ -3,111 +3,25 @@ Deployment script for BountyBoard Smart Contract
 Deploys to Algorand TestNet and saves ABI for frontend integration
 """
 
-from algosdk import account, mnemonic, transaction
-from algosdk.v2client import algod
+from algosdk import account, encoding, error, mnemonic, transaction
 from algosdk.logic import get_application_address
+from algosdk.v2client import models
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+import argparse
+import hashlib
 import json
-import base64
-
-
-# Contract ABI for frontend integration
-CONTRACT_ABI = {
-    "name": "BountyBoard",
-    "description": "Escrow marketplace for micro-tasks on Algorand",
-    "methods": [
-        {
-            "name": "create_task",
-            "args": [
-                {
-                    "type": "string",
-                    "name": "title",
-                    "description": "Task title"
-                },
-                {
-                    "type": "string",
-                    "name": "description",
-                    "description": "Task description"
-                },
-                {
-                    "type": "uint64",
-                    "name": "deadline",
-                    "description": "Unix timestamp deadline"
-                }
-            ],
-            "returns": {
-                "type": "uint64",
-                "description": "Task ID"
-            },
-            "description": "Create a new task with escrow payment (requires grouped payment transaction)"
-        },
-        {
-            "name": "claim_task",
-            "args": [
-                {
-                    "type": "uint64",
-                    "name": "task_id",
-                    "description": "Task ID to claim"
-                }
-            ],
-            "returns": {"type": "void"},
-            "description": "Claim an open task as a freelancer"
-        },
-        {
-            "name": "submit_work",
-            "args": [
-                {
-                    "type": "uint64",
-                    "name": "task_id",
-                    "description": "Task ID"
-                },
-                {
-                    "type": "string",
-                    "name": "proof_hash",
-                    "description": "IPFS hash or URL of work proof"
-                }
-            ],
-            "returns": {"type": "void"},
-            "description": "Submit work proof for a claimed task"
-        },
-        {
-            "name": "approve_task",
-            "args": [
-                {
-                    "type": "uint64",
-                    "name": "task_id",
-                    "description": "Task ID to approve"
-                }
-            ],
-            "returns": {"type": "void"},
-            "description": "Approve completed task and release payment to freelancer"
-        },
-        {
-            "name": "reject_task",
-            "args": [
-                {
-                    "type": "uint64",
-                    "name": "task_id",
-                    "description": "Task ID to reject"
-                }
-            ],
-            "returns": {"type": "void"},
-            "description": "Reject submitted work (allows resubmission)"
-        },
-        {
-            "name": "refund_task",
-            "args": [
-                {
-                    "type": "uint64",
-                    "name": "task_id",
-                    "description": "Task ID to refund"
-                }
-            ],
-            "returns": {"type": "void"},
-            "description": "Refund task if deadline passed or by client before work submitted"
-        }
-    ],
-    "networks": {}
-}
+import msgpack
+import os
+
+from bounty_board import CONTRACT_ABI
+from bounty_contract import TaskBox
+from compile_cache import JsonCache, compile_bytes
+from local_algod import make_algod_client
+from params_cache import params_provider, suggested_params
+from storage_cost import DEFAULT_DESCRIPTION_LEN, DEFAULT_TITLE_LEN, PACKED, project_funding
+from teal_vm import (ACCOUNT_MIN_BALANCE, APP_PAGE_MIN_BALANCE,
+                     SCHEMA_BYTES_MIN_BALANCE, SCHEMA_UINT_MIN_BALANCE)
 
 
 # Task status constants for frontend
@@ -120,56 +34,68 @@ TASK_STATUS = {
     "REFUNDED": 5
 }
 
+# Application layout (minimal - using boxes for storage)
+GLOBAL_UINTS = 1
+GLOBAL_BYTE_SLICES = 0
+EXTRA_PAGES = 3  # Extra pages for box storage
+
+FUND_AMOUNT_ALGO = 0.5
+
+SIMULATE_CACHE_DIR = os.environ.get("BOUNTYBOARD_SIMULATE_CACHE", ".simulate_cache")
 
-def get_algod_client():
-    """Connect to Algorand TestNet via public node"""
-    algod_address = "https://testnet-api.algonode.cloud"
-    algod_token = ""
-    return algod.AlgodClient(algod_token, algod_address)
+WAIT_ROUNDS = 4
+DEPLOY_WORKERS = 16
+DEPLOY_WAVE_SIZE = 256  # tenants whose transactions are in flight together
+
+
+def get_algod_client(network=None):
+    """Connect to Algorand TestNet via public node, or the network named by BOUNTYBOARD_NETWORK"""
+    return make_algod_client(network)
 
 
 def compile_teal(client, teal_source):
-    """Compile TEAL source code"""
-    compile_response = client.compile(teal_source)
-    return base64.b64decode(compile_response['result'])
+    """Compile TEAL source code (cached on disk by source hash)"""
+    return compile_bytes(client, teal_source)
+
 
+def read_programs():
+    """Approval and clear TEAL sources built from the PyTeal contract
 
-def deploy_contract(client, creator_private_key):
-    """Deploy the BountyBoard smart contract"""
+    The same build writes bounty_approval.teal and bounty_clear.teal, so
+    the deployed programs can never lag behind the contract source.
+    """
+    from contract_build import build
+    result = build()
+    return result.approval, result.clear
+
+
+def build_create_txn(client, creator_address, approval_teal, clear_teal, params=None):
+    """Unsigned application create transaction for the given TEAL sources"""
+    return transaction.ApplicationCreateTxn(
+        sender=creator_address,
+        sp=params or suggested_params(client),
+        on_complete=transaction.OnComplete.NoOpOC,
+        approval_program=compile_teal(client, approval_teal),
+        clear_program=compile_teal(client, clear_teal),
+        global_schema=transaction.StateSchema(num_uints=GLOBAL_UINTS, num_byte_slices=GLOBAL_BYTE_SLICES),
+        local_schema=transaction.StateSchema(num_uints=0, num_byte_slices=0),
+        extra_pages=EXTRA_PAGES
+    )
+
+
+def deploy_contract(client, creator_private_key, approval_teal=None, clear_teal=None):
+    """Deploy the BountyBoard smart contract (built from the PyTeal source unless sources are given)"""
     creator_address = account.address_from_private_key(creator_private_key)
     
-    # Read TEAL files
-    print("📄 Reading TEAL programs...")
-    with open('bounty_approval.teal', 'r') as f:
-        approval_teal = f.read()
-    
-    with open('bounty_clear.teal', 'r') as f:
-        clear_teal = f.read()
+    # Build TEAL programs
+    if approval_teal is None or clear_teal is None:
+        print("📄 Building TEAL programs...")
+        approval_teal, clear_teal = read_programs()
     
-    # Compile programs
+    # Compile programs and create application
     print("🔨 Compiling programs...")
-    approval_program = compile_teal(client, approval_teal)
-    clear_program = compile_teal(client, clear_teal)
-    
-    # Get suggested parameters
-    params = client.suggested_params()
-    
-    # Define schema (minimal - using boxes for storage)
-    global_schema = transaction.StateSchema(num_uints=1, num_byte_slices=0)
-    local_schema = transaction.StateSchema(num_uints=0, num_byte_slices=0)
-    
-    # Create application
     print("📝 Creating application transaction...")
-    txn = transaction.ApplicationCreateTxn(
-        sender=creator_address,
-        sp=params,
-        on_complete=transaction.OnComplete.NoOpOC,
-        approval_program=approval_program,
-        clear_program=clear_program,
-        global_schema=global_schema,
-        local_schema=local_schema,
-        extra_pages=3  # Extra pages for box storage
-    )
+    txn = build_create_txn(client, creator_address, approval_teal, clear_teal)
     
     # Sign transaction
     signed_txn = txn.sign(creator_private_key)
@@ -193,7 +119,7 @@ def deploy_contract(client, creator_private_key):
 def fund_application(client, funder_private_key, app_address, amount_in_algo):
     """Fund the application account for box storage and inner transactions"""
     funder_address = account.address_from_private_key(funder_private_key)
-    params = client.suggested_params()
+    params = suggested_params(client)
     
     amount_microalgos = int(amount_in_algo * 1_000_000)
     
@@ -212,12 +138,256 @@ def fund_application(client, funder_private_key, app_address, amount_in_algo):
     print(f"✅ Application funded with {amount_in_algo} ALGO")
 
 
-def save_deployment_info(app_id, app_address, creator_address, abi, status_enum):
-    """Save deployment information for frontend integration"""
-    deployment_info = {
+class Tenant(NamedTuple):
+    """One app instance to deploy: who creates it and how much to fund it"""
+    name: str
+    private_key: str
+    fund_amount: int  # microAlgos
+    app_id: Optional[int] = None  # already created, only fund it
+
+
+class DeployResult(NamedTuple):
+    name: str
+    app_id: Optional[int]
+    app_address: Optional[str]
+    create_txid: Optional[str]
+    fund_txid: Optional[str]
+    error: Optional[str]
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def wait_for_confirmations(client, txids, wait_rounds=WAIT_ROUNDS, executor=None):
+    """Wait for many transactions at once, polling each round
+
+    Returns {txid: pending info} for confirmed transactions and
+    {txid: exception} for rejected or timed out ones. Rounds seen are
+    reported to the client's ParamsProvider.
+    """
+    provider = params_provider(client)
+    pending = list(dict.fromkeys(txids))
+    results = {}
+    current_round = client.status()["last-round"]
+    last_round = current_round + wait_rounds
+    while pending:
+        provider.observe_round(current_round)
+        if executor is not None:
+            infos = list(executor.map(lambda txid: _pending_info(client, txid), pending))
+        else:
+            infos = [_pending_info(client, txid) for txid in pending]
+        still_pending = []
+        for txid, info in zip(pending, infos):
+            if isinstance(info, Exception):
+                results[txid] = info
+            elif info.get("confirmed-round", 0) > 0:
+                results[txid] = info
+                provider.observe_round(info["confirmed-round"])
+            elif info.get("pool-error"):
+                results[txid] = error.TransactionRejectedError(info["pool-error"])
+            else:
+                still_pending.append(txid)
+        pending = still_pending
+        if pending and current_round >= last_round:
+            for txid in pending:
+                results[txid] = error.ConfirmationTimeoutError(
+                    f"Wait for transaction id {txid} timed out")
+            break
+        if pending:
+            status = client.status_after_block(current_round)
+            current_round = max(current_round + 1, status["last-round"])
+    return results
+
+
+def _pending_info(client, txid):
+    try:
+        return client.pending_transaction_info(txid)
+    except error.AlgodHTTPError as e:
+        return e
+
+
+def _send(client, signed_txn):
+    """txid of a sent transaction, or the exception that rejected it"""
+    try:
+        return client.send_transaction(signed_txn)
+    except error.AlgodHTTPError as e:
+        return e
+
+
+def deploy_apps(client, tenants, approval_teal=None, clear_teal=None,
+                max_workers=DEPLOY_WORKERS, wave_size=DEPLOY_WAVE_SIZE, progress=None,
+                on_created=None, on_signed=None, on_fund_signed=None, on_funded=None):
+    """Create and fund one application per tenant; returns DeployResults in order
+
+    Programs are compiled once and suggested params come from the
+    client's shared ParamsProvider. Tenants go out in waves. The funding
+    cannot share a group with its create since the app address is only
+    known once the create is confirmed, so each wave's funding payments
+    go out with the next wave's creates: every transaction between two
+    waves is sent concurrently and confirmed by a single wait, N waves
+    taking N + 1 waits. `progress(done, total, result)` is called per
+    tenant, `on_created(tenant, app_id)` as soon as its create is
+    confirmed, or with None once it is rejected, and
+    `on_signed(tenant, txid, last_valid)` just before it is sent, so a
+    caller can record what may land if it is interrupted mid-wave.
+    `on_fund_signed` and `on_funded(tenant, txid)` do the same for the
+    funding payment, except that on_funded is left out whenever algod
+    could not say whether the payment was refused. Tenants with an app_id are only funded.
+    """
+    if approval_teal is None or clear_teal is None:
+        approval_teal, clear_teal = read_programs()
+    tenants = list(tenants)
+    approval_program = compile_teal(client, approval_teal)
+    clear_program = compile_teal(client, clear_teal)
+    results = []
+    provider = params_provider(client)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deploy") as executor:
+        # The previous wave and its creates, funded along with this wave's creates
+        previous = None
+        for start in range(0, len(tenants) + wave_size, wave_size):
+            wave = tenants[start:start + wave_size]
+            if not wave and previous is None:
+                break
+            params = provider.get()
+            creates = _send_creates(client, executor, wave, params, approval_program, clear_program,
+                                    on_signed)
+            payments = {}
+            if previous is not None:
+                payments = _send_funding(client, executor, *previous, params, on_fund_signed)
+            confirmations = wait_for_confirmations(
+                client, [txid for _, txid in (*creates.values(), *payments.values()) if isinstance(txid, str)],
+                executor=executor)
+            if previous is not None:
+                for result in _funding_results(*previous, payments, confirmations, on_funded):
+                    results.append(result)
+                    if progress is not None:
+                        progress(len(results), len(tenants), result)
+            created = _created(wave, creates, confirmations)
+            if on_created is not None:
+                for index, tenant in enumerate(wave):
+                    app_id = created[index][1]
+                    if tenant.app_id is None and not isinstance(app_id, error.ConfirmationTimeoutError):
+                        on_created(tenant, None if isinstance(app_id, Exception) else app_id)
+            previous = (wave, created) if wave else None
+    return results
+
+
+def _outcome(sent, confirmations):
+    """Confirmed info or error of one sent transaction, from its (signed, txid or error)"""
+    _, txid = sent
+    return confirmations.get(txid, txid) if isinstance(txid, str) else txid
+
+
+def _send_creates(client, executor, wave, params, approval_program, clear_program, on_signed=None):
+    """Send every create of the wave; returns {index: (signed, txid or error)}"""
+    signed = {}
+    for index, tenant in enumerate(wave):
+        if tenant.app_id is not None:
+            continue
+        txn = transaction.ApplicationCreateTxn(
+            sender=account.address_from_private_key(tenant.private_key),
+            sp=params,
+            on_complete=transaction.OnComplete.NoOpOC,
+            approval_program=approval_program,
+            clear_program=clear_program,
+            global_schema=transaction.StateSchema(num_uints=GLOBAL_UINTS, num_byte_slices=GLOBAL_BYTE_SLICES),
+            local_schema=transaction.StateSchema(num_uints=0, num_byte_slices=0),
+            extra_pages=EXTRA_PAGES,
+            # Identical creates from one sender would share a txid
+            note=f"bountyboard:{tenant.name}".encode()
+        )
+        signed[index] = txn.sign(tenant.private_key)
+        if on_signed is not None:
+            on_signed(tenant, signed[index].get_txid(), txn.last_valid_round)
+    indexes = list(signed)
+    return {index: (signed[index], txid)
+            for index, txid in zip(indexes, executor.map(lambda index: _send(client, signed[index]), indexes))}
+
+
+def _created(wave, creates, confirmations):
+    """{index: (create txid, app_id or error)} of a wave whose creates were waited for"""
+    created = {}
+    for index, tenant in enumerate(wave):
+        if tenant.app_id is not None:
+            created[index] = (None, tenant.app_id)
+            continue
+        outcome = _outcome(creates[index], confirmations)
+        if isinstance(outcome, Exception):
+            created[index] = (creates[index][0].get_txid(), outcome)
+        else:
+            created[index] = (creates[index][1], outcome["application-index"])
+    return created
+
+
+def _send_funding(client, executor, wave, created, params, on_signed=None):
+    """Send the funding payment of every created app; returns {index: (signed, txid or error)}"""
+    signed = {}
+    for index, tenant in enumerate(wave):
+        create_txid, app_id = created[index]
+        if isinstance(app_id, Exception) or not tenant.fund_amount:
+            continue
+        txn = transaction.PaymentTxn(
+            sender=account.address_from_private_key(tenant.private_key),
+            sp=params,
+            receiver=get_application_address(app_id),
+            amt=tenant.fund_amount
+        )
+        signed[index] = txn.sign(tenant.private_key)
+        if on_signed is not None:
+            on_signed(tenant, signed[index].get_txid(), txn.last_valid_round)
+    indexes = list(signed)
+    return {index: (signed[index], txid)
+            for index, txid in zip(indexes, executor.map(lambda index: _send(client, signed[index]), indexes))}
+
+
+def _funding_results(wave, created, payments, confirmations, on_funded=None):
+    """DeployResults of a wave whose funding payments were waited for"""
+    if on_funded is not None:
+        for index, sent in payments.items():
+            outcome = _outcome(sent, confirmations)
+            if not isinstance(outcome, Exception):
+                on_funded(wave[index], sent[1])
+            elif isinstance(outcome, error.TransactionRejectedError) or getattr(outcome, "code", None) == 400:
+                on_funded(wave[index], None)
+    for index, tenant in enumerate(wave):
+        create_txid, app_id = created[index]
+        if isinstance(app_id, Exception):
+            yield DeployResult(tenant.name, None, None, create_txid, None, f"create failed: {app_id}")
+            continue
+        app_address = get_application_address(app_id)
+        if index not in payments:
+            yield DeployResult(tenant.name, app_id, app_address, create_txid, None, None)
+            continue
+        outcome = _outcome(payments[index], confirmations)
+        if isinstance(outcome, Exception):
+            yield DeployResult(tenant.name, app_id, app_address, create_txid,
+                               payments[index][0].get_txid(), f"funding failed: {outcome}")
+        else:
+            yield DeployResult(tenant.name, app_id, app_address, create_txid, payments[index][1], None)
+
+
+def deploy_and_fund(client, creator_private_key, fund_amount_algo=FUND_AMOUNT_ALGO,
+                    approval_teal=None, clear_teal=None):
+    """Deploy and fund one application; returns its DeployResult"""
+    tenant = Tenant("default", creator_private_key, int(fund_amount_algo * 1_000_000))
+    return deploy_apps(client, [tenant], approval_teal, clear_teal)[0]
+
+
+def print_progress(done, total, result):
+    """Default progress reporter for deploy_apps()"""
+    if result.ok:
+        print(f"   [{done}/{total}] ✅ {result.name}: app {result.app_id}")
+    else:
+        print(f"   [{done}/{total}] ❌ {result.name}: {result.error}")
+
+
+def deployment_info(app_id, app_address, creator_address, abi, status_enum, network="testnet"):
+    """Deployment information for frontend integration"""
+    return {
         "contractName": "BountyBoard",
         "version": "1.0.0",
-        "network": "testnet",
+        "network": network,
         "appId": app_id,
         "appAddress": app_address,
         "creator": creator_address,
@@ -225,29 +395,40 @@ def save_deployment_info(app_id, app_address, creator_address, abi, status_enum)
         "abi": abi,
         "taskStatus": status_enum,
         "boxSchema": {
-            "description": "Tasks are stored in boxes with the following keys",
-            "keys": [
-                "{task_id}_client",
-                "{task_id}_freelancer",
-                "{task_id}_amount",
-                "{task_id}_deadline",
-                "{task_id}_status",
-                "{task_id}_title",
-                "{task_id}_description",
-                "{task_id}_proof"
-            ]
+            "description": "One box per task named \"task_\" + the 8-byte big-endian task id, "
+                           "holding fixed-width fields at these byte offsets",
+            "key": "task_{task_id:uint64}",
+            "fields": {
+                "client": {"offset": TaskBox.CLIENT, "type": "address"},
+                "freelancer": {"offset": TaskBox.FREELANCER, "type": "address"},
+                "amount": {"offset": TaskBox.AMOUNT, "type": "uint64"},
+                "deadline": {"offset": TaskBox.DEADLINE, "type": "uint64"},
+                "status": {"offset": TaskBox.STATUS, "type": "uint8"},
+                "proof": {"offset": TaskBox.PROOF, "type": f"uint8 length + {TaskBox.PROOF_MAX} bytes"},
+                "title": {"offset": TaskBox.TITLE, "type": "uint16 length + bytes"},
+                "description": {"offset": "after title", "type": "uint16 length + bytes"}
+            }
         },
         "notes": {
             "create_task": "Requires atomic group with payment transaction first",
+            "create_tasks_batch": "Up to 8 tasks per call (one box reference each), args limited to 2KB in total",
             "deadline": "Unix timestamp in seconds",
             "amounts": "In microAlgos (1 ALGO = 1,000,000 microAlgos)",
-            "minimum_balance": "Contract needs ~0.5 ALGO for box storage per task"
+            "minimum_balance": (
+                "Each box locks 2500 + 400 * (name + size) microAlgos; a task with a "
+                f"{DEFAULT_TITLE_LEN}-byte title and {DEFAULT_DESCRIPTION_LEN}-byte description "
+                f"locks {PACKED.task_mbr(DEFAULT_TITLE_LEN, DEFAULT_DESCRIPTION_LEN)} "
+                "(see storage_cost.py)"
+            )
         }
     }
-    
+
+
+def save_deployment_info(app_id, app_address, creator_address, abi, status_enum):
+    """Save deployment information for frontend integration"""
     # Save as JSON
     with open('contract.json', 'w') as f:
-        json.dump(deployment_info, f, indent=2)
+        json.dump(deployment_info(app_id, app_address, creator_address, abi, status_enum), f, indent=2)
     
     # Save ABI separately for easy integration
     with open('contract-abi.json', 'w') as f:
@@ -258,8 +439,148 @@ def save_deployment_info(app_id, app_address, creator_address, abi, status_enum)
     print("   ✓ contract-abi.json (ABI only)")
 
 
+def group_hash(txns, *extra):
+    """Content hash of a transaction group, ignoring its validity window
+
+    First/last valid rounds change with every fetch of suggested params,
+    so they are left out: an identical retry hashes the same.
+    """
+    digest = hashlib.sha256()
+    for txn in txns:
+        fields = txn.dictify()
+        fields.pop("fv", None)
+        fields.pop("lv", None)
+        digest.update(msgpack.packb(encoding._sort_dict(fields), use_bin_type=True))
+    for part in extra:
+        digest.update(b"\0" + str(part).encode())
+    return digest.hexdigest()
+
+
+def _simulate_groups(client, *signed_groups):
+    """algod's simulate results for signed groups evaluated in order
+
+    Each group sees the effects of the ones before it, so a later group
+    can spend what an earlier one left.
+    """
+    request = models.SimulateRequest(
+        txn_groups=[models.SimulateRequestTransactionGroup(txns=signed_txns)
+                    for signed_txns in signed_groups])
+    return client.simulate_transactions(request)["txn-groups"]
+
+
+def simulate_deployment(client, creator_private_key, approval_teal=None, clear_teal=None,
+                        fund_amount_algo=FUND_AMOUNT_ALGO, cache=None):
+    """Dry-run the deployment (create, then fund) and report what it will cost
+
+    Nothing is committed. Results are cached by the hash of the
+    transactions, so retrying an unchanged deployment does not simulate
+    again; the creator's balance is checked against them every time.
+    The predicted app id changes whenever anyone creates an app, so it
+    is not cached: it is None for a cached report.
+    """
+    creator_address = account.address_from_private_key(creator_private_key)
+    if approval_teal is None or clear_teal is None:
+        approval_teal, clear_teal = read_programs()
+    cache = cache or JsonCache(SIMULATE_CACHE_DIR)
+    fund_microalgos = int(fund_amount_algo * 1_000_000)
+
+    params = suggested_params(client)
+    create_txn = build_create_txn(client, creator_address, approval_teal, clear_teal, params)
+    key = group_hash([create_txn], fund_microalgos)
+    report = cache.get(key)
+    if report is not None:
+        cache.hits += 1
+        report["cached"] = True
+        report["predicted_app_id"] = None
+    else:
+        cache.misses += 1
+        report = _simulate_deployment(client, creator_private_key, create_txn, params, fund_microalgos)
+        if report["ok"]:
+            cache.put(key, {k: v for k, v in report.items() if k != "predicted_app_id"})
+        report["cached"] = False
+
+    balance = client.account_info(creator_address)["amount"]
+    report["balance"] = balance
+    report["sufficient"] = report["ok"] and balance >= report["required_balance"]
+    return report
+
+
+def _simulate_deployment(client, creator_private_key, create_txn, params, fund_microalgos):
+    """Simulate the create alone to learn the app id, then create and fund as one sequence
+
+    The funding payment is simulated after the create in the same
+    request, so it is checked against the creator's balance once the
+    create's fee and minimum balance increase are taken.
+    """
+    signed_create = create_txn.sign(creator_private_key)
+    create = _simulate_groups(client, [signed_create])[0]
+    app_id = None
+    if "failure-message" not in create:
+        app_id = create["txn-results"][0]["txn-result"].get("application-index")
+    fees = create_txn.fee
+    if app_id:
+        fund_txn = transaction.PaymentTxn(
+            sender=create_txn.sender, sp=params,
+            receiver=get_application_address(app_id), amt=fund_microalgos)
+        groups = _simulate_groups(client, [signed_create], [fund_txn.sign(creator_private_key)])
+        create = groups[0]
+        fees += fund_txn.fee
+    else:
+        groups = [create]
+    failed = next((group for group in groups if "failure-message" in group), None)
+    report = {
+        "ok": failed is None,
+        "error": failed["failure-message"] if failed else None,
+        "opcode_cost": create.get("app-budget-consumed", 0),
+        "opcode_budget": create.get("app-budget-added", 0),
+    }
+
+    creator_mbr = (APP_PAGE_MIN_BALANCE * (1 + EXTRA_PAGES)
+                   + SCHEMA_UINT_MIN_BALANCE * GLOBAL_UINTS
+                   + SCHEMA_BYTES_MIN_BALANCE * GLOBAL_BYTE_SLICES)
+    report.update({
+        "predicted_app_id": app_id,
+        "fees": fees,
+        "creator_mbr_increase": creator_mbr,
+        "app_account_mbr": ACCOUNT_MIN_BALANCE,
+        "fund_amount": fund_microalgos,
+        # The creator keeps its own base minimum balance on top of all this
+        "required_balance": ACCOUNT_MIN_BALANCE + creator_mbr + fees + fund_microalgos,
+    })
+    if report["ok"] and fund_microalgos < ACCOUNT_MIN_BALANCE:
+        report["ok"] = False
+        report["error"] = f"funding {fund_microalgos} is below the app account minimum {ACCOUNT_MIN_BALANCE}"
+    return report
+
+
+def print_simulation(report):
+    """Human readable simulation report"""
+    status = "✅ Simulation passed" if report["ok"] else f"❌ Simulation failed: {report['error']}"
+    print(status + (" (cached)" if report["cached"] else ""))
+    predicted = report["predicted_app_id"]
+    print(f"   Predicted App ID:    {predicted if predicted is not None else 'not predicted for a cached result'}")
+    print(f"   Opcode cost:         {report['opcode_cost']} / {report['opcode_budget']}")
+    print(f"   Fees:                {report['fees'] / 1_000_000:.6f} ALGO")
+    print(f"   Creator MBR:        +{report['creator_mbr_increase'] / 1_000_000:.6f} ALGO")
+    print(f"   App account MBR:     {report['app_account_mbr'] / 1_000_000:.6f} ALGO")
+    print(f"   Funding:             {report['fund_amount'] / 1_000_000:.6f} ALGO")
+    print(f"   Required balance:    {report['required_balance'] / 1_000_000:.6f} ALGO")
+    print(f"   Your balance:        {report['balance'] / 1_000_000:.6f} ALGO")
+
+
 def main():
     """Main deployment function"""
+    parser = argparse.ArgumentParser(description="Deploy the BountyBoard contract")
+    parser.add_argument("--simulate", action="store_true",
+                        help="dry-run the deployment and report its cost without sending anything")
+    parser.add_argument("--network", help="network name (defaults to BOUNTYBOARD_NETWORK)")
+    parser.add_argument("--tasks", type=int,
+                        help=f"fund box storage for this many tasks instead of {FUND_AMOUNT_ALGO} ALGO")
+    options = parser.parse_args()
+    fund_amount_algo = FUND_AMOUNT_ALGO
+    if options.tasks is not None:
+        fund_amount_algo = project_funding(PACKED, options.tasks).required_balance / 1_000_000
+    
     print("=" * 70)
     print("  BountyBoard Smart Contract Deployment")
     print("  Algorand TestNet")
@@ -284,18 +605,21 @@ def main():
         
         # Connect to TestNet
         print("\n🌐 Connecting to Algorand TestNet...")
-        client = get_algod_client()
-        
-        # Check balance
-        account_info = client.account_info(deployer_address)
-        balance_algo = account_info['amount'] / 1_000_000
+        client = get_algod_client(options.network)
         print(f"✅ Connected")
-        print(f"   Balance: {balance_algo:.6f} ALGO")
         
-        if balance_algo < 0.5:
+        # Dry-run the deployment before spending anything
+        print("\n🧪 Simulating deployment...")
+        report = simulate_deployment(client, deployer_private_key, fund_amount_algo=fund_amount_algo)
+        print_simulation(report)
+        
+        if options.simulate or not report["ok"]:
+            return
+        
+        if not report["sufficient"]:
             print("\n❌ Error: Insufficient balance")
-            print(f"   Required: ~0.5 ALGO minimum")
-            print(f"   Your balance: {balance_algo:.6f} ALGO")
+            print(f"   Required: {report['required_balance'] / 1_000_000:.6f} ALGO")
+            print(f"   Your balance: {report['balance'] / 1_000_000:.6f} ALGO")
             print("\n💡 Get TestNet ALGO from:")
             print("   https://bank.testnet.algorand.network/")
             return
@@ -304,16 +628,16 @@ def main():
         print("  Deployment")
         print("=" * 70)
         
-        # Deploy contract
-        app_id = deploy_contract(client, deployer_private_key)
-        app_address = get_application_address(app_id)
+        # Deploy and fund contract
+        print("🚀 Creating and funding application...")
+        result = deploy_and_fund(client, deployer_private_key, fund_amount_algo)
+        if not result.ok:
+            raise RuntimeError(result.error)
+        app_id, app_address = result.app_id, result.app_address
         
+        print(f"✅ Application deployed and funded with {fund_amount_algo} ALGO")
         print(f"\n📍 Contract Address: {app_address}")
         
-        # Fund application
-        print("\n💰 Funding application account...")
-        fund_application(client, deployer_private_key, app_address, 0.5)
-        
         # Save deployment info
         print("\n💾 Saving deployment information...")
         save_deployment_info(app_id, app_address, deployer_address, CONTRACT_ABI, TASK_STATUS)
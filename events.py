@@ -0,0 +1,224 @@
+"""
+Typed decoder and streaming pipeline for BountyBoard event logs
+bounty_contract.py logs `<event>:` followed by an 8-byte task id;
+bounty_board.py's TEAL logs ARC-4 return values behind 0x151f7c75.
+Transactions are tailed from an indexer (or the local stand-in),
+decoded in batches and fanned out to subscribers with backpressure.
+"""
+
+import base64
+import queue
+import threading
+import time
+from typing import NamedTuple, Tuple
+
+
+ARC4_RETURN_PREFIX = bytes.fromhex("151f7c75")
+
+TASK_CREATED = "task_created"
+TASK_CLAIMED = "task_claimed"
+WORK_SUBMITTED = "work_submitted"
+TASK_APPROVED = "task_approved"
+TASK_REJECTED = "task_rejected"
+TASK_REFUNDED = "task_refunded"
+METHOD_RETURN = "method_return"
+
+EVENT_KINDS = (TASK_CREATED, TASK_CLAIMED, WORK_SUBMITTED,
+               TASK_APPROVED, TASK_REJECTED, TASK_REFUNDED)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_QUEUE_SIZE = 1024
+
+
+class TaskEvent(NamedTuple):
+    """A `<kind>:` + itob(task_id) log and the app call that emitted it"""
+    kind: str
+    task_id: int
+    round: int
+    txid: str
+    sender: str
+    args: Tuple[bytes, ...]
+
+
+class ReturnEvent(NamedTuple):
+    """An ARC-4 return value logged behind the 0x151f7c75 prefix"""
+    value: bytes
+    round: int
+    txid: str
+    sender: str
+    args: Tuple[bytes, ...]
+
+    kind = METHOD_RETURN
+
+    def as_uint64(self):
+        return int.from_bytes(self.value[:8], "big")
+
+
+def decode_log(raw, round=0, txid="", sender="", args=()):
+    """TaskEvent or ReturnEvent for one raw log, None if it is neither"""
+    if raw.startswith(ARC4_RETURN_PREFIX):
+        return ReturnEvent(raw[len(ARC4_RETURN_PREFIX):], round, txid, sender, args)
+    kind, sep, task_id = raw.partition(b":")
+    if not sep or len(task_id) != 8:
+        return None
+    kind = kind.decode("ascii", "replace")
+    if kind not in EVENT_KINDS:
+        return None
+    return TaskEvent(kind, int.from_bytes(task_id, "big"), round, txid, sender, args)
+
+
+def decode_transaction(txn):
+    """Events logged by one indexer-format app call, in log order"""
+    logs = txn.get("logs")
+    if not logs:
+        return []
+    args = tuple(base64.b64decode(arg)
+                 for arg in txn.get("application-transaction", {}).get("application-args", []))
+    round_, txid, sender = txn.get("confirmed-round", 0), txn.get("id", ""), txn.get("sender", "")
+    events = []
+    for log in logs:
+        event = decode_log(base64.b64decode(log), round_, txid, sender, args)
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def decode_batches(batches):
+    """Turn batches of indexer transactions into batches of events"""
+    for batch in batches:
+        events = []
+        for txn in batch:
+            events.extend(decode_transaction(txn))
+        if events:
+            yield events
+
+
+def tail_transactions(indexer_client, app_id, min_round=0, follow=True,
+                      batch_size=DEFAULT_BATCH_SIZE, poll_interval=DEFAULT_POLL_INTERVAL,
+                      stop=None):
+    """Yield batches of app calls to `app_id` confirmed at or after `min_round`
+
+    With `follow` the generator keeps polling for new rounds every
+    `poll_interval` seconds until `stop` (a threading.Event) is set;
+    otherwise it ends once it has caught up.
+    """
+    next_round = min_round
+    while stop is None or not stop.is_set():
+        next_page = None
+        caught_up_to = next_round - 1
+        while True:
+            response = indexer_client.search_transactions(
+                application_id=app_id, min_round=next_round,
+                limit=batch_size, next_page=next_page)
+            transactions = response["transactions"]
+            caught_up_to = max(caught_up_to, response.get("current-round", 0))
+            if transactions:
+                caught_up_to = max(caught_up_to, transactions[-1]["confirmed-round"])
+                yield transactions
+            next_page = response.get("next-token")
+            if not next_page or not transactions:
+                break
+        next_round = caught_up_to + 1
+        if not follow:
+            return
+        if stop is not None:
+            stop.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+
+
+_CLOSED = object()
+
+
+class Subscription:
+    """Bounded queue of events for one subscriber; iterate to consume
+
+    Closing sets a flag besides queueing the end-of-stream marker, so a
+    queue that is full at close still ends once it has been drained.
+    """
+
+    def __init__(self, kinds=None, maxsize=DEFAULT_QUEUE_SIZE):
+        self.kinds = frozenset(kinds) if kinds else None
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._closed = threading.Event()
+
+    def wants(self, event):
+        return self.kinds is None or event.kind in self.kinds
+
+    def _close(self):
+        self._closed.set()
+        try:
+            self._queue.put_nowait(_CLOSED)
+        except queue.Full:
+            pass
+
+    def get(self, timeout=None):
+        """Next event, or None once the bus is closed"""
+        if self._closed.is_set():
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                return None
+        else:
+            event = self._queue.get(timeout=timeout)
+        return None if event is _CLOSED else event
+
+    def __iter__(self):
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            yield event
+
+
+class EventBus:
+    """Fan events out to subscribers
+
+    publish() blocks while any interested subscriber's queue is full,
+    so a slow consumer throttles the tail instead of growing memory.
+    """
+
+    def __init__(self):
+        self._subscriptions = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, kinds=None, maxsize=DEFAULT_QUEUE_SIZE):
+        subscription = Subscription(kinds, maxsize)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.remove(subscription)
+
+    def publish(self, events):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for event in events:
+            for subscription in subscriptions:
+                if subscription.wants(event):
+                    subscription._queue.put(event)
+
+    def close(self):
+        """Signal end of stream to every subscriber"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription._close()
+
+
+def run_pipeline(indexer_client, app_id, bus, min_round=0, follow=True,
+                 batch_size=DEFAULT_BATCH_SIZE, poll_interval=DEFAULT_POLL_INTERVAL, stop=None):
+    """Tail, decode and publish events until caught up (or stopped); returns events published"""
+    published = 0
+    try:
+        batches = tail_transactions(indexer_client, app_id, min_round, follow,
+                                    batch_size, poll_interval, stop)
+        for events in decode_batches(batches):
+            bus.publish(events)
+            published += len(events)
+    finally:
+        bus.close()
+    return published
@@ -0,0 +1,433 @@
+"""
+Non-interactive fleet deployment: one BountyBoard app per tenant
+Reads a JSON manifest, deploys through deploy.deploy_apps() with rate
+limited algod access, checkpoints progress so an interrupted rollout
+resumes where it stopped (without creating or funding an app twice), and writes one contract.json per tenant.
+
+Manifest:
+
+    {
+      "network": "testnet",
+      "fund_amount": 0.5,
+      "signer": "env:DEPLOYER_MNEMONIC",
+      "tenants": [
+        {"name": "acme"},
+        {"name": "globex", "fund_amount": 1.0, "signer": "file:keys/globex.txt"}
+      ]
+    }
+
+Tenant entries override the top-level network, fund_amount (ALGO) and
+signer. A signer reference is "env:VAR" or "file:PATH", either holding
+a 25-word mnemonic.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+
+from algosdk import account, error, mnemonic
+from algosdk.logic import get_application_address
+from algosdk.v2client import algod
+
+import deploy
+from async_client import PooledAlgodClient
+from bounty_board import CONTRACT_ABI
+from local_algod import make_algod_client
+
+
+DEFAULT_OUTPUT_DIR = "deployments"
+DEFAULT_CHECKPOINT = "fleet-checkpoint.json"
+DEFAULT_RATE = 50  # algod requests per second, per network
+
+SENDING = "sending"
+CREATED = "created"
+FUNDING = "funding"
+DEPLOYED = "deployed"
+
+
+def resolve_signer(reference):
+    """Private key for a signer reference ("env:VAR" or "file:PATH")"""
+    kind, sep, value = reference.partition(":")
+    if not sep:
+        raise ValueError(f"Signer reference '{reference}' must look like env:VAR or file:PATH")
+    if kind == "env":
+        try:
+            words = os.environ[value]
+        except KeyError:
+            raise ValueError(f"Signer environment variable {value} is not set")
+    elif kind == "file":
+        with open(value, "r") as f:
+            words = f.read()
+    else:
+        raise ValueError(f"Unknown signer kind '{kind}', expected env or file")
+    return mnemonic.to_private_key(words.strip())
+
+
+def load_manifest(path):
+    """Tenant entries of a manifest with the top-level defaults applied"""
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    defaults = {key: manifest[key] for key in ("network", "fund_amount", "signer") if key in manifest}
+    entries = []
+    names = set()
+    for tenant in manifest["tenants"]:
+        entry = {**defaults, **tenant}
+        if entry["name"] in names:
+            raise ValueError(f"Duplicate tenant name '{entry['name']}'")
+        names.add(entry["name"])
+        entry.setdefault("network", None)
+        entry.setdefault("fund_amount", deploy.FUND_AMOUNT_ALGO)
+        if "signer" not in entry:
+            raise ValueError(f"Tenant '{entry['name']}' has no signer")
+        entries.append(entry)
+    return entries
+
+
+class RateLimiter:
+    """Token bucket shared between threads: at most `rate` acquisitions per second"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedClient:
+    """Algod client wrapper that takes a RateLimiter token per request"""
+
+    def __init__(self, client, limiter):
+        self._client = client
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if not callable(attribute):
+            return attribute
+
+        def limited(*args, **kwargs):
+            self._limiter.acquire()
+            return attribute(*args, **kwargs)
+        return limited
+
+
+class Checkpoint:
+    """Per-tenant progress persisted as JSON after every change
+
+    A tenant is SENDING from just before its create is sent (with the
+    create's txid and last valid round), CREATED once its app exists,
+    FUNDING from just before its funding payment is sent (with that
+    payment's txid and last valid round) and DEPLOYED once funded, so a
+    resumed run never creates a second app for the same tenant nor pays
+    it twice (see recover_creates() and recover_funding()).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r") as f:
+                self.tenants = json.load(f)
+        except FileNotFoundError:
+            self.tenants = {}
+
+    def get(self, name):
+        return self.tenants.get(name)
+
+    def record(self, name, **fields):
+        with self._lock:
+            self.tenants[name] = {**self.tenants.get(name, {}), **fields}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.tenants, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def _client_for(network, rate, pool_size):
+    client = make_algod_client(network)
+    if isinstance(client, algod.AlgodClient):
+        client = PooledAlgodClient(client.algod_token, client.algod_address,
+                                   client.headers, pool_size)
+    return RateLimitedClient(client, RateLimiter(rate)) if rate else client
+
+
+def write_tenant_contract(output_dir, name, network, app_id, app_address, creator_address):
+    """Write <output_dir>/<name>/contract.json; returns its path"""
+    directory = os.path.join(output_dir, name)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "contract.json")
+    info = deploy.deployment_info(app_id, app_address, creator_address, CONTRACT_ABI,
+                                  deploy.TASK_STATUS, network)
+    with open(path, "w") as f:
+        json.dump(info, f, indent=2)
+    return path
+
+
+def recover_creates(client, pending, checkpoint):
+    """Outcome of creates an interrupted run sent: ({name: app_id or None}, unresolved names)
+
+    `pending` maps the names of SENDING tenants to their creator address.
+    Each create is looked up by txid, and waited for if still in the
+    pool. One algod no longer knows about is matched to an app its
+    creator made after it was signed that no tenant has claimed. None
+    means the create never landed; a create neither found nor past its
+    last valid round could still confirm, so it is left unresolved.
+    """
+    resolved = {}
+    unresolved = set()
+    waiting = {}
+    for name in pending:
+        txid = checkpoint.get(name)["create_txid"]
+        try:
+            info = client.pending_transaction_info(txid)
+        except error.AlgodHTTPError as e:
+            if e.code != 404:
+                raise
+            continue
+        if info.get("confirmed-round", 0) > 0:
+            resolved[name] = info["application-index"]
+        elif info.get("pool-error"):
+            resolved[name] = None
+        else:
+            waiting[txid] = name
+    if waiting:
+        for txid, outcome in deploy.wait_for_confirmations(client, list(waiting)).items():
+            if isinstance(outcome, error.ConfirmationTimeoutError):
+                unresolved.add(waiting[txid])
+            elif isinstance(outcome, error.TransactionRejectedError):
+                resolved[waiting[txid]] = None
+            elif not isinstance(outcome, Exception):
+                resolved[waiting[txid]] = outcome["application-index"]
+
+    claimed = {state.get("app_id") for state in checkpoint.tenants.values()} | set(resolved.values())
+    current_round = client.status()["last-round"]
+    created_apps = {}
+    for name, creator in pending.items():
+        if name in resolved or name in unresolved:
+            continue
+        state = checkpoint.get(name)
+        if creator not in created_apps:
+            apps = client.account_info(creator).get("created-apps", [])
+            created_apps[creator] = sorted(app["id"] for app in apps)
+        unclaimed = [app_id for app_id in created_apps[creator]
+                     if app_id > state["created_after"] and app_id not in claimed]
+        if unclaimed:
+            resolved[name] = unclaimed[0]
+            claimed.add(unclaimed[0])
+        elif current_round > state["last_valid"]:
+            resolved[name] = None
+        else:
+            unresolved.add(name)
+    return resolved, unresolved
+
+
+def recover_funding(client, pending, checkpoint):
+    """Outcome of funding payments an interrupted run sent: ({name: landed}, unresolved names)
+
+    `pending` maps the names of FUNDING tenants to their fund amount in
+    microAlgos. Each payment is looked up by txid, and waited for if
+    still in the pool. One algod no longer knows about has landed if the
+    app account holds the fund amount, and never will once past its last
+    valid round; before that it could still confirm, so it is left
+    unresolved.
+    """
+    resolved = {}
+    unresolved = set()
+    waiting = {}
+    for name in pending:
+        txid = checkpoint.get(name)["fund_txid"]
+        try:
+            info = client.pending_transaction_info(txid)
+        except error.AlgodHTTPError as e:
+            if e.code != 404:
+                raise
+            continue
+        if info.get("confirmed-round", 0) > 0:
+            resolved[name] = True
+        elif info.get("pool-error"):
+            resolved[name] = False
+        else:
+            waiting[txid] = name
+    if waiting:
+        for txid, outcome in deploy.wait_for_confirmations(client, list(waiting)).items():
+            if isinstance(outcome, error.ConfirmationTimeoutError):
+                unresolved.add(waiting[txid])
+            elif isinstance(outcome, error.TransactionRejectedError):
+                resolved[waiting[txid]] = False
+            elif not isinstance(outcome, Exception):
+                resolved[waiting[txid]] = True
+
+    current_round = client.status()["last-round"]
+    for name, fund_amount in pending.items():
+        if name in resolved or name in unresolved:
+            continue
+        state = checkpoint.get(name)
+        balance = client.account_info(get_application_address(state["app_id"]))["amount"]
+        if balance >= fund_amount:
+            resolved[name] = True
+        elif current_round > state["last_valid"]:
+            resolved[name] = False
+        else:
+            unresolved.add(name)
+    return resolved, unresolved
+
+
+def _record_deployed(checkpoint, output_dir, network, result, creator):
+    path = write_tenant_contract(output_dir, result.name, network or "default",
+                                 result.app_id, result.app_address, creator)
+    checkpoint.record(result.name, status=DEPLOYED, app_id=result.app_id,
+                      app_address=result.app_address, network=network, contract=path,
+                      error=None)
+
+
+def run_fleet(entries, checkpoint, output_dir=DEFAULT_OUTPUT_DIR, approval_teal=None, clear_teal=None,
+              workers=deploy.DEPLOY_WORKERS, rate=DEFAULT_RATE, wave_size=deploy.DEPLOY_WAVE_SIZE,
+              progress=deploy.print_progress, clients=None):
+    """Deploy every manifest entry not yet DEPLOYED; returns the DeployResults of this run
+
+    Entries are grouped by network, each network getting its own rate
+    limited client (or the one given in `clients`). Creates and funding
+    payments a previous run left SENDING or FUNDING are resolved first;
+    a tenant whose create or payment may still confirm is reported as
+    failed and not sent again.
+    """
+    if approval_teal is None or clear_teal is None:
+        approval_teal, clear_teal = deploy.read_programs()
+    clients = dict(clients or {})
+    signers = {}
+    by_network = {}
+    for entry in entries:
+        state = checkpoint.get(entry["name"]) or {}
+        if state.get("status") == DEPLOYED:
+            continue
+        reference = entry["signer"]
+        if reference not in signers:
+            signers[reference] = resolve_signer(reference)
+        by_network.setdefault(entry["network"], []).append((entry, signers[reference]))
+
+    results = []
+    for network, network_entries in by_network.items():
+        if network not in clients:
+            clients[network] = _client_for(network, rate, workers)
+        client = clients[network]
+        creators = {entry["name"]: account.address_from_private_key(private_key)
+                    for entry, private_key in network_entries}
+        pending = {name: creators[name] for name in creators
+                   if (checkpoint.get(name) or {}).get("status") == SENDING}
+        resolved, unresolved = recover_creates(client, pending, checkpoint) if pending else ({}, set())
+        for name, app_id in resolved.items():
+            status = CREATED if app_id is not None else None
+            checkpoint.record(name, status=status, app_id=app_id, network=network)
+
+        funding = {entry["name"]: int(entry["fund_amount"] * 1_000_000) for entry, _ in network_entries
+                   if (checkpoint.get(entry["name"]) or {}).get("status") == FUNDING}
+        funded, unfunded = recover_funding(client, funding, checkpoint) if funding else ({}, set())
+        for name, landed in funded.items():
+            state = checkpoint.get(name)
+            if not landed:
+                checkpoint.record(name, status=CREATED)
+                continue
+            result = deploy.DeployResult(name, state["app_id"], get_application_address(state["app_id"]),
+                                         state.get("create_txid"), state["fund_txid"], None)
+            _record_deployed(checkpoint, output_dir, network, result, creators[name])
+            results.append(result)
+
+        tenants = []
+        for entry, private_key in network_entries:
+            state = checkpoint.get(entry["name"]) or {}
+            if state.get("status") == DEPLOYED:
+                continue
+            if entry["name"] in unresolved:
+                results.append(deploy.DeployResult(
+                    entry["name"], None, None, state["create_txid"], None,
+                    f"create {state['create_txid']} may still confirm until round "
+                    f"{state['last_valid']}; rerun after that round"))
+                continue
+            if entry["name"] in unfunded:
+                results.append(deploy.DeployResult(
+                    entry["name"], state["app_id"], get_application_address(state["app_id"]),
+                    state.get("create_txid"), state["fund_txid"],
+                    f"funding {state['fund_txid']} may still confirm until round "
+                    f"{state['last_valid']}; rerun after that round"))
+                continue
+            tenants.append(deploy.Tenant(entry["name"], private_key,
+                                         int(entry["fund_amount"] * 1_000_000), state.get("app_id")))
+
+        created_after = {}
+
+        def on_signed(tenant, txid, last_valid, client=client, network=network,
+                      creators=creators, created_after=created_after):
+            creator = creators[tenant.name]
+            if creator not in created_after:
+                apps = client.account_info(creator).get("created-apps", [])
+                created_after[creator] = max((app["id"] for app in apps), default=0)
+            checkpoint.record(tenant.name, status=SENDING, create_txid=txid, last_valid=last_valid,
+                              created_after=created_after[creator], network=network)
+
+        def on_created(tenant, app_id, network=network):
+            status = CREATED if app_id is not None else None
+            checkpoint.record(tenant.name, status=status, app_id=app_id, network=network)
+
+        def on_fund_signed(tenant, txid, last_valid):
+            checkpoint.record(tenant.name, status=FUNDING, fund_txid=txid, last_valid=last_valid)
+
+        def on_funded(tenant, txid):
+            if txid is None:
+                checkpoint.record(tenant.name, status=CREATED)
+
+        def on_result(done, total, result, network=network, creators=creators):
+            if result.ok:
+                _record_deployed(checkpoint, output_dir, network, result, creators[result.name])
+            else:
+                checkpoint.record(result.name, error=result.error)
+            if progress is not None:
+                progress(done, total, result)
+
+        results.extend(deploy.deploy_apps(client, tenants, approval_teal, clear_teal, workers, wave_size,
+                                          on_result, on_created, on_signed, on_fund_signed, on_funded))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deploy one BountyBoard app per tenant of a manifest")
+    parser.add_argument("manifest", help="JSON manifest of tenants")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                        help="progress file; rerun with the same file to resume")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help="directory receiving <tenant>/contract.json")
+    parser.add_argument("--workers", type=int, default=deploy.DEPLOY_WORKERS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="max algod requests per second per network (0 for unlimited)")
+    parser.add_argument("--wave-size", type=int, default=deploy.DEPLOY_WAVE_SIZE)
+    options = parser.parse_args()
+
+    entries = load_manifest(options.manifest)
+    checkpoint = Checkpoint(options.checkpoint)
+    started = time.monotonic()
+    results = run_fleet(entries, checkpoint, options.output_dir, workers=options.workers,
+                        rate=options.rate, wave_size=options.wave_size)
+    failed = [result for result in results if not result.ok]
+    skipped = len(entries) - len(results)
+    print(f"Deployed {len(results) - len(failed)} apps in {time.monotonic() - started:.1f}s "
+          f"({skipped} already done, {len(failed)} failed)")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,16 @@
  */
 
 import algosdk from 'algosdk';
+// Generated by deploy.py from CONTRACT_ABI in bounty_board.py
+import contractAbi from './contract-abi.json';
+
+const CONTRACT = new algosdk.ABIContract(contractAbi);
+const ARC4_STRING = new algosdk.ABIStringType();
+
+/** ARC-4 selector of a contract method; the router dispatches on it */
+function methodSelector(name: string): Uint8Array {
+  return CONTRACT.getMethodByName(name).getSelector();
+}
 
 // Import your deployed contract info
 // import contractInfo from './contract.json';
@@ -76,14 +86,13 @@ export class BountyBoard {
     });
 
     // Transaction 2: App call
-    const encoder = new TextEncoder();
     const appCallTxn = algosdk.makeApplicationNoOpTxnFromObject({
       from: sender,
       appIndex: this.appId,
       appArgs: [
-        encoder.encode('create_task'),
-        encoder.encode(title),
-        encoder.encode(description),
+        methodSelector('create_task'),
+        ARC4_STRING.encode(title),
+        ARC4_STRING.encode(description),
         algosdk.encodeUint64(deadlineTimestamp)
       ],
       suggestedParams: params
@@ -105,7 +114,7 @@ export class BountyBoard {
       from: sender,
       appIndex: this.appId,
       appArgs: [
-        new TextEncoder().encode('claim_task'),
+        methodSelector('claim_task'),
         algosdk.encodeUint64(taskId)
       ],
       boxes: [
@@ -133,9 +142,9 @@ export class BountyBoard {
       from: sender,
       appIndex: this.appId,
       appArgs: [
-        new TextEncoder().encode('submit_work'),
+        methodSelector('submit_work'),
         algosdk.encodeUint64(taskId),
-        new TextEncoder().encode(proofHash)
+        ARC4_STRING.encode(proofHash)
       ],
       boxes: [
         { appIndex: this.appId, name: this.getBoxName(`${taskId}_status`) },
@@ -158,7 +167,7 @@ export class BountyBoard {
       from: sender,
       appIndex: this.appId,
       appArgs: [
-        new TextEncoder().encode('approve_task'),
+        methodSelector('approve_task'),
         algosdk.encodeUint64(taskId)
       ],
       boxes: [
@@ -183,7 +192,7 @@ export class BountyBoard {
       from: sender,
       appIndex: this.appId,
       appArgs: [
-        new TextEncoder().encode('reject_task'),
+        methodSelector('reject_task'),
         algosdk.encodeUint64(taskId)
       ],
       boxes: [
@@ -207,7 +216,7 @@ export class BountyBoard {
       from: sender,
       appIndex: this.appId,
       appArgs: [
-        new TextEncoder().encode('refund_task'),
+        methodSelector('refund_task'),
         algosdk.encodeUint64(taskId)
       ],
       boxes: [
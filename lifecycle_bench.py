@@ -0,0 +1,242 @@
+"""
+End-to-end lifecycle benchmark for the BountyBoard approval programs
+Drives create → claim → submit → reject → resubmit → approve and
+create → refund through the hand-written and the PyTeal approval
+program (teal_profiler.VARIANTS) on a local ledger and reports tasks per second, opcode cost per operation, box bytes per task
+and p50/p99 client-side latency. Results are stored as JSON per commit
+so runs can be compared for regressions.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from teal_profiler import (CLIENT, CREATOR, FREELANCER, TASK_AMOUNT, VARIANTS, build_call, deploy_variant,
+                           next_task_id)
+from teal_vm import Ledger, app_address
+
+
+DEFAULT_ITERATIONS = 500
+DEFAULT_WARMUP = 20
+DEFAULT_RESULTS_DIR = os.environ.get("BOUNTYBOARD_BENCH_DIR", ".benchmarks")
+DEFAULT_TOLERANCE = 0.10  # throughput drop tolerated before a run counts as a regression
+
+TASKS_PER_ITERATION = 2
+
+
+def lifecycle_ops(deadline, first_task_id):
+    """One iteration: (method, sender, args, payment) for two tasks
+
+    The first task goes through a reject/resubmit loop before approval,
+    the second is refunded by its client.
+    """
+    first, second = first_task_id, first_task_id + 1
+    return [
+        ("create_task", CLIENT, ["Logo design", "Vector logo for a bakery", deadline], TASK_AMOUNT),
+        ("claim_task", FREELANCER, [first], 0),
+        ("submit_work", FREELANCER, [first, "bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi"], 0),
+        ("reject_task", CLIENT, [first], 0),
+        ("submit_work", FREELANCER, [first, "bafybeihdwdcefgh4dqkjv67uzcmw7ojee6xedzdetojuzjevtenxquvyku"], 0),
+        ("approve_task", CLIENT, [first], 0),
+        ("create_task", CLIENT, ["Copy edit", "Proofread a landing page", deadline], TASK_AMOUNT),
+        ("refund_task", CLIENT, [second], 0),
+    ]
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _latency(samples):
+    return {
+        "p50_us": round(percentile(samples, 0.50) * 1e6, 1),
+        "p99_us": round(percentile(samples, 0.99) * 1e6, 1),
+    }
+
+
+def bench_variant(variant, iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP):
+    """Run the lifecycle `warmup + iterations` times on a fresh ledger and measure the timed part
+
+    Latency covers building the call and executing it, as a client
+    waiting on the stand-in would see it. A variant that fails an
+    operation, or does not route one of the lifecycle methods, is
+    reported with the reason instead of timings.
+    """
+    report = {"ok": False}
+    unrouted = sorted({op[0] for op in lifecycle_ops(0, 0)} - variant.methods)
+    if unrouted:
+        report["error"] = f"does not route {', '.join(unrouted)}"
+        return report
+    ledger = Ledger()
+    for account in (CREATOR, CLIENT, FREELANCER):
+        ledger.fund(account, 10 ** 15)
+    try:
+        app_id = deploy_variant(ledger, variant.load_source())
+    except RuntimeError as e:
+        report["error"] = str(e)
+        return report
+    ledger.fund(app_address(app_id), 10 ** 12)
+
+    latencies = {}
+    cost_totals = {}
+    cost_max = {}
+    box_read = box_written = 0
+    elapsed = 0.0
+    for iteration in range(warmup + iterations):
+        timed = iteration >= warmup
+        ops = lifecycle_ops(ledger.timestamp + 86_400, TASKS_PER_ITERATION * iteration)
+        for method_name, sender, args, payment in ops:
+            started = time.perf_counter()
+            result = ledger.execute(build_call(app_id, sender, method_name, args, payment,
+                                               next_task_id(ledger, app_id)))
+            took = time.perf_counter() - started
+            if not result.ok:
+                report["error"] = f"{method_name}: {result.error}"
+                report["failed_at"] = {"iteration": iteration, "method": method_name}
+                return report
+            if not timed:
+                continue
+            elapsed += took
+            evaluation = result.app_results[-1]
+            latencies.setdefault(method_name, []).append(took)
+            cost_totals[method_name] = cost_totals.get(method_name, 0) + evaluation.cost
+            cost_max[method_name] = max(cost_max.get(method_name, 0), evaluation.cost)
+            box_read += evaluation.box_bytes_read
+            box_written += evaluation.box_bytes_written
+
+    tasks = TASKS_PER_ITERATION * iterations
+    operations = sum(len(samples) for samples in latencies.values())
+    stored = sum(len(name) + len(value) for name, value in ledger.apps[app_id].boxes.items())
+    report.update({
+        "ok": True,
+        "tasks": tasks,
+        "operations": operations,
+        "seconds": round(elapsed, 4),
+        "tasks_per_second": round(tasks / elapsed),
+        "operations_per_second": round(operations / elapsed),
+        "opcode_cost": {m: {"mean": round(total / len(latencies[m]), 1), "max": cost_max[m]}
+                        for m, total in cost_totals.items()},
+        "opcode_cost_per_operation": round(sum(cost_totals.values()) / operations, 1),
+        "box_bytes_per_task": {
+            "stored": round(stored / (TASKS_PER_ITERATION * (warmup + iterations)), 1),
+            "read": round(box_read / tasks, 1),
+            "written": round(box_written / tasks, 1),
+        },
+        "latency": dict(_latency([t for samples in latencies.values() for t in samples]),
+                        methods={m: _latency(samples) for m, samples in latencies.items()}),
+    })
+    return report
+
+
+def current_commit():
+    """HEAD commit of the working tree, or None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(variants=VARIANTS, iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP):
+    """Benchmark every variant and return the JSON-ready report"""
+    return {
+        "generated_at": int(time.time()),
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "iterations": iterations,
+        "variants": {variant.name: bench_variant(variant, iterations, warmup) for variant in variants},
+    }
+
+
+def regressions(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Variants that stopped passing, got slower than `tolerance` allows or cost more opcodes"""
+    found = []
+    for name, stats in report["variants"].items():
+        old = baseline.get("variants", {}).get(name)
+        if not old or not old.get("ok"):
+            continue
+        if not stats["ok"]:
+            found.append(f"{name}: now fails ({stats['error']})")
+            continue
+        if stats["tasks_per_second"] < old["tasks_per_second"] * (1 - tolerance):
+            found.append(f"{name}: tasks/s {old['tasks_per_second']} -> {stats['tasks_per_second']}")
+        for method_name, cost in stats["opcode_cost"].items():
+            old_cost = old["opcode_cost"].get(method_name)
+            if old_cost is None:
+                continue
+            for key in ("mean", "max"):
+                # Results written before per-method means recorded a single cost
+                before = old_cost[key] if isinstance(old_cost, dict) else old_cost
+                if cost[key] > before:
+                    found.append(f"{name} {method_name}: {key} opcode cost {before} -> {cost[key]}")
+    return found
+
+
+def latest_result(directory, exclude=None):
+    """Most recently written result file in `directory`, other than `exclude`"""
+    paths = [p for p in glob.glob(os.path.join(directory, "*.json"))
+             if exclude is None or os.path.abspath(p) != os.path.abspath(exclude)]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the task lifecycle on every approval program")
+    parser.add_argument("--variant", action="append",
+                        help="only benchmark the named variant (repeatable)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--output", help=f"result file (default {DEFAULT_RESULTS_DIR}/<commit>.json)")
+    parser.add_argument("--compare", nargs="?", const="latest", metavar="RESULT",
+                        help="fail on regressions against this result (default: the previous run)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    options = parser.parse_args()
+
+    variants = VARIANTS
+    if options.variant:
+        variants = [v for v in VARIANTS if v.name in options.variant]
+    report = run(variants, options.iterations, options.warmup)
+
+    output = options.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{(report['commit'] or 'worktree')[:12]}.json")
+    baseline_path = options.compare
+    if baseline_path == "latest":
+        baseline_path = latest_result(os.path.dirname(output) or ".", exclude=output)
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    for name, stats in report["variants"].items():
+        if stats["ok"]:
+            print(f"{name}: {stats['tasks_per_second']} tasks/s, "
+                  f"{stats['opcode_cost_per_operation']} opcodes/op, "
+                  f"{stats['box_bytes_per_task']['stored']} box bytes/task, "
+                  f"p50 {stats['latency']['p50_us']} µs, p99 {stats['latency']['p99_us']} µs")
+        else:
+            print(f"{name}: failed ({stats['error']})")
+    print(f"✓ Results written to {output}")
+
+    if options.compare:
+        if baseline_path is None:
+            print("No earlier result to compare against")
+            return
+        with open(baseline_path, "r") as f:
+            found = regressions(report, json.load(f), options.tolerance)
+        for line in found:
+            print(f"✗ {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+        print(f"✓ No regressions against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
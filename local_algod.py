@@ -0,0 +1,454 @@
+"""
+In-process algod stand-in for BountyBoard
+Implements the algod endpoints used by the deploy scripts and clients
+over the in-memory ledger from teal_vm, so nothing needs the network
+"""
+
+import base64
+import hashlib
+import os
+import threading
+import time
+
+import msgpack
+from algosdk import encoding, error, transaction
+from algosdk.v2client import algod, indexer
+
+from teal_vm import APPL, LOCAL_BYTECODE_PREFIX, PAY, Ledger
+
+
+# Public endpoints selectable through make_algod_client()
+NETWORKS = {
+    "testnet": ("https://testnet-api.algonode.cloud", ""),
+    "mainnet": ("https://mainnet-api.algonode.cloud", ""),
+    "localnet": ("http://localhost:4001", "a" * 64),
+}
+
+# Indexer endpoints matching NETWORKS
+INDEXERS = {
+    "testnet": ("https://testnet-idx.algonode.cloud", ""),
+    "mainnet": ("https://mainnet-idx.algonode.cloud", ""),
+    "localnet": ("http://localhost:8980", "a" * 64),
+}
+
+DEFAULT_NETWORK_ENV = "BOUNTYBOARD_NETWORK"
+
+GENESIS_ID = "local-v1"
+GENESIS_HASH = base64.b64encode(hashlib.sha256(GENESIS_ID.encode()).digest()).decode()
+
+def _b64(data):
+    return base64.b64encode(data).decode()
+
+
+class ManualClock:
+    """Clock that only moves when told to, for LocalAlgodClient(clock=...)"""
+
+    def __init__(self, now=None):
+        self.now = int(time.time()) if now is None else now
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        with self._lock:
+            self.now += seconds
+        return self.now
+
+    def set(self, now):
+        self.now = now
+
+
+class LocalAlgodClient:
+    """Algod-compatible client over an in-memory ledger
+
+    Every submitted group is confirmed immediately in its own round
+    (like a dev-mode node); resending a confirmed transaction is rejected
+    as algod rejects it, and box references are enforced by the
+    interpreter. Submissions are serialized, so the client
+    can be shared between threads. Block timestamps come from `clock` plus the
+    offset set with set_timestamp_offset(), so tests can move time.
+    """
+
+    def __init__(self, ledger=None, clock=time.time):
+        self.ledger = ledger or Ledger()
+        self.clock = clock
+        self.timestamp_offset = 0
+        self.ledger.timestamp = self._now()
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Confirmed transactions in indexer format, in confirmation order
+        self.transactions = []
+
+    def _now(self):
+        return int(self.clock()) + self.timestamp_offset
+
+    # ----- node -----
+
+    def status(self, **kwargs):
+        return {
+            "last-round": self.ledger.round,
+            "time-since-last-round": 0,
+            "catchup-time": 0,
+        }
+
+    def status_after_block(self, block_num, **kwargs):
+        return self.status()
+
+    def health(self, **kwargs):
+        return None
+
+    def versions(self, **kwargs):
+        return {
+            "genesis_id": GENESIS_ID,
+            "genesis_hash_b64": GENESIS_HASH,
+            "build": {"major": 0, "minor": 0, "build_number": 0,
+                      "commit_hash": "local", "branch": "local", "channel": "local"},
+            "versions": ["v2"],
+        }
+
+    def set_timestamp_offset(self, offset, **kwargs):
+        self.timestamp_offset = offset
+
+    def get_timestamp_offset(self, **kwargs):
+        return {"offset": self.timestamp_offset}
+
+    def suggested_params(self, **kwargs):
+        return transaction.SuggestedParams(
+            fee=0,
+            first=self.ledger.round,
+            last=self.ledger.round + 1000,
+            gh=GENESIS_HASH,
+            gen=GENESIS_ID,
+            flat_fee=False,
+            min_fee=1000,
+        )
+
+    # ----- compiling -----
+
+    def compile(self, source, source_map=False, **kwargs):
+        bytecode = LOCAL_BYTECODE_PREFIX + source.encode()
+        response = {
+            "hash": encoding.encode_address(encoding.checksum(b"Program" + bytecode)),
+            "result": _b64(bytecode),
+        }
+        if source_map:
+            response["sourcemap"] = {"version": 3, "sources": [], "names": [], "mappings": ""}
+        return response
+
+    # ----- submission -----
+
+    def send_transaction(self, txn, **kwargs):
+        return self.send_transactions([txn])
+
+    def send_transactions(self, txns, **kwargs):
+        """Apply a signed group and confirm it in a new round"""
+        txids = [stxn.get_txid() for stxn in txns]
+        with self._lock:
+            for txid in txids:
+                if txid in self._pending:
+                    raise error.AlgodHTTPError(
+                        f"TransactionPool.Remember: transaction already in ledger: {txid}", 400)
+            group = [self._to_vm_txn(stxn.transaction) for stxn in txns]
+            self.ledger.timestamp = self._now()
+            result = self.ledger.execute(group)
+            if not result.ok:
+                raise error.AlgodHTTPError(
+                    f"TransactionPool.Remember: transaction {txids[result.failed_index]}: "
+                    f"logic eval error: {result.error}", 400)
+            self.ledger.round += 1
+            for offset, (stxn, txid, txn, evaluation) in enumerate(
+                    zip(txns, txids, group, result.txn_results)):
+                self._pending[txid] = self._confirmation(txn, evaluation)
+                self.transactions.append(
+                    self._indexer_record(stxn.transaction, txid, txn, evaluation, offset))
+        return txids[0]
+
+    def simulate_transactions(self, request, **kwargs):
+        """Evaluate groups without committing them, in algod's simulate format
+
+        Groups are evaluated in order, each seeing the effects of the
+        previous ones, and everything is undone afterwards.
+        """
+        with self._lock:
+            groups = [[self._to_vm_txn(getattr(stxn, "transaction", stxn)) for stxn in txn_group.txns]
+                      for txn_group in request.txn_groups]
+            self.ledger.timestamp = self._now()
+            results = self.ledger.simulate(groups)
+            return {
+                "version": 2,
+                "last-round": self.ledger.round,
+                "txn-groups": [self._simulate_group(group, result)
+                               for group, result in zip(groups, results)],
+            }
+
+    def _simulate_group(self, group, result):
+        txn_results = []
+        for txn, evaluation in zip(group, result.txn_results):
+            entry = {"txn-result": self._confirmation(txn, evaluation)}
+            if evaluation is not None:
+                entry["app-budget-consumed"] = evaluation.cost
+            txn_results.append(entry)
+        simulated = {
+            "txn-results": txn_results,
+            "app-budget-added": result.budget,
+            "app-budget-consumed": result.cost,
+        }
+        if not result.ok:
+            simulated["failure-message"] = result.error
+            simulated["failed-at"] = [result.failed_index]
+        return simulated
+
+    def send_raw_transaction(self, txn, **kwargs):
+        raw = base64.b64decode(txn) if isinstance(txn, str) else txn
+        txns = []
+        while raw:
+            unpacked, raw = _msgpack_split(raw)
+            txns.append(encoding.msgpack_decode(unpacked))
+        return self.send_transactions(txns)
+
+    def pending_transaction_info(self, transaction_id, **kwargs):
+        try:
+            return self._pending[transaction_id]
+        except KeyError:
+            raise error.AlgodHTTPError("txn does not exist", 404)
+
+    def _confirmation(self, txn, evaluation):
+        info = {"confirmed-round": self.ledger.round, "pool-error": ""}
+        if txn.get("CreatedApplicationID"):
+            info["application-index"] = txn["CreatedApplicationID"]
+        if evaluation is not None:
+            if evaluation.logs:
+                info["logs"] = [_b64(log) for log in evaluation.logs]
+            if evaluation.inner_txns:
+                info["inner-txns"] = [
+                    {"txn": {"txn": {
+                        "type": "pay",
+                        "snd": encoding.encode_address(inner["Sender"]),
+                        "rcv": encoding.encode_address(inner["Receiver"]),
+                        "amt": inner.get("Amount", 0),
+                    }}}
+                    for inner in evaluation.inner_txns
+                ]
+        return info
+
+    def _indexer_record(self, txn, txid, vm_txn, evaluation, offset):
+        """Indexer-style JSON for a transaction confirmed in the current round"""
+        record = {
+            "id": txid,
+            "confirmed-round": self.ledger.round,
+            "round-time": self.ledger.timestamp,
+            "intra-round-offset": offset,
+            "sender": txn.sender,
+            "fee": txn.fee,
+            "tx-type": txn.type,
+        }
+        if txn.group:
+            record["group"] = _b64(txn.group)
+        if isinstance(txn, transaction.PaymentTxn):
+            record["payment-transaction"] = {"receiver": txn.receiver, "amount": txn.amt}
+        else:
+            record["application-transaction"] = {
+                "application-id": txn.index,
+                "application-args": [_b64(arg) for arg in vm_txn["ApplicationArgs"]],
+                "on-completion": "noop" if not vm_txn["OnCompletion"] else str(vm_txn["OnCompletion"]),
+            }
+            if vm_txn.get("CreatedApplicationID"):
+                record["created-application-index"] = vm_txn["CreatedApplicationID"]
+        confirmation = self._pending[txid]
+        if "logs" in confirmation:
+            record["logs"] = confirmation["logs"]
+        if "inner-txns" in confirmation:
+            record["inner-txns"] = [
+                {"tx-type": "pay", "sender": inner["txn"]["txn"]["snd"],
+                 "payment-transaction": {"receiver": inner["txn"]["txn"]["rcv"],
+                                         "amount": inner["txn"]["txn"]["amt"]}}
+                for inner in confirmation["inner-txns"]
+            ]
+        return record
+
+    def _to_vm_txn(self, txn):
+        """Translate an algosdk transaction into the interpreter's field dict"""
+        vm_txn = {
+            "Sender": encoding.decode_address(txn.sender),
+            "Fee": txn.fee,
+            "FirstValid": txn.first_valid_round,
+            "LastValid": txn.last_valid_round,
+            "Note": txn.note or b"",
+        }
+        if txn.last_valid_round < self.ledger.round:
+            raise error.AlgodHTTPError(
+                f"txn dead: round {self.ledger.round} outside of "
+                f"{txn.first_valid_round}--{txn.last_valid_round}", 400)
+        if isinstance(txn, transaction.PaymentTxn):
+            vm_txn["TypeEnum"] = PAY
+            vm_txn["Receiver"] = encoding.decode_address(txn.receiver)
+            vm_txn["Amount"] = txn.amt
+        elif isinstance(txn, transaction.ApplicationCallTxn):
+            vm_txn["TypeEnum"] = APPL
+            vm_txn["ApplicationID"] = txn.index
+            vm_txn["OnCompletion"] = int(txn.on_complete)
+            vm_txn["ApplicationArgs"] = list(txn.app_args or [])
+            vm_txn["Accounts"] = [encoding.decode_address(a) for a in txn.accounts or []]
+            vm_txn["Applications"] = list(txn.foreign_apps or [])
+            vm_txn["Boxes"] = [(ref.app_index, ref.name) for ref in txn.boxes or []]
+            if txn.index == 0:
+                vm_txn["ApprovalProgram"] = txn.approval_program
+                vm_txn["ClearStateProgram"] = txn.clear_program
+                schema = txn.global_schema
+                vm_txn["GlobalNumUint"] = schema.num_uints if schema else 0
+                vm_txn["GlobalNumByteSlice"] = schema.num_byte_slices if schema else 0
+                vm_txn["ExtraProgramPages"] = txn.extra_pages or 0
+        else:
+            raise error.AlgodHTTPError(f"unsupported transaction type {txn.type}", 400)
+        return vm_txn
+
+    # ----- state -----
+
+    def dispense(self, address, amount):
+        """Fund an account out of thin air (local faucet)"""
+        self.ledger.fund(encoding.decode_address(address), amount)
+
+    def account_info(self, address, **kwargs):
+        raw = encoding.decode_address(address)
+        return {
+            "address": address,
+            "amount": self.ledger.balance(raw),
+            "min-balance": self.ledger.min_balance(raw),
+            "round": self.ledger.round,
+            "created-apps": [
+                {"id": app.app_id} for app in self.ledger.apps.values() if app.creator == raw
+            ],
+        }
+
+    def _app(self, application_id):
+        try:
+            return self.ledger.apps[application_id]
+        except KeyError:
+            raise error.AlgodHTTPError("application does not exist", 404)
+
+    def application_info(self, application_id, **kwargs):
+        app = self._app(application_id)
+        global_state = []
+        for key, value in app.global_state.items():
+            if isinstance(value, int):
+                encoded = {"type": 2, "uint": value, "bytes": ""}
+            else:
+                encoded = {"type": 1, "uint": 0, "bytes": _b64(value)}
+            global_state.append({"key": _b64(key), "value": encoded})
+        return {
+            "id": app.app_id,
+            "params": {
+                "creator": encoding.encode_address(app.creator),
+                "global-state": global_state,
+                "global-state-schema": {
+                    "num-uint": app.num_uints,
+                    "num-byte-slice": app.num_byte_slices,
+                },
+                "extra-program-pages": app.extra_pages,
+            },
+        }
+
+    def application_boxes(self, application_id, limit=0, **kwargs):
+        names = list(self._app(application_id).boxes)
+        if limit:
+            names = names[:limit]
+        return {"boxes": [{"name": _b64(name)} for name in names]}
+
+    def application_box_by_name(self, application_id, box_name, **kwargs):
+        value = self._app(application_id).boxes.get(bytes(box_name))
+        if value is None:
+            raise error.AlgodHTTPError("box not found", 404)
+        return {"name": _b64(box_name), "round": self.ledger.round, "value": _b64(value)}
+
+
+class LocalIndexerClient:
+    """Indexer-compatible search over the transactions of a LocalAlgodClient"""
+
+    def __init__(self, algod_client):
+        self.algod = algod_client
+
+    def health(self, **kwargs):
+        return {"round": self.algod.ledger.round, "is-migrating": False, "db-available": True}
+
+    def search_transactions(self, limit=None, next_page=None, txn_type=None, min_round=None,
+                            max_round=None, address=None, application_id=None, group_id=None,
+                            txid=None, **kwargs):
+        start = int(next_page) if next_page else 0
+        limit = limit or 1000
+        with self.algod._lock:
+            current_round = self.algod.ledger.round
+            transactions = self.algod.transactions[:]
+        matches = []
+        position = start
+        while position < len(transactions) and len(matches) < limit:
+            record = transactions[position]
+            position += 1
+            if min_round is not None and record["confirmed-round"] < min_round:
+                continue
+            if max_round is not None and record["confirmed-round"] > max_round:
+                continue
+            if txn_type and record["tx-type"] != txn_type:
+                continue
+            if address and record["sender"] != address:
+                continue
+            if group_id and record.get("group") != group_id:
+                continue
+            if txid and record["id"] != txid:
+                continue
+            if application_id is not None and record.get(
+                    "application-transaction", {}).get("application-id") != application_id:
+                continue
+            matches.append(record)
+        response = {"current-round": current_round, "transactions": matches}
+        if position < len(transactions):
+            response["next-token"] = str(position)
+        return response
+
+
+def _msgpack_split(raw):
+    """Split the first msgpack object off a concatenated byte string"""
+    unpacker = msgpack.Unpacker(raw=False)
+    unpacker.feed(raw)
+    obj = unpacker.unpack()
+    consumed = unpacker.tell()
+    return base64.b64encode(raw[:consumed]).decode(), raw[consumed:]
+
+
+_shared_local_client = None
+
+
+def make_algod_client(network=None):
+    """Algod client for a named network
+
+    `network` defaults to the BOUNTYBOARD_NETWORK environment variable,
+    then "testnet". "local" returns a process-wide in-memory stand-in.
+    """
+    global _shared_local_client
+    network = network or os.environ.get(DEFAULT_NETWORK_ENV, "testnet")
+    if network == "local":
+        if _shared_local_client is None:
+            _shared_local_client = LocalAlgodClient()
+        return _shared_local_client
+    try:
+        algod_address, algod_token = NETWORKS[network]
+    except KeyError:
+        raise ValueError(f"Unknown network '{network}', expected one of "
+                         f"{', '.join(sorted(NETWORKS))} or local")
+    return algod.AlgodClient(algod_token, algod_address)
+
+
+def make_indexer_client(network=None):
+    """Indexer client for a named network, resolved like make_algod_client()
+
+    "local" returns an indexer view over the shared in-memory stand-in.
+    """
+    network = network or os.environ.get(DEFAULT_NETWORK_ENV, "testnet")
+    if network == "local":
+        return LocalIndexerClient(make_algod_client("local"))
+    try:
+        indexer_address, indexer_token = INDEXERS[network]
+    except KeyError:
+        raise ValueError(f"Unknown network '{network}', expected one of "
+                         f"{', '.join(sorted(INDEXERS))} or local")
+    return indexer.IndexerClient(indexer_token, indexer_address)
@@ -0,0 +1,105 @@
+"""
+Shared suggested-params cache with round-based expiry
+One ParamsProvider per algod client serves every transaction builder.
+Params are refetched once they are `ttl_rounds` old or fewer than
+`margin_rounds` of their validity window remain, with the current round
+estimated from elapsed time and corrected by any round a caller observes
+"""
+
+import asyncio
+import copy
+import threading
+import time
+import weakref
+
+
+DEFAULT_TTL_ROUNDS = 50  # refetch to pick up fee changes at least this often
+DEFAULT_MARGIN_ROUNDS = 10  # refetch when fewer valid rounds than this remain
+DEFAULT_ROUND_TIME = 2.8  # seconds per round, used to estimate the current round
+
+
+class ParamsProvider:
+    """Thread- and asyncio-safe cache of one client's suggested params
+
+    get() returns a private copy, so callers may change fee fields. When
+    the cache is stale exactly one caller fetches; concurrent callers
+    wait for it instead of sending their own request. aget() never blocks
+    the event loop: a stale cache is refreshed on the default executor.
+    """
+
+    def __init__(self, algod_client, ttl_rounds=DEFAULT_TTL_ROUNDS,
+                 margin_rounds=DEFAULT_MARGIN_ROUNDS, round_time=DEFAULT_ROUND_TIME,
+                 clock=time.monotonic):
+        self.algod = algod_client
+        self.ttl_rounds = ttl_rounds
+        self.margin_rounds = margin_rounds
+        self.round_time = round_time
+        self.clock = clock
+        self.fetches = 0
+        self._params = None
+        self._fetched_at = 0.0
+        self._observed_round = 0
+        self._lock = threading.Lock()
+
+    def estimated_round(self):
+        """Current round: the latest observed one, or extrapolated from the fetch time"""
+        params = self._params
+        if params is None:
+            return self._observed_round
+        elapsed = int((self.clock() - self._fetched_at) / self.round_time) if self.round_time else 0
+        return max(self._observed_round, params.first + elapsed)
+
+    def observe_round(self, round_):
+        """Record a round seen elsewhere (status, confirmations) to sharpen expiry"""
+        if round_ > self._observed_round:
+            self._observed_round = round_
+
+    def _fresh(self):
+        params = self._params
+        if params is None:
+            return False
+        current = self.estimated_round()
+        return (current - params.first < self.ttl_rounds
+                and params.last - current >= self.margin_rounds)
+
+    def invalidate(self):
+        """Drop the cached params (e.g. after a "txn dead" rejection)"""
+        with self._lock:
+            self._params = None
+
+    def get(self):
+        """Suggested params, fetched only when the cache has expired"""
+        if not self._fresh():
+            with self._lock:
+                if not self._fresh():
+                    params = self.algod.suggested_params()
+                    self.fetches += 1
+                    self._fetched_at = self.clock()
+                    self._observed_round = max(self._observed_round, params.first)
+                    self._params = params
+        return copy.copy(self._params)
+
+    async def aget(self):
+        """get() for coroutines"""
+        if self._fresh():
+            return copy.copy(self._params)
+        return await asyncio.get_running_loop().run_in_executor(None, self.get)
+
+
+_providers = weakref.WeakKeyDictionary()
+_providers_lock = threading.Lock()
+
+
+def params_provider(algod_client):
+    """The ParamsProvider shared by every user of `algod_client`"""
+    with _providers_lock:
+        try:
+            return _providers[algod_client]
+        except KeyError:
+            provider = _providers[algod_client] = ParamsProvider(algod_client)
+            return provider
+
+
+def suggested_params(algod_client):
+    """Cached suggested params for `algod_client` (see ParamsProvider.get)"""
+    return params_provider(algod_client).get()
@@ -0,0 +1,291 @@
+"""
+Deadline-driven refund scheduler for BountyBoard
+Keeps a min-heap of the deadlines of OPEN and CLAIMED tasks, fed from
+box reads and the contract's event logs, and sends refund_task calls
+in atomic groups as soon as deadlines pass
+"""
+
+import argparse
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple
+
+from algosdk import account, error, transaction
+
+import bounty_client
+import events
+from bounty_board import TaskStatus
+from local_algod import make_algod_client, make_indexer_client
+from params_cache import params_provider
+from task_reader import DEFAULT_PARALLELISM, iter_tasks
+
+
+REFUNDABLE = (TaskStatus.OPEN, TaskStatus.CLAIMED)
+
+DEFAULT_GRACE = 5  # seconds past a deadline before refunding (block time lags the clock)
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_DELAY = 1.0
+DEFAULT_MAX_BACKOFF = 600.0  # seconds between runs retrying a task that keeps failing
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class RefundReport(NamedTuple):
+    refunded: List[int]
+    skipped: List[int]  # no longer refundable when retried (settled by someone else)
+    failed: List[int]   # gave up after max_retries; retried later with backoff
+
+
+class RefundScheduler:
+    """Refunds expired tasks of one application
+
+    schedule()/cancel() and the feeding helpers may be called from any
+    thread. run_once() pops every task whose deadline is `grace` seconds
+    in the past, groups them up to 16 refunds per atomic group and sends
+    at most `max_in_flight` groups at a time. A failed group is retried
+    with exponential backoff after re-reading its tasks, dropping those
+    that someone else settled in the meantime. Tasks still failing then
+    keep their deadline and get a next attempt time, doubling from run
+    to run up to `max_backoff`.
+    """
+
+    def __init__(self, algod_client, private_key, app_id, clock=time.time,
+                 grace=DEFAULT_GRACE, batch_size=bounty_client.MAX_GROUP_SIZE,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_retries=DEFAULT_MAX_RETRIES,
+                 retry_delay=DEFAULT_RETRY_DELAY, max_backoff=DEFAULT_MAX_BACKOFF, sleep=time.sleep):
+        self.algod = algod_client
+        self.private_key = private_key
+        self.sender = account.address_from_private_key(private_key)
+        self.app_id = app_id
+        self.clock = clock
+        self.grace = grace
+        self.batch_size = min(batch_size, bounty_client.MAX_GROUP_SIZE)
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+        self.last_round = 0
+        self._heap = []  # (time due, task_id)
+        self._deadlines = {}  # task_id -> deadline of every scheduled task
+        self._retries = {}  # task_id -> (next attempt, failed runs) of tasks that failed
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    # ----- feeding -----
+
+    def schedule(self, task_id, deadline):
+        with self._lock:
+            if self._deadlines.get(task_id) == deadline:
+                return
+            self._deadlines[task_id] = deadline
+            heapq.heappush(self._heap, (self._due_at(task_id), task_id))
+
+    def cancel(self, task_id):
+        """Forget a task; its heap entry is dropped lazily"""
+        with self._lock:
+            self._deadlines.pop(task_id, None)
+            self._retries.pop(task_id, None)
+
+    def _due_at(self, task_id):
+        due_at = self._deadlines[task_id] + self.grace
+        retry = self._retries.get(task_id)
+        return max(due_at, retry[0]) if retry else due_at
+
+    def _retry_later(self, task_ids):
+        """Reschedule failed tasks at their next attempt time, backing off per failed run"""
+        now = self.clock()
+        with self._lock:
+            for task_id in task_ids:
+                if task_id not in self._deadlines:
+                    continue  # cancelled while in flight
+                failures = self._retries.get(task_id, (0, 0))[1] + 1
+                delay = min(self.max_backoff, self.retry_delay * 2 ** (self.max_retries + failures - 1))
+                self._retries[task_id] = (now + delay, failures)
+                heapq.heappush(self._heap, (self._due_at(task_id), task_id))
+
+    def load_records(self, records):
+        """Schedule the refundable tasks among TaskRecords (or Task objects)"""
+        for record in records:
+            if record.status in REFUNDABLE:
+                self.schedule(record.task_id, record.deadline)
+            else:
+                self.cancel(record.task_id)
+
+    def load_app(self, parallelism=DEFAULT_PARALLELISM):
+        """Schedule every refundable task from a full read of the task boxes"""
+        self.load_records(iter_tasks(self.algod, self.app_id, parallelism=parallelism))
+
+    def apply_events(self, task_events, parallelism=DEFAULT_PARALLELISM):
+        """Update the schedule from decoded events (see events.decode_transaction)
+
+        Created tasks and rejected (back to CLAIMED) tasks are read from
+        their boxes for their deadline; settled and submitted tasks are
+        cancelled.
+        """
+        to_read = []
+        for event in task_events:
+            if event.kind == events.METHOD_RETURN:
+                continue
+            self.last_round = max(self.last_round, event.round)
+            if event.kind in (events.TASK_CREATED, events.TASK_REJECTED):
+                to_read.append(event.task_id)
+            elif event.kind in (events.WORK_SUBMITTED, events.TASK_APPROVED, events.TASK_REFUNDED):
+                self.cancel(event.task_id)
+                if event.task_id in to_read:
+                    to_read.remove(event.task_id)
+        if to_read:
+            self.load_records(iter_tasks(self.algod, self.app_id, sorted(set(to_read)), parallelism))
+
+    def sync(self, indexer_client):
+        """Apply the events confirmed since the last synced round"""
+        batches = events.tail_transactions(indexer_client, self.app_id,
+                                           min_round=self.last_round + 1, follow=False)
+        for task_events in events.decode_batches(batches):
+            self.apply_events(task_events)
+
+    # ----- firing -----
+
+    def next_due(self):
+        """Earliest time a scheduled task is due (deadline + grace or next attempt), or None"""
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap:
+            due_at, task_id = self._heap[0]
+            if task_id in self._deadlines and self._due_at(task_id) == due_at:
+                return
+            heapq.heappop(self._heap)
+
+    def due(self, now=None):
+        """Pop and return the ids of every task refundable at `now`
+
+        They stay scheduled, without a heap entry, until their refund
+        settles them or fails.
+        """
+        now = self.clock() if now is None else now
+        task_ids = []
+        with self._lock:
+            self._drop_stale()
+            while self._heap and self._heap[0][0] < now:
+                task_ids.append(heapq.heappop(self._heap)[1])
+                self._drop_stale()
+        return task_ids
+
+    def run_once(self, now=None):
+        """Refund every due task; returns a RefundReport"""
+        task_ids = self.due(now)
+        batches = [task_ids[i:i + self.batch_size] for i in range(0, len(task_ids), self.batch_size)]
+        refunded, skipped, failed = [], [], []
+        if not batches:
+            return RefundReport(refunded, skipped, failed)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="refunds") as executor:
+            for report in executor.map(self._refund_batch, batches):
+                refunded += report.refunded
+                skipped += report.skipped
+                failed += report.failed
+        return RefundReport(refunded, skipped, failed)
+
+    def _refund_batch(self, task_ids):
+        skipped = []
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.sleep(self.retry_delay * 2 ** (attempt - 1))
+                task_ids, dropped = self._still_refundable(task_ids)
+                skipped += dropped
+                for task_id in dropped:
+                    self.cancel(task_id)
+                if not task_ids:
+                    return RefundReport([], skipped, [])
+            try:
+                self._send_refunds(task_ids)
+            except (error.AlgodHTTPError, error.ConfirmationTimeoutError, error.TransactionRejectedError):
+                continue
+            for task_id in task_ids:
+                self.cancel(task_id)
+            return RefundReport(task_ids, skipped, [])
+        self._retry_later(task_ids)
+        return RefundReport([], skipped, task_ids)
+
+    def _still_refundable(self, task_ids):
+        keep, dropped = [], []
+        for record in iter_tasks(self.algod, self.app_id, task_ids, len(task_ids)):
+            if record.status in REFUNDABLE:
+                keep.append(record.task_id)
+            else:
+                dropped.append(record.task_id)
+        dropped += sorted(set(task_ids) - set(keep) - set(dropped))  # boxes that disappeared
+        return keep, dropped
+
+    def _send_refunds(self, task_ids):
+        """One atomic group of refund_task calls, sent and confirmed"""
+        provider = params_provider(self.algod)
+        params = provider.get()
+        txns = []
+        for task_id in task_ids:
+            txns += bounty_client.build_method_call(params, self.sender, self.app_id,
+                                                    "refund_task", [task_id], task_id)
+        if len(txns) > 1:
+            transaction.assign_group_id(txns)
+        signed = [txn.sign(self.private_key) for txn in txns]
+        try:
+            self.algod.send_transactions(signed)
+        except error.AlgodHTTPError as e:
+            if "txn dead" in str(e):
+                provider.invalidate()
+            raise
+        info = transaction.wait_for_confirmation(self.algod, signed[-1].get_txid(), 4)
+        provider.observe_round(info.get("confirmed-round", 0))
+
+    def run(self, indexer_client=None, stop=None, poll_interval=DEFAULT_POLL_INTERVAL, on_report=None):
+        """Sync events and refund due tasks until `stop` (a threading.Event) is set"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            if indexer_client is not None:
+                self.sync(indexer_client)
+            report = self.run_once()
+            if on_report is not None and (report.refunded or report.skipped or report.failed):
+                on_report(report)
+            next_due = self.next_due()
+            wait = poll_interval
+            if next_due is not None:
+                wait = min(wait, max(0, next_due + 1 - self.clock()))
+            stop.wait(wait)
+
+
+def main():
+    from fleet import resolve_signer
+    parser = argparse.ArgumentParser(description="Refund BountyBoard tasks as their deadlines pass")
+    parser.add_argument("app_id", type=int)
+    parser.add_argument("--signer", required=True, help="env:VAR or file:PATH holding a mnemonic")
+    parser.add_argument("--network", help="network name (defaults to BOUNTYBOARD_NETWORK)")
+    parser.add_argument("--grace", type=int, default=DEFAULT_GRACE)
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    options = parser.parse_args()
+
+    algod_client = make_algod_client(options.network)
+    indexer_client = make_indexer_client(options.network)
+    scheduler = RefundScheduler(algod_client, resolve_signer(options.signer), options.app_id,
+                                grace=options.grace, max_in_flight=options.max_in_flight)
+    scheduler.last_round = algod_client.status()["last-round"]
+    scheduler.load_app()
+    print(f"Tracking {len(scheduler)} refundable tasks of app {options.app_id}")
+
+    def report(result):
+        print(f"refunded {result.refunded} skipped {result.skipped} failed {result.failed}")
+
+    try:
+        scheduler.run(indexer_client, poll_interval=options.poll_interval, on_report=report)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
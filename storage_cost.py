@@ -0,0 +1,213 @@
+"""
+Minimum-balance cost model for the task storage layouts
+Computes the exact box MBR a task locks in the app account for each
+layout, projects the funding an app needs for N more tasks and tops
+app accounts up with batched payments
+"""
+
+import abc
+import argparse
+import json
+from typing import NamedTuple
+
+from algosdk import account, transaction
+from algosdk.logic import get_application_address
+
+from bounty_board import TaskStatus
+from bounty_contract import TaskBox
+from params_cache import suggested_params
+from teal_vm import ACCOUNT_MIN_BALANCE, box_min_balance
+
+
+DEFAULT_TITLE_LEN = 48
+DEFAULT_DESCRIPTION_LEN = 256
+MAX_GROUP_SIZE = 16
+
+# Statuses whose amount the app account still holds in escrow
+ESCROWED = (TaskStatus.OPEN, TaskStatus.CLAIMED, TaskStatus.SUBMITTED)
+
+# Box name suffixes of the per-field layout, each behind itob(task_id)
+PER_FIELD_BOXES = ("_client", "_freelancer", "_amount", "_deadline",
+                   "_status", "_title", "_description", "_proof")
+
+
+class Layout(abc.ABC):
+    """How one task is laid out in boxes"""
+
+    name = None
+
+    @abc.abstractmethod
+    def boxes(self, title_len, description_len):
+        """(name length, size) of every box a task with these string lengths creates"""
+
+    def task_mbr(self, title_len, description_len):
+        """microAlgos of minimum balance one task locks in the app account"""
+        return sum(box_min_balance(name_len, size)
+                   for name_len, size in self.boxes(title_len, description_len))
+
+
+class PerFieldLayout(Layout):
+    """Eight boxes per task, one per field (the original hand-written bounty_approval.teal)
+
+    The proof box is created with a single byte and keeps that size.
+    """
+
+    name = "per_field"
+    SIZES = {"_client": 32, "_freelancer": 32, "_amount": 8, "_deadline": 8,
+             "_status": 8, "_proof": 1}
+
+    def boxes(self, title_len, description_len):
+        sizes = dict(self.SIZES, _title=title_len, _description=description_len)
+        return [(8 + len(suffix), sizes[suffix]) for suffix in PER_FIELD_BOXES]
+
+
+class FixedLayout(Layout):
+    """One fixed-size box per task named by itob(task_id)
+
+    `overhead` is the part of the box not available to title and
+    description; when given, tasks that do not fit are rejected.
+    """
+
+    def __init__(self, name, size, overhead=None):
+        self.name = name
+        self.size = size
+        self.overhead = overhead
+
+    def boxes(self, title_len, description_len):
+        if self.overhead is not None and self.overhead + title_len + description_len > self.size:
+            raise ValueError(f"{title_len + description_len} bytes of text do not fit "
+                             f"the {self.size}-byte {self.name} box")
+        return [(8, self.size)]
+
+
+class PackedLayout(Layout):
+    """One box per task sized to its record (bounty_contract.TaskBox)"""
+
+    name = "packed"
+
+    def boxes(self, title_len, description_len):
+        return [(len(TaskBox.PREFIX) + 8, TaskBox.size(title_len, description_len))]
+
+
+PER_FIELD = PerFieldLayout()
+FIXED_300 = FixedLayout("fixed_300", 300)  # the original hand-written program in bounty_board.py
+FIXED_512 = FixedLayout("fixed_512", 512, overhead=TaskBox.HEADER_SIZE + 4)
+PACKED = PackedLayout()
+
+LAYOUTS = {layout.name: layout for layout in (PER_FIELD, FIXED_300, FIXED_512, PACKED)}
+
+
+class Projection(NamedTuple):
+    layout: str
+    tasks: int
+    per_task: int           # microAlgos of box MBR per task
+    boxes_per_task: int
+    storage: int            # box MBR for all the tasks
+    required_balance: int   # account minimum + storage
+
+
+def project_funding(layout, tasks, title_len=DEFAULT_TITLE_LEN,
+                    description_len=DEFAULT_DESCRIPTION_LEN):
+    """Balance an app account needs to hold `tasks` tasks of the given string lengths
+
+    Escrowed task amounts are paid in by the clients and come on top.
+    """
+    per_task = layout.task_mbr(title_len, description_len)
+    storage = per_task * tasks
+    return Projection(layout.name, tasks, per_task,
+                      len(layout.boxes(title_len, description_len)),
+                      storage, ACCOUNT_MIN_BALANCE + storage)
+
+
+def funding_for(layout, tasks):
+    """Box MBR for concrete tasks given as (title, description) strings or byte lengths"""
+    total = 0
+    for title, description in tasks:
+        title_len = title if isinstance(title, int) else len(title.encode())
+        description_len = description if isinstance(description, int) else len(description.encode())
+        total += layout.task_mbr(title_len, description_len)
+    return total
+
+
+def outstanding_escrow(client, app_id):
+    """microAlgos the app account holds for tasks not yet approved or refunded"""
+    from task_reader import iter_tasks
+    return sum(task.amount for task in iter_tasks(client, app_id) if task.status in ESCROWED)
+
+
+def shortfall(client, app_id, layout, tasks_ahead, title_len=DEFAULT_TITLE_LEN,
+              description_len=DEFAULT_DESCRIPTION_LEN, escrow=None):
+    """microAlgos an app account is missing to take `tasks_ahead` more tasks
+
+    Starts from the account's current minimum balance, so boxes that
+    already exist are counted exactly. `escrow` is the amount still owed
+    to freelancers or clients, which the balance must also cover; it is
+    read from the task boxes when not given (see outstanding_escrow()).
+    """
+    if escrow is None:
+        escrow = outstanding_escrow(client, app_id)
+    info = client.account_info(get_application_address(app_id))
+    minimum = max(info.get("min-balance", ACCOUNT_MIN_BALANCE), ACCOUNT_MIN_BALANCE)
+    target = minimum + layout.task_mbr(title_len, description_len) * tasks_ahead + escrow
+    return max(0, target - info["amount"])
+
+
+def top_up(client, funder_private_key, amounts, wait_rounds=4):
+    """Pay {app_id: microAlgos} from one funder, up to 16 payments per atomic group
+
+    Every group is sent before any confirmation is awaited. Returns the
+    txid of each group's first payment.
+    """
+    from deploy import wait_for_confirmations
+    funder = account.address_from_private_key(funder_private_key)
+    payments = [(app_id, amount) for app_id, amount in amounts.items() if amount > 0]
+    if not payments:
+        return []
+    params = suggested_params(client)
+    txids = []
+    for start in range(0, len(payments), MAX_GROUP_SIZE):
+        txns = [transaction.PaymentTxn(funder, params, get_application_address(app_id), amount)
+                for app_id, amount in payments[start:start + MAX_GROUP_SIZE]]
+        if len(txns) > 1:
+            transaction.assign_group_id(txns)
+        txids.append(client.send_transactions([txn.sign(funder_private_key) for txn in txns]))
+    outcomes = wait_for_confirmations(client, txids, wait_rounds)
+    for txid in txids:
+        if isinstance(outcomes[txid], Exception):
+            raise outcomes[txid]
+    return txids
+
+
+def auto_top_up(client, funder_private_key, app_ids, layout, tasks_ahead,
+                title_len=DEFAULT_TITLE_LEN, description_len=DEFAULT_DESCRIPTION_LEN):
+    """Top up every app that cannot take `tasks_ahead` more tasks; returns {app_id: paid}
+
+    Each app's open escrow is read from its task boxes, so the balance
+    it is topped up to covers those tasks as well as the new boxes.
+    """
+    amounts = {app_id: shortfall(client, app_id, layout, tasks_ahead, title_len, description_len)
+               for app_id in app_ids}
+    amounts = {app_id: amount for app_id, amount in amounts.items() if amount}
+    top_up(client, funder_private_key, amounts)
+    return amounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the box MBR of the task storage layouts")
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--title-len", type=int, default=DEFAULT_TITLE_LEN)
+    parser.add_argument("--description-len", type=int, default=DEFAULT_DESCRIPTION_LEN)
+    options = parser.parse_args()
+
+    report = {}
+    for name, layout in LAYOUTS.items():
+        try:
+            report[name] = project_funding(layout, options.tasks, options.title_len,
+                                           options.description_len)._asdict()
+        except ValueError as e:
+            report[name] = {"error": str(e)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Batched submission queue for BountyBoard method calls
+Operations submitted from any thread are packed into atomic groups of up
+to 16 transactions with one pooled fee (inner payments included), signed
+in bulk, sent with send_transactions and confirmed together. Transient
+failures are retried with jittered exponential backoff without ever
+sending a second copy of a group that may still confirm.
+"""
+
+import http.client
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from algosdk import account, error, transaction
+
+import bounty_client
+from deploy import wait_for_confirmations
+from params_cache import params_provider
+
+
+DEFAULT_LINGER = 0.005  # seconds to wait for more operations before packing
+DEFAULT_MAX_BATCH = 256  # operations packed per cycle
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 0.25
+DEFAULT_MAX_BACKOFF = 8.0
+
+_CLOSE = object()
+
+
+class Operation:
+    """One queued method call and the Future its caller holds"""
+
+    __slots__ = ("method_name", "args", "task_id", "payment", "future")
+
+    def __init__(self, method_name, args, task_id, payment):
+        self.method_name = method_name
+        self.args = args
+        self.task_id = task_id
+        self.payment = payment
+        self.future = Future()
+
+    @property
+    def size(self):
+        """Transactions this operation adds to a group"""
+        return 2 if self.payment else 1
+
+
+class UnknownOutcomeError(Exception):
+    """A group may have confirmed but its result cannot be read back
+
+    Its operations fail instead of being sent again, which could apply
+    them twice.
+    """
+
+
+class _Group:
+    """Operations sent as one atomic group, and the signed copy last sent"""
+
+    __slots__ = ("ops", "signed", "last_valid", "attempts", "error", "first_task_id")
+
+    def __init__(self, ops):
+        self.ops = ops
+        self.signed = None
+        self.last_valid = 0
+        self.attempts = 0
+        self.error = None
+        self.first_task_id = None  # of the ids reserved for its creates
+
+    @property
+    def creates(self):
+        return [op for op in self.ops if op.method_name == "create_task"]
+
+    @property
+    def txid(self):
+        return self.signed[-1].get_txid()
+
+
+def is_transient(exc):
+    """Whether a failed send or wait is worth retrying"""
+    if isinstance(exc, error.AlgodHTTPError):
+        return exc.code is None or exc.code == 429 or exc.code >= 500 or "txn dead" in str(exc)
+    return isinstance(exc, (OSError, http.client.HTTPException, error.ConfirmationTimeoutError))
+
+
+class SubmissionQueue:
+    """Background sender for one application and one signer
+
+        with SubmissionQueue(client, private_key, app_id) as board:
+            futures = [board.submit("claim_task", [task_id]) for task_id in ids]
+            infos = [f.result() for f in futures]
+
+    submit() returns a concurrent.futures.Future (asyncio callers can use
+    asyncio.wrap_future) resolving to the call's confirmed tx info, or to
+    the new task id for create_task. A group rejected by the contract is
+    split so each operation succeeds or fails on its own. Pass an
+    `indexer_client` to tell whether a group algod no longer remembers
+    confirmed; see _already_sent().
+    """
+
+    def __init__(self, algod_client, private_key, app_id, max_group_size=bounty_client.MAX_GROUP_SIZE,
+                 linger=DEFAULT_LINGER, max_batch=DEFAULT_MAX_BATCH, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff=DEFAULT_BACKOFF, max_backoff=DEFAULT_MAX_BACKOFF, wait_rounds=4,
+                 sleep=time.sleep, indexer_client=None):
+        self.algod = algod_client
+        self.indexer = indexer_client
+        self.private_key = private_key
+        self.sender = account.address_from_private_key(private_key)
+        self.app_id = app_id
+        self.max_group_size = min(max_group_size, bounty_client.MAX_GROUP_SIZE)
+        self.linger = linger
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.wait_rounds = wait_rounds
+        self.sleep = sleep
+        self.groups_sent = 0
+        self.retries = 0
+        self._params = params_provider(algod_client)
+        self._task_ids = bounty_client.TaskIds()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="submission-queue", daemon=True)
+        self._worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, method_name, args, task_id=None, payment=0):
+        """Queue one method call; `task_id` defaults to args[0] (reserved for create_task)"""
+        if method_name not in bounty_client.METHODS:
+            raise ValueError(f"Unknown method '{method_name}'")
+        if task_id is None and method_name != "create_task":
+            task_id = args[0]
+        op = Operation(method_name, args, task_id, payment)
+        self._queue.put(op)
+        return op.future
+
+    def close(self):
+        """Send everything still queued, then stop the worker"""
+        self._queue.put(_CLOSE)
+        self._worker.join()
+
+    # ----- worker -----
+
+    def _run(self):
+        closing = False
+        while not closing:
+            ops = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.linger
+            while True:
+                if item is _CLOSE:
+                    closing = True
+                    break
+                ops.append(item)
+                if len(ops) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if ops:
+                try:
+                    self._process(ops)
+                except Exception as e:
+                    for op in ops:
+                        if not op.future.done():
+                            op.future.set_exception(e)
+
+    def _pack(self, ops):
+        groups, current, size = [], [], 0
+        for op in ops:
+            if size + op.size > self.max_group_size:
+                groups.append(_Group(current))
+                current, size = [], 0
+            current.append(op)
+            size += op.size
+        if current:
+            groups.append(_Group(current))
+        return groups
+
+    def _process(self, ops):
+        pending = self._pack(ops)
+        while pending:
+            retry = []
+            for group in self._send_and_confirm(pending):
+                if group.error is None:
+                    self._resolve(group)
+                elif isinstance(group.error, UnknownOutcomeError):
+                    for op in group.ops:
+                        op.future.set_exception(group.error)
+                elif group.signed is None and group.attempts <= self.max_retries:
+                    retry.append(group)  # rebuilt with fresh params or task ids
+                elif not is_transient(group.error) and len(group.ops) > 1:
+                    # Rejected atomically, so nothing landed: isolate the culprit
+                    retry += [_Group([op]) for op in group.ops]
+                elif is_transient(group.error) and group.attempts <= self.max_retries:
+                    retry.append(group)
+                else:
+                    for op in group.ops:
+                        op.future.set_exception(group.error)
+            if any(group.attempts for group in retry):
+                self.retries += 1
+                attempt = max(group.attempts for group in retry)
+                self.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            pending = retry
+
+    def _build(self, group, params):
+        """Sign the group's transactions with one pooled fee"""
+        creates = group.creates
+        if creates:
+            counter = None
+            if self._task_ids.needs_counter():
+                counter = bounty_client.read_task_counter(self.algod, self.app_id)
+            group.first_task_id = self._task_ids.reserve(len(creates), counter)
+            for offset, op in enumerate(creates):
+                op.task_id = group.first_task_id + offset
+        txns, inner = [], 0
+        for op in group.ops:
+            call = bounty_client.build_method_call(params, self.sender, self.app_id, op.method_name,
+                                                   op.args, op.task_id, op.payment)
+            for txn in call:
+                txn.group = None
+            txns += call
+            inner += bounty_client.INNER_TXNS.get(op.method_name, 0)
+        bounty_client.pool_fees(params, txns, inner)
+        if len(txns) > 1:
+            transaction.assign_group_id(txns)
+        group.signed = [txn.sign(self.private_key) for txn in txns]
+        group.last_valid = params.last
+
+    def _release(self, group, landed):
+        """Settle the task ids reserved for the group's creates (see bounty_client.TaskIds)"""
+        if group.first_task_id is not None:
+            self._task_ids.release(group.first_task_id, len(group.creates), landed)
+            group.first_task_id = None
+
+    def _already_sent(self, group, current_round):
+        """Whether the group's last signed copy is pooled or confirmed, looked up by txid
+
+        algod's pending info only covers the pool and recently confirmed
+        transactions. A txid it does not know is looked up on the indexer,
+        if any; a copy that is still valid may also simply be sent again,
+        as algod refuses a txid already in the ledger. Otherwise raises
+        UnknownOutcomeError. Other algod errors propagate (and are retried).
+        """
+        try:
+            info = self.algod.pending_transaction_info(group.txid)
+        except error.AlgodHTTPError as e:
+            if e.code != 404:
+                raise
+        else:
+            return not info.get("pool-error")
+        if self.indexer is not None:
+            response = self.indexer.search_transactions(txid=group.txid)
+            if response.get("transactions"):
+                raise UnknownOutcomeError(f"group {group.txid} confirmed but algod no longer has its result")
+            if response.get("current-round", 0) >= group.last_valid:
+                return False
+        if group.last_valid > current_round:
+            return False
+        raise UnknownOutcomeError(f"cannot tell whether group {group.txid} confirmed "
+                                  f"by its last valid round {group.last_valid}")
+
+    def _send_and_confirm(self, groups):
+        """Send every group, then wait for all of them at once; sets group.error"""
+        current_round = self.algod.status()["last-round"]
+        self._params.observe_round(current_round)
+        sent = []
+        for group in groups:
+            group.attempts += 1
+            group.error = None
+            if group.signed is not None:
+                try:
+                    if self._already_sent(group, current_round):
+                        sent.append(group)
+                        continue
+                except Exception as e:
+                    group.error = e
+                    continue
+            if group.signed is None or group.last_valid <= current_round:
+                # Never sent, or its last copy can no longer confirm: rebuild
+                self._release(group, False)
+                self._build(group, self._params.get())
+            try:
+                self.algod.send_transactions(group.signed)
+            except Exception as e:
+                if "already in ledger" in str(e):
+                    e = UnknownOutcomeError(f"group {group.txid} confirmed but algod no longer has its result")
+                    self._release(group, None)
+                elif isinstance(e, error.AlgodHTTPError) and e.code is not None and e.code < 500:
+                    # Refused outright, so none of it landed
+                    self._release(group, False)
+                    if group.creates and "invalid Box reference" in str(e):
+                        # Its reserved ids were taken (by another sender, say): rebuild
+                        self._task_ids.stale = True
+                        group.signed = None
+                else:
+                    # The group may have reached the pool before the error
+                    try:
+                        reached_pool = self._already_sent(group, current_round)
+                    except Exception:
+                        reached_pool = None
+                    if reached_pool:
+                        self.groups_sent += 1
+                        sent.append(group)
+                        continue
+                    self._release(group, reached_pool)
+                if "txn dead" in str(e):
+                    self._params.invalidate()
+                    group.signed = None
+                group.error = e
+                continue
+            self.groups_sent += 1
+            sent.append(group)
+
+        outcomes = wait_for_confirmations(self.algod, [group.txid for group in sent], self.wait_rounds)
+        for group in sent:
+            outcome = outcomes[group.txid]
+            if isinstance(outcome, Exception):
+                group.error = outcome
+                if isinstance(outcome, error.TransactionRejectedError):
+                    self._release(group, False)
+        return groups
+
+    def _resolve(self, group):
+        results = []
+        for op, stxn in zip(group.ops, self._call_txns(group)):
+            info = self.algod.pending_transaction_info(stxn.get_txid())
+            if op.method_name == "create_task":
+                info = bounty_client.task_id_from_logs(info)
+            results.append(info)
+        landed = all(task_id == op.task_id for op, task_id in zip(group.ops, results)
+                     if op.method_name == "create_task")
+        self._release(group, True if landed else None)
+        for op, result in zip(group.ops, results):
+            op.future.set_result(result)
+
+    def _call_txns(self, group):
+        """The app call of each operation, in operation order"""
+        calls = []
+        index = 0
+        for op in group.ops:
+            index += op.size
+            calls.append(group.signed[index - 1])
+        return calls
@@ -0,0 +1,192 @@
+"""
+Vectorized analytics over a TaskTable
+Escrow and counts grouped by status, client or freelancer, deadline
+histograms, locked versus released escrow and payout velocity, all as
+NumPy reductions over the table's columns (no per-task Python loops)
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from bounty_board import TaskStatus
+from task_table import AddressTable, TaskTable
+
+
+# Escrow still held by the app for these statuses
+LOCKED_STATUSES = (TaskStatus.OPEN, TaskStatus.CLAIMED, TaskStatus.SUBMITTED, TaskStatus.REJECTED)
+ACTIVE_STATUSES = (TaskStatus.OPEN, TaskStatus.CLAIMED)
+STATUS_NAMES = {value: name for name, value in vars(TaskStatus).items() if not name.startswith("_")}
+STATUS_COUNT = len(STATUS_NAMES)
+
+GROUP_KEYS = ("status", "client", "freelancer")
+
+DAY = 86_400
+
+
+def _sum_by(index, amount, size):
+    """Exact uint64 sum of `amount` per value of `index` (0..size-1)"""
+    totals = np.zeros(size, dtype=np.uint64)
+    np.add.at(totals, index, amount)
+    return totals
+
+
+def group_by(table, key, statuses=None):
+    """(keys, task counts, escrow totals) per distinct value of a column
+
+    `key` is "status", "client" or "freelancer"; for the address columns
+    keys are AddressTable indexes (see table.addresses.address()). Only
+    keys that occur are returned. `statuses` restricts the tasks counted.
+    """
+    if key not in GROUP_KEYS:
+        raise ValueError(f"Cannot group by '{key}', expected one of {', '.join(GROUP_KEYS)}")
+    column = getattr(table, key)
+    amount = table.amount
+    if statuses is not None:
+        mask = np.isin(table.status, statuses)
+        column, amount = column[mask], amount[mask]
+    size = STATUS_COUNT if key == "status" else len(table.addresses)
+    counts = np.bincount(column, minlength=size)
+    totals = _sum_by(column, amount, size)
+    keys = np.flatnonzero(counts)
+    return keys, counts[keys], totals[keys]
+
+
+def escrow_by_status(table):
+    """{status name: {"tasks": n, "escrow": microAlgos}} for every status"""
+    counts = np.bincount(table.status, minlength=STATUS_COUNT)
+    totals = _sum_by(table.status, table.amount, STATUS_COUNT)
+    return {STATUS_NAMES[status]: {"tasks": int(counts[status]), "escrow": int(totals[status])}
+            for status in range(STATUS_COUNT)}
+
+
+def top_addresses(table, key, limit=10, statuses=None, by="tasks"):
+    """[(address, tasks, escrow)] for the busiest clients or freelancers"""
+    keys, counts, totals = group_by(table, key, statuses)
+    if key == "freelancer":
+        # Index 0 is the zero address of unclaimed tasks
+        keep = keys != 0
+        keys, counts, totals = keys[keep], counts[keep], totals[keep]
+    order = np.argsort(counts if by == "tasks" else totals, kind="stable")[::-1][:limit]
+    return [(table.addresses.address(int(keys[i])), int(counts[i]), int(totals[i])) for i in order]
+
+
+def claims_per_freelancer(table):
+    """(freelancer indexes, tasks claimed) over every task that left OPEN"""
+    keys, counts, _ = group_by(table, "freelancer")
+    keep = keys != 0
+    return keys[keep], counts[keep]
+
+
+def escrow_summary(table):
+    """microAlgos still locked, released to freelancers and refunded to clients"""
+    totals = _sum_by(table.status, table.amount, STATUS_COUNT)
+    return {
+        "locked": int(totals[list(LOCKED_STATUSES)].sum()),
+        "released": int(totals[TaskStatus.APPROVED]),
+        "refunded": int(totals[TaskStatus.REFUNDED]),
+    }
+
+
+def overdue(table, now, statuses=ACTIVE_STATUSES):
+    """Mask of tasks in `statuses` whose deadline has passed (refundable)"""
+    return (table.deadline < now) & np.isin(table.status, statuses)
+
+
+def deadline_histogram(table, now, bin_seconds=DAY, bins=30, statuses=ACTIVE_STATUSES):
+    """(bin start offsets from now, task counts, escrow) of upcoming and past deadlines
+
+    Bins are `bin_seconds` wide and centred on `now`: negative offsets
+    are overdue tasks. Deadlines outside the range land in the end bins.
+    """
+    mask = np.isin(table.status, statuses)
+    offsets = table.deadline[mask].astype(np.int64) - int(now)
+    index = np.floor_divide(offsets, bin_seconds) + bins // 2
+    np.clip(index, 0, bins - 1, out=index)
+    counts = np.bincount(index, minlength=bins)
+    totals = _sum_by(index, table.amount[mask], bins)
+    starts = (np.arange(bins) - bins // 2) * bin_seconds
+    return starts, counts, totals
+
+
+def payouts_from_transactions(transactions):
+    """(round times, amounts) of the payouts in indexer-format app calls"""
+    times, amounts = [], []
+    for txn in transactions:
+        for inner in txn.get("inner-txns", []):
+            payment = inner.get("payment-transaction")
+            if payment:
+                times.append(txn.get("round-time", 0))
+                amounts.append(payment["amount"])
+    return np.array(times, dtype=np.int64), np.array(amounts, dtype=np.uint64)
+
+
+def payout_velocity(times, amounts, bin_seconds=DAY):
+    """(bin start times, payouts, microAlgos paid) per `bin_seconds` window"""
+    if len(times) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.uint64)
+    start = int(times.min()) // bin_seconds * bin_seconds
+    index = (times - start) // bin_seconds
+    size = int(index.max()) + 1
+    return (start + np.arange(size) * bin_seconds, np.bincount(index, minlength=size),
+            _sum_by(index, amounts, size))
+
+
+def synthetic_table(tasks, clients=10_000, freelancers=50_000, now=None, seed=0):
+    """TaskTable of random tasks for benchmarks"""
+    rng = np.random.default_rng(seed)
+    now = int(time.time()) if now is None else now
+    addresses = AddressTable()
+    raw = rng.integers(0, 256, size=(clients + freelancers, 32), dtype=np.uint8)
+    for row in raw:
+        addresses.intern(row.tobytes())
+    status = rng.choice(STATUS_COUNT, size=tasks,
+                        p=[0.3, 0.2, 0.1, 0.3, 0.0, 0.1]).astype(np.uint8)
+    freelancer = rng.integers(1 + clients, 1 + clients + freelancers, size=tasks, dtype=np.uint32)
+    freelancer[status == TaskStatus.OPEN] = 0
+    return TaskTable.from_columns(
+        task_id=np.arange(tasks, dtype=np.uint64),
+        amount=rng.integers(100_000, 100_000_000, size=tasks, dtype=np.uint64),
+        deadline=(now + rng.integers(-30 * DAY, 30 * DAY, size=tasks)).astype(np.uint64),
+        status=status,
+        client=rng.integers(1, 1 + clients, size=tasks, dtype=np.uint32),
+        freelancer=freelancer,
+        addresses=addresses,
+    )
+
+
+def benchmark(sizes=(10_000, 100_000, 1_000_000), seed=0):
+    """Seconds each analytic takes on synthetic tables of the given sizes"""
+    now = int(time.time())
+    analytics = {
+        "escrow_by_status": lambda t: escrow_by_status(t),
+        "group_by_client": lambda t: group_by(t, "client"),
+        "group_by_freelancer": lambda t: group_by(t, "freelancer"),
+        "escrow_summary": lambda t: escrow_summary(t),
+        "overdue": lambda t: int(overdue(t, now).sum()),
+        "deadline_histogram": lambda t: deadline_histogram(t, now),
+    }
+    report = {}
+    for size in sizes:
+        table = synthetic_table(size, now=now, seed=seed)
+        timings = {}
+        for name, analytic in analytics.items():
+            started = time.perf_counter()
+            analytic(table)
+            timings[name] = round(time.perf_counter() - started, 6)
+        report[size] = {"table_bytes": table.nbytes, "seconds": timings}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the task analytics on synthetic tables")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args()
+    print(json.dumps(benchmark(options.sizes, options.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Local SQLite index of BountyBoard tasks
+Keyed by task_id with secondary indexes on status, client, freelancer
+and deadline, kept current by replaying the contract's event logs from
+the last processed round
+"""
+
+import sqlite3
+
+import events
+from bounty_board import TaskStatus
+from bounty_client import TaskRecord
+from task_reader import DEFAULT_PARALLELISM, iter_tasks
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id     INTEGER PRIMARY KEY,
+    client      TEXT NOT NULL,
+    freelancer  TEXT NOT NULL,
+    amount      INTEGER NOT NULL,
+    deadline    INTEGER NOT NULL,
+    status      INTEGER NOT NULL,
+    proof_hash  TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, task_id);
+CREATE INDEX IF NOT EXISTS tasks_client ON tasks (client, task_id);
+CREATE INDEX IF NOT EXISTS tasks_freelancer ON tasks (freelancer, task_id);
+CREATE INDEX IF NOT EXISTS tasks_deadline ON tasks (deadline);
+CREATE TABLE IF NOT EXISTS sync_state (
+    app_id     INTEGER PRIMARY KEY,
+    last_round INTEGER NOT NULL
+);
+"""
+
+COLUMNS = ", ".join(TaskRecord._fields)
+
+SEARCH_PAGE_SIZE = 1000
+
+
+class TaskIndex:
+    """Tasks of one application in SQLite, synced incrementally
+
+    Status changes are applied straight from the event logs and the
+    calling transaction (sender, args). Newly created tasks are read
+    from their boxes once, since the escrow amount lives in the grouped
+    payment rather than in the app call.
+    """
+
+    def __init__(self, app_id, path=":memory:"):
+        self.app_id = app_id
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self.db.execute("INSERT OR IGNORE INTO sync_state VALUES (?, 0)", (app_id,))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    @property
+    def last_round(self):
+        row = self.db.execute("SELECT last_round FROM sync_state WHERE app_id = ?",
+                              (self.app_id,)).fetchone()
+        return row[0]
+
+    # ----- sync -----
+
+    def sync(self, indexer_client, algod_client, parallelism=DEFAULT_PARALLELISM):
+        """Replay app calls confirmed after last_round; returns events applied"""
+        min_round = self.last_round + 1
+        current_round = min_round - 1
+        created = set()
+        applied = 0
+        next_page = None
+        with self.db:
+            while True:
+                response = indexer_client.search_transactions(
+                    application_id=self.app_id, min_round=min_round,
+                    limit=SEARCH_PAGE_SIZE, next_page=next_page)
+                current_round = max(current_round, response.get("current-round", 0))
+                for txn in response["transactions"]:
+                    current_round = max(current_round, txn["confirmed-round"])
+                    applied += self._apply(txn, created)
+                next_page = response.get("next-token")
+                if not next_page or not response["transactions"]:
+                    break
+
+            self.db.executemany(
+                f"INSERT OR REPLACE INTO tasks ({COLUMNS}) VALUES ({', '.join('?' * len(TaskRecord._fields))})",
+                iter_tasks(algod_client, self.app_id, sorted(created), parallelism))
+            self.db.execute("UPDATE sync_state SET last_round = ? WHERE app_id = ?",
+                            (current_round, self.app_id))
+        return applied
+
+    def _apply(self, txn, created):
+        """Apply the events logged by one app call"""
+        applied = 0
+        for event in events.decode_transaction(txn):
+            if event.kind == events.TASK_CREATED:
+                created.add(event.task_id)
+            elif event.kind == events.TASK_CLAIMED:
+                self._update(event.task_id, status=TaskStatus.CLAIMED, freelancer=event.sender)
+            elif event.kind == events.WORK_SUBMITTED:
+                proof = event.args[2][2:].decode() if len(event.args) > 2 else ""
+                self._update(event.task_id, status=TaskStatus.SUBMITTED, proof_hash=proof)
+            elif event.kind == events.TASK_APPROVED:
+                self._update(event.task_id, status=TaskStatus.APPROVED)
+            elif event.kind == events.TASK_REJECTED:
+                self._update(event.task_id, status=TaskStatus.CLAIMED, proof_hash="")
+            elif event.kind == events.TASK_REFUNDED:
+                self._update(event.task_id, status=TaskStatus.REFUNDED)
+            else:
+                continue
+            applied += 1
+        return applied
+
+    def _update(self, task_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self.db.execute(f"UPDATE tasks SET {assignments} WHERE task_id = ?",
+                        (*fields.values(), task_id))
+
+    # ----- queries -----
+
+    def _select(self, where="", params=()):
+        rows = self.db.execute(f"SELECT {COLUMNS} FROM tasks {where}", params)
+        return [TaskRecord(*row) for row in rows]
+
+    def get(self, task_id):
+        records = self._select("WHERE task_id = ?", (task_id,))
+        return records[0] if records else None
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def all(self):
+        return self._select("ORDER BY task_id")
+
+    def by_status(self, status):
+        return self._select("WHERE status = ? ORDER BY task_id", (status,))
+
+    def by_client(self, address):
+        return self._select("WHERE client = ? ORDER BY task_id", (address,))
+
+    def by_freelancer(self, address):
+        return self._select("WHERE freelancer = ? ORDER BY task_id", (address,))
+
+    def due_before(self, timestamp, statuses=(TaskStatus.OPEN, TaskStatus.CLAIMED)):
+        """Tasks in `statuses` whose deadline is before `timestamp`, soonest first"""
+        placeholders = ", ".join("?" * len(statuses))
+        return self._select(f"WHERE deadline < ? AND status IN ({placeholders}) ORDER BY deadline",
+                            (timestamp, *statuses))
@@ -0,0 +1,193 @@
+"""
+Bulk reader for the task boxes written by bounty_contract.approval_program
+Lists box names once, fetches task boxes concurrently with bounded
+parallelism and streams decoded TaskRecords. iter_tasks_simulated reads
+the same records through the contract's get_tasks method instead, many
+tasks per simulate call
+"""
+
+import argparse
+import base64
+import collections
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from algosdk import error, transaction
+from algosdk.logic import get_application_address
+from algosdk.v2client import algod, models
+
+from async_client import PooledAlgodClient
+from bounty_client import (MAX_BOX_REFS, MAX_GROUP_SIZE, decode_task, decode_task_page,
+                           encode_args, method_box_refs, read_task, read_task_counter)
+from bounty_contract import GET_TASKS_MAX_BYTES, TaskBox
+from local_algod import make_algod_client
+from params_cache import suggested_params
+from storage_cost import DEFAULT_DESCRIPTION_LEN, DEFAULT_TITLE_LEN
+
+
+DEFAULT_PARALLELISM = 16
+
+
+def list_task_ids(client, app_id):
+    """Ids of every task box of the application, from a single box listing"""
+    prefix = TaskBox.PREFIX
+    task_ids = []
+    for box in client.application_boxes(app_id).get("boxes", []):
+        name = base64.b64decode(box["name"])
+        if name.startswith(prefix) and len(name) == len(prefix) + 8:
+            task_ids.append(int.from_bytes(name[len(prefix):], "big"))
+    task_ids.sort()
+    return task_ids
+
+
+def _fetch(client, app_id, task_id):
+    try:
+        response = client.application_box_by_name(app_id, TaskBox.name(task_id))
+    except error.AlgodHTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+    return task_id, base64.b64decode(response["value"])
+
+
+def iter_task_boxes(client, app_id, task_ids=None, parallelism=DEFAULT_PARALLELISM):
+    """Yield (task_id, box bytes) per task, in task id order
+
+    At most `parallelism` box fetches are in flight at a time, so memory
+    stays flat however large the board is. Boxes deleted between the
+    listing and the fetch are skipped.
+    """
+    if task_ids is None:
+        task_ids = list_task_ids(client, app_id)
+    task_ids = iter(task_ids)
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="task-reader") as executor:
+        window = collections.deque()
+        for task_id in task_ids:
+            window.append(executor.submit(_fetch, client, app_id, task_id))
+            if len(window) >= parallelism:
+                break
+        while window:
+            box = window.popleft().result()
+            next_id = next(task_ids, None)
+            if next_id is not None:
+                window.append(executor.submit(_fetch, client, app_id, next_id))
+            if box is not None:
+                yield box
+
+
+def iter_tasks(client, app_id, task_ids=None, parallelism=DEFAULT_PARALLELISM):
+    """Yield a TaskRecord per task, in task id order (see iter_task_boxes)"""
+    for task_id, value in iter_task_boxes(client, app_id, task_ids, parallelism):
+        yield decode_task(task_id, value)
+
+
+def read_all_tasks(client, app_id, parallelism=DEFAULT_PARALLELISM):
+    """Every task of the board as a list of TaskRecords"""
+    return list(iter_tasks(client, app_id, parallelism=parallelism))
+
+
+def _tasks_per_call(record_size):
+    """Tasks to request per get_tasks call for records of about `record_size` bytes"""
+    return max(1, min(MAX_BOX_REFS, GET_TASKS_MAX_BYTES // (record_size + 2)))
+
+
+def _missing_ranges(next_id, end, fetched, per_call):
+    """Up to one group of (start, count) ranges covering ids not yet fetched"""
+    ranges = []
+    task_id = next_id
+    while task_id < end and len(ranges) < MAX_GROUP_SIZE:
+        if task_id in fetched:
+            task_id += 1
+            continue
+        count = 1
+        while count < per_call and task_id + count < end and task_id + count not in fetched:
+            count += 1
+        ranges.append((task_id, count))
+        task_id += count
+    return ranges
+
+
+def simulate_pages(client, app_id, ranges, sender=None, params=None):
+    """TaskRecords of each (start, count) range, from one simulated group of get_tasks calls
+
+    Nothing is signed or committed, so no fees are paid. The sender
+    defaults to the application account, which always exists.
+    """
+    sender = sender or get_application_address(app_id)
+    params = params or suggested_params(client)
+    txns = [transaction.ApplicationNoOpTxn(
+                sender, params, app_id, app_args=encode_args("get_tasks", [start, count]),
+                boxes=method_box_refs(app_id, "get_tasks", [start, count]))
+            for start, count in ranges]
+    if len(txns) > 1:
+        transaction.assign_group_id(txns)
+    request = models.SimulateRequest(
+        txn_groups=[models.SimulateRequestTransactionGroup(
+            txns=[transaction.SignedTransaction(txn, None) for txn in txns])],
+        allow_empty_signatures=True,
+    )
+    group = client.simulate_transactions(request)["txn-groups"][0]
+    if group.get("failure-message"):
+        raise error.AlgodHTTPError(f"get_tasks simulation failed: {group['failure-message']}")
+    pages = []
+    for (start, _), result in zip(ranges, group["txn-results"]):
+        returned = base64.b64decode(result["txn-result"]["logs"][-1])
+        pages.append(decode_task_page(start, returned[4 + 2:]))
+    return pages
+
+
+def iter_tasks_simulated(client, app_id, start=0, end=None, sender=None):
+    """Yield a TaskRecord per task from `start`, in task id order, via simulated get_tasks calls
+
+    Each simulate request carries a group of up to 16 get_tasks calls,
+    each returning as many records as fit in one log; ranges a call could
+    not finish are requested again. Tasks too large for a page on their
+    own are read from their box.
+    """
+    counter = read_task_counter(client, app_id)
+    end = counter if end is None else min(end, counter)
+    params = suggested_params(client)
+    per_call = _tasks_per_call(TaskBox.size(DEFAULT_TITLE_LEN, DEFAULT_DESCRIPTION_LEN))
+    fetched = {}
+    next_id = start
+    while next_id < end:
+        ranges = _missing_ranges(next_id, end, fetched, per_call)
+        pages = simulate_pages(client, app_id, ranges, sender, params)
+        sizes = []
+        for (range_start, _), records in zip(ranges, pages):
+            if not records:
+                fetched[range_start] = read_task(client, app_id, range_start)
+            for record in records:
+                fetched[record.task_id] = record
+            sizes += [TaskBox.size(len(r.title.encode()), len(r.description.encode())) for r in records]
+        if sizes:
+            per_call = _tasks_per_call(sum(sizes) // len(sizes))
+        while next_id in fetched:
+            yield fetched.pop(next_id)
+            next_id += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dump every BountyBoard task as JSON lines")
+    parser.add_argument("app_id", type=int)
+    parser.add_argument("--network", help="network name (defaults to BOUNTYBOARD_NETWORK)")
+    parser.add_argument("--parallelism", type=int, default=DEFAULT_PARALLELISM)
+    parser.add_argument("--simulate", action="store_true",
+                        help="page through the board with simulated get_tasks calls instead of box reads")
+    options = parser.parse_args()
+
+    client = make_algod_client(options.network)
+    if isinstance(client, algod.AlgodClient):
+        client = PooledAlgodClient(client.algod_token, client.algod_address,
+                                   client.headers, options.parallelism)
+    if options.simulate:
+        records = iter_tasks_simulated(client, options.app_id)
+    else:
+        records = iter_tasks(client, options.app_id, parallelism=options.parallelism)
+    for record in records:
+        sys.stdout.write(json.dumps(record._asdict()) + "\n")
+
+
+if __name__ == "__main__":
+    main()
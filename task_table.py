@@ -0,0 +1,250 @@
+"""
+Compact in-memory task models for analytics
+Task decodes fields lazily from a memoryview over the packed box bytes
+(see bounty_contract.TaskBox) without copying them; TaskTable holds many
+tasks column-wise in NumPy arrays with addresses interned in a packed
+32-byte table
+"""
+
+import base64
+
+import numpy as np
+from algosdk import encoding
+
+from bounty_contract import TaskBox
+
+
+_ZERO_ADDRESS = bytes(32)
+
+
+def _uint64(view, offset):
+    return int.from_bytes(view[offset:offset + 8], "big")
+
+
+class Task:
+    """One task record backed by its box bytes
+
+    Only the buffer and the task id are stored; fields are decoded when
+    read, and the raw_* accessors return memoryview slices (no copy).
+    """
+
+    __slots__ = ("task_id", "_view")
+
+    def __init__(self, task_id, value):
+        self.task_id = task_id
+        self._view = memoryview(value)
+
+    @classmethod
+    def from_box_response(cls, task_id, response):
+        """Task from an algod application_box_by_name response"""
+        return cls(task_id, base64.b64decode(response["value"]))
+
+    @property
+    def raw_client(self):
+        return self._view[TaskBox.CLIENT:TaskBox.CLIENT + 32]
+
+    @property
+    def raw_freelancer(self):
+        return self._view[TaskBox.FREELANCER:TaskBox.FREELANCER + 32]
+
+    @property
+    def client(self):
+        return encoding.encode_address(bytes(self.raw_client))
+
+    @property
+    def freelancer(self):
+        return encoding.encode_address(bytes(self.raw_freelancer))
+
+    @property
+    def amount(self):
+        return _uint64(self._view, TaskBox.AMOUNT)
+
+    @property
+    def deadline(self):
+        return _uint64(self._view, TaskBox.DEADLINE)
+
+    @property
+    def status(self):
+        return self._view[TaskBox.STATUS]
+
+    @property
+    def raw_proof_hash(self):
+        start = TaskBox.PROOF + 1
+        return self._view[start:start + self._view[TaskBox.PROOF]]
+
+    @property
+    def proof_hash(self):
+        return str(self.raw_proof_hash, "utf-8")
+
+    def _description_at(self):
+        return TaskBox.TITLE + 2 + int.from_bytes(self._view[TaskBox.TITLE:TaskBox.TITLE + 2], "big")
+
+    @property
+    def raw_title(self):
+        return self._view[TaskBox.TITLE + 2:self._description_at()]
+
+    @property
+    def raw_description(self):
+        start = self._description_at()
+        length = int.from_bytes(self._view[start:start + 2], "big")
+        return self._view[start + 2:start + 2 + length]
+
+    @property
+    def title(self):
+        return str(self.raw_title, "utf-8")
+
+    @property
+    def description(self):
+        return str(self.raw_description, "utf-8")
+
+    def to_record(self):
+        """The equivalent bounty_client.TaskRecord"""
+        from bounty_client import TaskRecord
+        return TaskRecord(self.task_id, self.client, self.freelancer, self.amount,
+                          self.deadline, self.status, self.proof_hash, self.title,
+                          self.description)
+
+    def __repr__(self):
+        return f"Task(task_id={self.task_id}, status={self.status}, amount={self.amount})"
+
+
+class AddressTable:
+    """Interned 32-byte addresses stored back to back in one bytearray"""
+
+    def __init__(self):
+        self._packed = bytearray()
+        self._index = {}
+        self.intern(_ZERO_ADDRESS)  # index 0: unclaimed freelancer
+
+    def __len__(self):
+        return len(self._index)
+
+    def intern(self, raw):
+        """Index of a raw address, adding it if new"""
+        raw = bytes(raw)
+        index = self._index.get(raw)
+        if index is None:
+            index = self._index[raw] = len(self._index)
+            self._packed += raw
+        return index
+
+    def index(self, address):
+        """Index of a base32 address, or -1 if it never appeared"""
+        return self._index.get(encoding.decode_address(address), -1)
+
+    def raw(self, index):
+        return bytes(self._packed[index * 32:(index + 1) * 32])
+
+    def address(self, index):
+        return encoding.encode_address(self.raw(index))
+
+    def as_array(self):
+        """(n, 32) uint8 copy of the table
+
+        A view would pin the bytearray, and the next intern() growing it
+        would raise BufferError.
+        """
+        return np.frombuffer(bytes(self._packed), dtype=np.uint8).reshape(-1, 32)
+
+
+class TaskTable:
+    """Column store of many tasks
+
+    Columns are NumPy arrays grown geometrically; client and freelancer
+    are uint32 indexes into a shared AddressTable. Text fields are not
+    kept, only what analytics needs. A task costs 33 bytes here instead
+    of a dict of Python strings.
+    """
+
+    COLUMNS = {
+        "task_id": np.uint64,
+        "amount": np.uint64,
+        "deadline": np.uint64,
+        "status": np.uint8,
+        "client": np.uint32,
+        "freelancer": np.uint32,
+    }
+
+    def __init__(self, capacity=1024):
+        self.addresses = AddressTable()
+        self._size = 0
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+
+    def __len__(self):
+        return self._size
+
+    def __getattr__(self, name):
+        # Column access (table.amount, table.status...) trimmed to the filled rows
+        columns = self.__dict__.get("_columns")
+        if columns is None or name not in columns:
+            raise AttributeError(name)
+        return columns[name][:self._size]
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._columns["task_id"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def append(self, task_id, value):
+        """Add one task from its packed box bytes"""
+        self._reserve(1)
+        view = memoryview(value)
+        row = self._size
+        columns = self._columns
+        columns["task_id"][row] = task_id
+        columns["amount"][row] = _uint64(view, TaskBox.AMOUNT)
+        columns["deadline"][row] = _uint64(view, TaskBox.DEADLINE)
+        columns["status"][row] = view[TaskBox.STATUS]
+        columns["client"][row] = self.addresses.intern(view[TaskBox.CLIENT:TaskBox.CLIENT + 32])
+        columns["freelancer"][row] = self.addresses.intern(view[TaskBox.FREELANCER:TaskBox.FREELANCER + 32])
+        self._size += 1
+
+    def extend(self, boxes):
+        """Add (task_id, box bytes) pairs"""
+        for task_id, value in boxes:
+            self.append(task_id, value)
+
+    @classmethod
+    def from_boxes(cls, boxes, capacity=1024):
+        table = cls(capacity)
+        table.extend(boxes)
+        return table
+
+    @classmethod
+    def from_app(cls, client, app_id, parallelism=None):
+        """Load every task box of an application"""
+        from task_reader import DEFAULT_PARALLELISM, iter_task_boxes
+        return cls.from_boxes(iter_task_boxes(client, app_id, parallelism=parallelism or DEFAULT_PARALLELISM))
+
+    @classmethod
+    def from_columns(cls, task_id, amount, deadline, status, client, freelancer, addresses):
+        """Table over existing column arrays; `addresses` is an AddressTable they index"""
+        table = cls(capacity=max(1, len(task_id)))
+        table.addresses = addresses
+        for name, values in zip(cls.COLUMNS, (task_id, amount, deadline, status, client, freelancer)):
+            table._columns[name] = np.ascontiguousarray(values, dtype=cls.COLUMNS[name])
+        table._size = len(task_id)
+        return table
+
+    def row(self, index):
+        """One row as a dict with base32 addresses"""
+        return {
+            "task_id": int(self.task_id[index]),
+            "client": self.addresses.address(int(self.client[index])),
+            "freelancer": self.addresses.address(int(self.freelancer[index])),
+            "amount": int(self.amount[index]),
+            "deadline": int(self.deadline[index]),
+            "status": int(self.status[index]),
+        }
+
+    @property
+    def nbytes(self):
+        """Memory held by the filled part of the columns plus the address table"""
+        return sum(self.__getattr__(name).nbytes for name in self.COLUMNS) + len(self.addresses) * 32
@@ -0,0 +1,279 @@
+"""
+Offline cost profiler for the BountyBoard approval programs
+Runs each ARC-4 method against a local ledger and reports opcode cost,
+box I/O, inner transactions, state changes and budget headroom as JSON
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import bounty_board
+import bounty_client
+import bounty_contract
+from teal_vm import (
+    APPL, APP_CALL_BUDGET, MIN_TXN_FEE, PAY,
+    Ledger, app_address, sha512_256,
+)
+
+
+def actor_address(label):
+    """Deterministic 32-byte address for a named test actor"""
+    return sha512_256(label.encode())
+
+
+CREATOR = actor_address("creator")
+CLIENT = actor_address("client")
+FREELANCER = actor_address("freelancer")
+
+TASK_AMOUNT = 2_000_000
+APP_FUNDING = 1_000_000
+
+
+class ProgramVariant:
+    """An approval program routing ARC-4 calls: where its source comes from and which methods it routes"""
+
+    def __init__(self, name, load_source, methods=None):
+        self.name = name
+        self.load_source = load_source
+        self.methods = set(methods or bounty_board.METHOD_SIGNATURES)
+
+
+# The hand-written program and the PyTeal build. bounty_approval.teal is
+# not profiled on its own: contract_build writes it from the PyTeal build.
+VARIANTS = [
+    ProgramVariant("bounty_board.APPROVAL_PROGRAM", lambda: bounty_board.APPROVAL_PROGRAM,
+                   bounty_board.APPROVAL_ROUTES),
+    ProgramVariant("bounty_contract.approval_program", bounty_contract.approval_teal),
+]
+
+
+def next_task_id(ledger, app_id):
+    """Id the next create_task call on a local ledger will get"""
+    return ledger.apps[app_id].global_state.get(bounty_client.TASK_COUNTER_KEY.encode(), 0)
+
+
+def build_call(app_id, sender, method_name, args, payment=0, task_id=None):
+    """Transaction group (as TEAL field dicts) for one method call
+
+    Args and box references are the ones bounty_client sends. Only create_task
+    uses `task_id`, the id it will create (see next_task_id()); every
+    other method names its task in args[0].
+    """
+    if method_name != "create_task":
+        task_id = None
+    refs = bounty_client.method_box_refs(app_id, method_name, args, task_id)
+    call = {
+        "TypeEnum": APPL,
+        "Sender": sender,
+        "Fee": MIN_TXN_FEE * (1 + bounty_client.INNER_TXNS.get(method_name, 0)),
+        "ApplicationID": app_id,
+        "OnCompletion": 0,
+        "ApplicationArgs": bounty_client.encode_args(method_name, args),
+        "Boxes": [(0, name) for _, name in refs],
+    }
+    if not payment:
+        return [call]
+    pay = {
+        "TypeEnum": PAY,
+        "Sender": sender,
+        "Fee": MIN_TXN_FEE,
+        "Receiver": app_address(app_id),
+        "Amount": payment,
+    }
+    return [pay, call]
+
+
+def deploy_variant(ledger, source, clear_source=bounty_board.CLEAR_PROGRAM):
+    """Create and fund an application on a local ledger, returning its id"""
+    result = ledger.execute([{
+        "TypeEnum": APPL,
+        "Sender": CREATOR,
+        "Fee": MIN_TXN_FEE,
+        "ApplicationID": 0,
+        "ApprovalProgram": source,
+        "ClearStateProgram": clear_source,
+        "GlobalNumUint": 1,
+        "ExtraProgramPages": 3,
+    }])
+    if not result.ok:
+        raise RuntimeError(f"app creation failed: {result.error}")
+    app_id = result.group[0]["CreatedApplicationID"]
+    ledger.fund(app_address(app_id), APP_FUNDING)
+    return app_id
+
+
+def lifecycle(deadline, first_task_id=0):
+    """Calls exercising every method once: (method, sender, args, payment, profiled)
+
+    The two tasks it creates get ids first_task_id and first_task_id + 1.
+    """
+    first, second = first_task_id, first_task_id + 1
+    return [
+        ("create_task", CLIENT, ["Logo design", "Vector logo for a bakery", deadline], TASK_AMOUNT, True),
+        ("claim_task", FREELANCER, [first], 0, True),
+        ("submit_work", FREELANCER, [first, "bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi"], 0, True),
+        ("reject_task", CLIENT, [first], 0, True),
+        ("submit_work", FREELANCER, [first, "bafybeihdwdcefgh4dqkjv67uzcmw7ojee6xedzdetojuzjevtenxquvyku"], 0, False),
+        ("approve_task", CLIENT, [first], 0, True),
+        ("create_task", CLIENT, ["Copy edit", "Proofread a landing page", deadline], TASK_AMOUNT, False),
+        ("refund_task", CLIENT, [second], 0, True),
+        ("get_tasks", CLIENT, [first, 2], 0, True),
+    ]
+
+
+def profile_variant(variant):
+    """Run the lifecycle for one program variant and collect per-method costs"""
+    ledger = Ledger()
+    for account in (CREATOR, CLIENT, FREELANCER):
+        ledger.fund(account, 100_000_000)
+    source = variant.load_source()
+    report = {"source_lines": len(source.splitlines()), "methods": {}}
+    try:
+        app_id = deploy_variant(ledger, source)
+    except RuntimeError as e:
+        report["error"] = str(e)
+        return report
+
+    for method_name, sender, args, payment, profiled in lifecycle(ledger.timestamp + 86_400):
+        if method_name not in variant.methods:
+            continue
+        group = build_call(app_id, sender, method_name, args, payment, next_task_id(ledger, app_id))
+        result = ledger.execute(group)
+        if not profiled:
+            continue
+        evaluation = result.app_results[-1] if result.app_results else None
+        report["methods"][method_name] = {
+            "ok": result.ok,
+            "error": result.error,
+            "opcode_cost": evaluation.cost if evaluation else 0,
+            "budget": result.budget,
+            "headroom": result.budget - result.cost,
+            "box_bytes_read": evaluation.box_bytes_read if evaluation else 0,
+            "box_bytes_written": evaluation.box_bytes_written if evaluation else 0,
+            "box_refs": evaluation.box_refs if evaluation else 0,
+            "inner_txns": len(evaluation.inner_txns) if evaluation else 0,
+            "group_size": len(group),
+            "state_changes": {
+                "balances": len(result.diff.balances),
+                "global_state": len(result.diff.global_state),
+                "boxes": len(result.diff.boxes),
+            },
+        }
+    return report
+
+
+def benchmark(variant, iterations=500):
+    """Interpreter throughput: run the lifecycle `iterations` times on one ledger"""
+    ledger = Ledger()
+    for account in (CREATOR, CLIENT, FREELANCER):
+        ledger.fund(account, 10 ** 15)
+    app_id = deploy_variant(ledger, variant.load_source())
+    ledger.fund(app_address(app_id), 10 ** 12)
+    calls = 0
+    start = time.perf_counter()
+    for iteration in range(iterations):
+        for method_name, sender, args, payment, _ in lifecycle(ledger.timestamp + 86_400, 2 * iteration):
+            if method_name not in variant.methods:
+                continue
+            result = ledger.execute(build_call(app_id, sender, method_name, args, payment,
+                                               next_task_id(ledger, app_id)))
+            calls += 1
+            if not result.ok:
+                return {"calls": calls, "error": f"{method_name}: {result.error}"}
+    elapsed = time.perf_counter() - start
+    return {"calls": calls, "seconds": round(elapsed, 3), "calls_per_second": round(calls / elapsed)}
+
+
+def regressions(report, baseline):
+    """Methods whose opcode cost grew, or that stopped passing, since `baseline`"""
+    found = []
+    for name, variant in report["variants"].items():
+        old_methods = baseline.get("variants", {}).get(name, {}).get("methods", {})
+        for method_name, stats in variant["methods"].items():
+            old = old_methods.get(method_name)
+            if old is None:
+                continue
+            if old["ok"] and not stats["ok"]:
+                found.append(f"{name} {method_name}: now fails ({stats['error']})")
+            elif stats["opcode_cost"] > old["opcode_cost"]:
+                found.append(f"{name} {method_name}: opcode cost "
+                             f"{old['opcode_cost']} -> {stats['opcode_cost']}")
+    return found
+
+
+def comparison(report, baseline):
+    """Per-method opcode cost and box bytes read before and after, as markdown tables"""
+    lines = []
+    for name, variant in report["variants"].items():
+        old_methods = baseline.get("variants", {}).get(name, {}).get("methods", {})
+        rows = [(method_name, old_methods[method_name], stats)
+                for method_name, stats in variant["methods"].items()
+                if method_name in old_methods and old_methods[method_name]["ok"] and stats["ok"]]
+        if not rows:
+            continue
+        lines += [f"### {name}", "",
+                  "| method | opcodes before | opcodes after | saved | box bytes read before | after |",
+                  "|---|---:|---:|---:|---:|---:|"]
+        for method_name, old, new in rows:
+            saved = old["opcode_cost"] - new["opcode_cost"]
+            percent = 100 * saved / old["opcode_cost"] if old["opcode_cost"] else 0
+            lines.append(f"| {method_name} | {old['opcode_cost']} | {new['opcode_cost']} "
+                         f"| {saved} ({percent:.0f}%) | {old['box_bytes_read']} | {new['box_bytes_read']} |")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def profile(variants=VARIANTS):
+    """Profile every program variant and return the JSON-ready report"""
+    return {
+        "generated_at": int(time.time()),
+        "budget_per_app_call": APP_CALL_BUDGET,
+        "variants": {variant.name: profile_variant(variant) for variant in variants},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile BountyBoard approval programs offline")
+    parser.add_argument("--variant", action="append",
+                        help="only profile the named variant (repeatable)")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--bench", type=int, metavar="N",
+                        help="also time N lifecycle runs per variant")
+    parser.add_argument("--baseline", help="fail if any opcode cost grew since this report")
+    parser.add_argument("--compare", metavar="REPORT",
+                        help="print a markdown table of per-method savings against this report")
+    options = parser.parse_args()
+
+    variants = VARIANTS
+    if options.variant:
+        variants = [v for v in VARIANTS if v.name in options.variant]
+    report = profile(variants)
+    if options.bench:
+        for variant in variants:
+            report["variants"][variant.name]["benchmark"] = benchmark(variant, options.bench)
+    text = json.dumps(report, indent=2)
+
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(text + "\n")
+        print(f"✓ Profile written to {options.output}")
+    else:
+        print(text)
+
+    if options.compare:
+        with open(options.compare, "r") as f:
+            print(comparison(report, json.load(f)))
+
+    if options.baseline:
+        with open(options.baseline, "r") as f:
+            found = regressions(report, json.load(f))
+        for line in found:
+            print(f"✗ {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1464 @@
+"""
+Local AVM interpreter for BountyBoard approval programs
+Runs TEAL source against an in-memory ledger and reports opcode cost
+and the state each transaction group changed
+"""
+
+import base64
+import hashlib
+import time
+from functools import lru_cache
+
+
+# Protocol constants
+MIN_TXN_FEE = 1000
+APP_CALL_BUDGET = 700
+BOX_IO_QUOTA = 1024
+MAX_BOX_SIZE = 32768
+ACCOUNT_MIN_BALANCE = 100_000
+BOX_FLAT_MIN_BALANCE = 2_500
+BOX_BYTE_MIN_BALANCE = 400
+APP_PAGE_MIN_BALANCE = 100_000
+SCHEMA_UINT_MIN_BALANCE = 28_500
+SCHEMA_BYTES_MIN_BALANCE = 50_000
+
+ZERO_ADDRESS = bytes(32)
+
+# Stand-in "bytecode" produced by the local compiler: a version byte, a
+# marker and the TEAL source itself, so it can be cached and run anywhere
+LOCAL_BYTECODE_PREFIX = b"\x0alocal-teal:"
+
+# Transaction types and on-completion actions as used by `int` pseudo-ops
+PAY = 1
+APPL = 6
+NAMED_INTS = {
+    "unknown": 0, "pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6,
+    "NoOp": 0, "OptIn": 1, "CloseOut": 2, "ClearState": 3,
+    "UpdateApplication": 4, "DeleteApplication": 5,
+}
+DELETE_APPLICATION = 5
+
+# Opcodes whose cost differs from 1
+OPCODE_COSTS = {
+    "sha256": 35,
+    "keccak256": 130,
+    "sha512_256": 45,
+    "ed25519verify": 1900,
+}
+
+
+class TealError(Exception):
+    """Raised when a program or transaction group fails"""
+
+
+def sha512_256(data):
+    """SHA-512/256 digest used for addresses and ARC-4 selectors"""
+    return hashlib.new("sha512_256", data).digest()
+
+
+def method_selector(signature):
+    """ARC-4 4-byte selector for a method signature"""
+    return sha512_256(signature.encode())[:4]
+
+
+def app_address(app_id):
+    """Escrow address (raw 32 bytes) of an application"""
+    return sha512_256(b"appID" + app_id.to_bytes(8, "big"))
+
+
+def box_min_balance(name_len, size):
+    """Minimum balance increase for holding one box"""
+    return BOX_FLAT_MIN_BALANCE + BOX_BYTE_MIN_BALANCE * (name_len + size)
+
+
+# ========== ASSEMBLER ==========
+
+def _tokenize(line):
+    """Split a TEAL line into tokens, honouring quotes and // comments"""
+    tokens = []
+    i, n = 0, len(line)
+    while i < n:
+        c = line[i]
+        if c.isspace():
+            i += 1
+        elif line.startswith("//", i):
+            break
+        elif c == '"':
+            j = i + 1
+            while j < n and line[j] != '"':
+                j += 2 if line[j] == "\\" else 1
+            tokens.append(line[i:j + 1])
+            i = j + 1
+        else:
+            j = i
+            while j < n and not line[j].isspace():
+                j += 1
+            tokens.append(line[i:j])
+            i = j
+    return tokens
+
+
+def _parse_string(token):
+    """Decode a double-quoted TEAL string literal"""
+    body = token[1:-1]
+    out = bytearray()
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == "\\":
+            nxt = body[i + 1]
+            if nxt == "x":
+                out.append(int(body[i + 2:i + 4], 16))
+                i += 4
+                continue
+            out += {"n": b"\n", "r": b"\r", "t": b"\t", "0": b"\0"}.get(nxt, nxt.encode())
+            i += 2
+        else:
+            out += c.encode()
+            i += 1
+    return bytes(out)
+
+
+def _parse_bytes(tokens):
+    """Decode a byte constant from its immediate tokens"""
+    first = tokens[0]
+    if first.startswith('"'):
+        return _parse_string(first)
+    if first.startswith("0x"):
+        return bytes.fromhex(first[2:])
+    for prefix in ("base64", "b64", "base32", "b32"):
+        if first.startswith(prefix + "(") and first.endswith(")"):
+            return _decode_base(prefix, first[len(prefix) + 1:-1])
+        if first == prefix:
+            return _decode_base(prefix, tokens[1])
+    raise TealError(f"cannot parse byte constant {' '.join(tokens)}")
+
+
+def _decode_base(prefix, text):
+    if prefix.endswith("64"):
+        return base64.b64decode(text)
+    return base64.b32decode(text + "=" * (-len(text) % 8))
+
+
+def _parse_int(token):
+    if token in NAMED_INTS:
+        return NAMED_INTS[token]
+    return int(token, 0)
+
+
+def _parse_addr(token):
+    raw = base64.b32decode(token + "=" * (-len(token) % 8))
+    return raw[:32]
+
+
+class Program:
+    """Pre-decoded TEAL program: a list of (opname, immediates) plus labels"""
+
+    __slots__ = ("ops", "lines", "labels", "version")
+
+    def __init__(self, source):
+        self.ops = []
+        self.lines = []
+        self.labels = {}
+        self.version = 1
+        for lineno, raw in enumerate(source.splitlines(), 1):
+            stripped = raw.strip()
+            if stripped.startswith("#pragma"):
+                parts = stripped.split()
+                if len(parts) >= 3 and parts[1] == "version":
+                    self.version = int(parts[2])
+                continue
+            tokens = _tokenize(raw)
+            while tokens and tokens[0].endswith(":") and not tokens[0].startswith('"'):
+                self.labels[tokens.pop(0)[:-1]] = len(self.ops)
+            if not tokens:
+                continue
+            self.ops.append(self._decode(tokens[0], tokens[1:]))
+            self.lines.append(lineno)
+        self._resolve_labels()
+
+    @staticmethod
+    def _decode(name, args):
+        """Turn pseudo-ops into their concrete form and parse immediates"""
+        if name in ("int", "pushint"):
+            return ("pushint", _parse_int(args[0]))
+        if name in ("byte", "pushbytes"):
+            return ("pushbytes", _parse_bytes(args))
+        if name == "addr":
+            return ("pushbytes", _parse_addr(args[0]))
+        if name == "method":
+            return ("pushbytes", method_selector(_parse_string(args[0]).decode()))
+        if name == "pushints":
+            return ("pushints", tuple(_parse_int(a) for a in args))
+        if name == "pushbytess":
+            return ("pushbytess", tuple(_parse_bytes([a]) for a in args))
+        if name == "intcblock":
+            return ("intcblock", tuple(_parse_int(a) for a in args))
+        if name == "bytecblock":
+            return ("bytecblock", tuple(_parse_bytes([a]) for a in args))
+        if name.startswith("intc_") or name.startswith("bytec_"):
+            base, index = name.split("_")
+            return (base, int(index))
+        if name in ("txn", "txna", "gtxn", "gtxna", "gtxns", "gtxnsa",
+                    "global", "itxn_field", "itxn", "txnas", "gtxnas", "gtxnsas"):
+            return (name, tuple(int(a) if a.lstrip("-").isdigit() else a for a in args))
+        if name in ("b", "bz", "bnz", "callsub"):
+            return (name, args[0])
+        if name in ("match", "switch"):
+            return (name, tuple(args))
+        if args:
+            return (name, tuple(int(a) for a in args) if len(args) > 1 else int(args[0]))
+        return (name, None)
+
+    def _resolve_labels(self):
+        for i, (name, imm) in enumerate(self.ops):
+            try:
+                if name in ("b", "bz", "bnz", "callsub"):
+                    self.ops[i] = (name, self.labels[imm])
+                elif name in ("match", "switch"):
+                    self.ops[i] = (name, tuple(self.labels[label] for label in imm))
+            except KeyError as e:
+                raise TealError(f"line {self.lines[i]}: unknown label {e.args[0]}")
+
+
+@lru_cache(maxsize=64)
+def assemble(source):
+    """Parse TEAL source once and reuse the decoded program"""
+    return Program(source)
+
+
+# ========== LEDGER ==========
+
+class AppState:
+    """On-ledger state of a single application"""
+
+    __slots__ = ("app_id", "creator", "approval", "clear", "global_state",
+                 "boxes", "num_uints", "num_byte_slices", "extra_pages")
+
+    def __init__(self, app_id, creator, approval, clear,
+                 num_uints=0, num_byte_slices=0, extra_pages=0):
+        self.app_id = app_id
+        self.creator = creator
+        self.approval = approval
+        self.clear = clear
+        self.global_state = {}
+        self.boxes = {}
+        self.num_uints = num_uints
+        self.num_byte_slices = num_byte_slices
+        self.extra_pages = extra_pages
+
+
+_MISSING = object()
+
+
+class Ledger:
+    """In-memory account, application and box state
+
+    Transaction groups are applied atomically: every mutation made while
+    a group runs is journaled and undone if the group fails.
+    """
+
+    def __init__(self, timestamp=None, first_app_id=1001):
+        self.balances = {}
+        self.apps = {}
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
+        self.round = 1
+        self.next_app_id = first_app_id
+        self.app_addresses = {}
+        self._journal = None
+
+    # ----- journaling -----
+
+    def _set(self, mapping, key, value):
+        if self._journal is not None:
+            self._journal.append((mapping, key, mapping.get(key, _MISSING)))
+        if value is _MISSING:
+            del mapping[key]
+        else:
+            mapping[key] = value
+
+    def _rollback(self, journal):
+        for mapping, key, old in reversed(journal):
+            if old is _MISSING:
+                mapping.pop(key, None)
+            else:
+                mapping[key] = old
+
+    # ----- accounts -----
+
+    def fund(self, address, amount):
+        """Credit an account outside of any transaction (genesis funding)"""
+        self.balances[address] = self.balances.get(address, 0) + amount
+
+    def balance(self, address):
+        return self.balances.get(address, 0)
+
+    def charge_fee(self, sender, fee):
+        if self.balance(sender) < fee:
+            raise TealError(f"overspend: cannot pay fee {fee}")
+        self._set(self.balances, sender, self.balance(sender) - fee)
+
+    def transfer(self, sender, receiver, amount):
+        if self.balance(sender) < amount:
+            raise TealError(f"overspend: balance {self.balance(sender)} < {amount}")
+        self._set(self.balances, sender, self.balance(sender) - amount)
+        self._set(self.balances, receiver, self.balance(receiver) + amount)
+
+    def min_balance(self, address):
+        """Minimum balance: base account, created apps and owned boxes"""
+        total = ACCOUNT_MIN_BALANCE
+        for app in self.apps.values():
+            if app.creator == address:
+                total += (APP_PAGE_MIN_BALANCE * (1 + app.extra_pages)
+                          + SCHEMA_UINT_MIN_BALANCE * app.num_uints
+                          + SCHEMA_BYTES_MIN_BALANCE * app.num_byte_slices)
+        app = self._app_by_address(address)
+        if app is not None:
+            for name, value in app.boxes.items():
+                total += box_min_balance(len(name), len(value))
+        return total
+
+    def _app_by_address(self, address):
+        app_id = self.app_addresses.get(address)
+        return self.apps.get(app_id) if app_id is not None else None
+
+    # ----- applications -----
+
+    def program_source(self, program):
+        """Resolve a program given as TEAL source or as local stand-in bytecode"""
+        if isinstance(program, str):
+            return program
+        program = bytes(program)
+        if not program.startswith(LOCAL_BYTECODE_PREFIX):
+            raise TealError("only programs compiled by the local stand-in can run here")
+        return program[len(LOCAL_BYTECODE_PREFIX):].decode()
+
+    def create_app(self, creator, approval, clear, num_uints=0,
+                   num_byte_slices=0, extra_pages=0):
+        app_id = self.next_app_id
+        self.next_app_id += 1
+        app = AppState(app_id, creator, self.program_source(approval),
+                       self.program_source(clear), num_uints, num_byte_slices,
+                       extra_pages)
+        self._set(self.apps, app_id, app)
+        self._set(self.app_addresses, app_address(app_id), app_id)
+        return app
+
+    def get_box(self, app_id, name):
+        return self.apps[app_id].boxes.get(name)
+
+    # ----- transaction groups -----
+
+    def execute(self, group, journal=None):
+        """Apply a transaction group atomically and return a GroupResult
+
+        Each transaction is a dict keyed by TEAL field names (Sender,
+        TypeEnum, Fee, Receiver, Amount, ApplicationID, ApplicationArgs, Boxes...).
+        If `journal` is given, the mutations of a successful group are
+        appended to it so the caller can undo them later.
+        """
+        group_journal = self._journal = []
+        next_app_id = self.next_app_id
+        result = GroupResult(group)
+        app_calls = sum(1 for txn in group if txn["TypeEnum"] == APPL)
+        budget = _Budget(APP_CALL_BUDGET * app_calls)
+        boxes = _BoxAccess(group)
+        touched = set()
+        index = 0
+        try:
+            for index, txn in enumerate(group):
+                txn["GroupIndex"] = index
+                sender = txn["Sender"]
+                self.charge_fee(sender, txn.get("Fee", MIN_TXN_FEE))
+                touched.add(sender)
+                if txn["TypeEnum"] == PAY:
+                    self.transfer(sender, txn["Receiver"], txn.get("Amount", 0))
+                    touched.add(txn["Receiver"])
+                    result.txn_results.append(None)
+                elif txn["TypeEnum"] == APPL:
+                    evaluation = self._app_call(group, index, budget, boxes, touched)
+                    result.txn_results.append(evaluation)
+                    if not evaluation.approved:
+                        raise TealError(evaluation.error or "rejected by approval program")
+                else:
+                    raise TealError(f"unsupported transaction type {txn['TypeEnum']}")
+
+            fees = sum(txn.get("Fee", MIN_TXN_FEE) for txn in group)
+            required = MIN_TXN_FEE * (len(group) + result.inner_txn_count)
+            if fees < required:
+                raise TealError(f"fee too small: group paid {fees}, needs {required}")
+            for address in touched:
+                balance = self.balance(address)
+                minimum = self.min_balance(address)
+                app = self._app_by_address(address)
+                if balance < minimum and (balance > 0 or (app is not None and app.boxes)):
+                    raise TealError(f"balance {balance} below min {minimum}")
+            result.diff = self._diff(group_journal)
+            if journal is not None:
+                journal.extend(group_journal)
+        except TealError as e:
+            self._rollback(group_journal)
+            self.next_app_id = next_app_id
+            result.ok = False
+            result.error = str(e)
+            result.failed_index = index
+        finally:
+            self._journal = None
+        result.budget = budget.limit
+        return result
+
+    def simulate(self, groups):
+        """Evaluate groups in order without keeping any of their effects
+
+        Each group sees the state left by the previous ones; evaluation
+        stops at the first failing group. Returns one GroupResult per
+        group evaluated.
+        """
+        journal = []
+        next_app_id = self.next_app_id
+        results = []
+        try:
+            for group in groups:
+                result = self.execute(group, journal)
+                results.append(result)
+                if not result.ok:
+                    break
+        finally:
+            self._rollback(journal)
+            self.next_app_id = next_app_id
+        return results
+
+    def _diff(self, journal):
+        """Net changes recorded in a group's journal"""
+        diff = StateDiff()
+        owners = {id(self.balances): (diff.balances, None)}
+        for app in self.apps.values():
+            owners[id(app.global_state)] = (diff.global_state, app.app_id)
+            owners[id(app.boxes)] = (diff.boxes, app.app_id)
+        seen = set()
+        for mapping, key, old in journal:
+            if (id(mapping), key) in seen:
+                continue
+            seen.add((id(mapping), key))
+            old = None if old is _MISSING else old
+            new = mapping.get(key)
+            if mapping is self.apps:
+                if old is None and new is not None:
+                    diff.created_apps.append(key)
+                elif new is None and old is not None:
+                    diff.deleted_apps.append(key)
+                continue
+            owner = owners.get(id(mapping))
+            if owner is None or old == new:
+                continue
+            changes, app_id = owner
+            changes[key if app_id is None else (app_id, key)] = (old, new)
+        return diff
+
+    def _app_call(self, group, index, budget, boxes, touched):
+        txn = group[index]
+        app_id = txn.get("ApplicationID", 0)
+        if app_id == 0:
+            app = self.create_app(
+                txn["Sender"], txn["ApprovalProgram"], txn["ClearStateProgram"],
+                txn.get("GlobalNumUint", 0), txn.get("GlobalNumByteSlice", 0),
+                txn.get("ExtraProgramPages", 0))
+            txn["CreatedApplicationID"] = app.app_id
+        else:
+            app = self.apps.get(app_id)
+            if app is None:
+                raise TealError(f"application {app_id} does not exist")
+        evaluation = Evaluator(self, group, index, app, budget, boxes).run()
+        touched.add(app_address(app.app_id))
+        touched.update(inner["Receiver"] for inner in evaluation.inner_txns)
+        if evaluation.approved and txn.get("OnCompletion", 0) == DELETE_APPLICATION:
+            self._set(self.apps, app.app_id, _MISSING)
+        return evaluation
+
+
+class _Budget:
+    """Opcode budget pooled across the app calls of a group"""
+
+    __slots__ = ("limit", "used")
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+
+
+class _BoxAccess:
+    """Box references of a group and the I/O quota they buy, shared by its app calls
+
+    Every box an app call touches must be named by a reference in one of
+    the group's app calls (slot 0 is the call's own app, slot n its n-th
+    foreign app). Each reference, named or empty, adds BOX_IO_QUOTA bytes
+    to the group's quota, and every box touched uses up its full size.
+    """
+
+    __slots__ = ("group", "quota", "used", "sizes", "_refs")
+
+    def __init__(self, group):
+        self.group = group
+        self.quota = BOX_IO_QUOTA * sum(len(txn.get("Boxes", ())) for txn in group
+                                        if txn["TypeEnum"] == APPL)
+        self.used = 0
+        self.sizes = {}
+        self._refs = None
+
+    def _resolve(self):
+        refs = set()
+        for txn in self.group:
+            if txn["TypeEnum"] != APPL:
+                continue
+            own = txn.get("CreatedApplicationID") or txn.get("ApplicationID", 0)
+            foreign = txn.get("Applications", ())
+            for slot, name in txn.get("Boxes", ()):
+                if slot > len(foreign):
+                    raise TealError(f"box reference to foreign app {slot} out of range")
+                refs.add((foreign[slot - 1] if slot else own, bytes(name)))
+        return refs
+
+    def check(self, app_id, name):
+        if self._refs is None or (app_id, name) not in self._refs:
+            # Resolved again on a miss: an app created earlier in the group has an id now
+            self._refs = self._resolve()
+            if (app_id, name) not in self._refs:
+                raise TealError(f"invalid Box reference {name!r}")
+
+    def charge(self, app_id, name, size):
+        key = (app_id, name)
+        previous = self.sizes.get(key, 0)
+        if size > previous:
+            self.sizes[key] = size
+            self.used += size - previous
+            if self.used > self.quota:
+                raise TealError(f"box I/O budget exceeded: {self.used} > {self.quota} bytes")
+
+
+class StateDiff:
+    """Net state changes of a group as key -> (old, new); None means absent
+
+    Balances are keyed by address, global state and boxes by
+    (app_id, key).
+    """
+
+    __slots__ = ("balances", "global_state", "boxes", "created_apps", "deleted_apps")
+
+    def __init__(self):
+        self.balances = {}
+        self.global_state = {}
+        self.boxes = {}
+        self.created_apps = []
+        self.deleted_apps = []
+
+    def __bool__(self):
+        return bool(self.balances or self.global_state or self.boxes
+                    or self.created_apps or self.deleted_apps)
+
+    def to_dict(self):
+        def value(v):
+            return v.hex() if isinstance(v, bytes) else v
+
+        return {
+            "balances": {k.hex(): [old, new] for k, (old, new) in self.balances.items()},
+            "global_state": {f"{app_id}:{key.hex()}": [value(old), value(new)]
+                             for (app_id, key), (old, new) in self.global_state.items()},
+            "boxes": {f"{app_id}:{name.hex()}": [value(old), value(new)]
+                      for (app_id, name), (old, new) in self.boxes.items()},
+            "created_apps": self.created_apps,
+            "deleted_apps": self.deleted_apps,
+        }
+
+
+class GroupResult:
+    """Outcome of applying a transaction group"""
+
+    def __init__(self, group):
+        self.group = group
+        self.ok = True
+        self.error = None
+        self.failed_index = None
+        self.budget = 0
+        self.txn_results = []
+        self.diff = StateDiff()
+
+    @property
+    def app_results(self):
+        return [r for r in self.txn_results if r is not None]
+
+    @property
+    def cost(self):
+        return sum(r.cost for r in self.app_results)
+
+    @property
+    def inner_txn_count(self):
+        return sum(len(r.inner_txns) for r in self.app_results)
+
+    @property
+    def logs(self):
+        return [log for r in self.app_results for log in r.logs]
+
+
+class EvalResult:
+    """Outcome and resource usage of one approval program run"""
+
+    __slots__ = ("approved", "error", "cost", "logs", "inner_txns",
+                 "box_bytes_read", "box_bytes_written", "boxes_touched", "app_id")
+
+    def __init__(self, app_id):
+        self.app_id = app_id
+        self.approved = False
+        self.error = None
+        self.cost = 0
+        self.logs = []
+        self.inner_txns = []
+        self.box_bytes_read = 0
+        self.box_bytes_written = 0
+        self.boxes_touched = {}
+
+    @property
+    def box_refs(self):
+        """Box references needed to cover the boxes touched and their I/O quota"""
+        io_bytes = sum(self.boxes_touched.values())
+        return max(len(self.boxes_touched), -(-io_bytes // BOX_IO_QUOTA))
+
+    def to_dict(self):
+        return {
+            "approved": self.approved,
+            "error": self.error,
+            "cost": self.cost,
+            "logs": len(self.logs),
+            "inner_txns": len(self.inner_txns),
+            "box_bytes_read": self.box_bytes_read,
+            "box_bytes_written": self.box_bytes_written,
+            "box_refs": self.box_refs,
+        }
+
+
+# ========== EVALUATOR ==========
+
+TXN_FIELD_DEFAULTS = {
+    "Fee": MIN_TXN_FEE,
+    "Amount": 0,
+    "Receiver": ZERO_ADDRESS,
+    "ApplicationID": 0,
+    "OnCompletion": 0,
+    "NumAppArgs": 0,
+    "CloseRemainderTo": ZERO_ADDRESS,
+    "RekeyTo": ZERO_ADDRESS,
+    "Note": b"",
+    "Lease": bytes(32),
+    "FirstValid": 0,
+    "LastValid": 0,
+}
+
+
+class Evaluator:
+    """Executes one approval program run for one transaction of a group"""
+
+    def __init__(self, ledger, group, index, app, budget, boxes):
+        self.ledger = ledger
+        self.group = group
+        self.index = index
+        self.txn = group[index]
+        self.app = app
+        self.budget = budget
+        self.boxes = boxes
+        self.program = assemble(app.approval)
+        self.stack = []
+        self.scratch = [0] * 256
+        self.frames = []
+        self.intc = ()
+        self.bytec = ()
+        self.pending_itxn = None
+        self.result = EvalResult(app.app_id)
+
+    def run(self):
+        """Run to completion; errors are recorded on the result"""
+        ops = self.program.ops
+        result = self.result
+        budget = self.budget
+        pc = 0
+        try:
+            while True:
+                if pc >= len(ops):
+                    result.approved = self._final_approval()
+                    break
+                name, imm = ops[pc]
+                self.pc = pc + 1
+                step = OPCODE_COSTS.get(name, 1)
+                result.cost += step
+                budget.used += step
+                if budget.used > budget.limit:
+                    raise TealError("dynamic cost budget exceeded")
+                handler = _HANDLERS.get(name)
+                if handler is None:
+                    raise TealError(f"unsupported opcode {name}")
+                if handler(self, imm) is _STOP:
+                    break
+                pc = self.pc
+        except TealError as e:
+            result.approved = False
+            result.error = f"line {self.program.lines[pc]}: {e}" if pc < len(ops) else str(e)
+        except (IndexError, TypeError, ValueError, OverflowError, KeyError) as e:
+            result.approved = False
+            result.error = f"line {self.program.lines[pc]}: {ops[pc][0]} failed ({e})"
+        return result
+
+    def _final_approval(self):
+        if len(self.stack) != 1:
+            raise TealError(f"stack must hold one value at end, has {len(self.stack)}")
+        return self._int(self.stack[-1]) != 0
+
+    # ----- stack helpers -----
+
+    def pop(self):
+        try:
+            return self.stack.pop()
+        except IndexError:
+            raise TealError("stack underflow")
+
+    def _int(self, value):
+        if not isinstance(value, int):
+            raise TealError("expected uint64, got bytes")
+        return value
+
+    def _bytes(self, value):
+        if not isinstance(value, (bytes, bytearray)):
+            raise TealError("expected bytes, got uint64")
+        return bytes(value)
+
+    def pop_int(self):
+        return self._int(self.pop())
+
+    def pop_bytes(self):
+        return self._bytes(self.pop())
+
+    def push(self, value):
+        if isinstance(value, int):
+            if not 0 <= value < 2 ** 64:
+                raise TealError("uint64 overflow")
+        elif len(value) > 4096:
+            raise TealError("byte string exceeds 4096 bytes")
+        self.stack.append(value)
+
+    # ----- field access -----
+
+    def txn_field(self, txn, field, index=None):
+        if field == "NumAppArgs":
+            return len(txn.get("ApplicationArgs", ()))
+        if field == "NumBoxes":
+            return len(txn.get("Boxes", ()))
+        if field in ("ApplicationArgs", "Accounts", "Applications"):
+            values = txn.get(field, [])
+            if field == "Accounts" and index == 0:
+                return txn["Sender"]
+            if field == "Accounts":
+                index -= 1
+            if index >= len(values):
+                raise TealError(f"{field} index {index} out of range")
+            return values[index]
+        if field == "TypeEnum" or field in txn:
+            return txn[field]
+        if field in TXN_FIELD_DEFAULTS:
+            return TXN_FIELD_DEFAULTS[field]
+        raise TealError(f"unsupported txn field {field}")
+
+    def global_field(self, field):
+        ledger = self.ledger
+        if field == "GroupSize":
+            return len(self.group)
+        if field == "CurrentApplicationID":
+            return self.app.app_id
+        if field == "CurrentApplicationAddress":
+            return app_address(self.app.app_id)
+        if field == "ZeroAddress":
+            return ZERO_ADDRESS
+        if field == "LatestTimestamp":
+            return ledger.timestamp
+        if field == "Round":
+            return ledger.round
+        if field == "MinTxnFee":
+            return MIN_TXN_FEE
+        if field == "MinBalance":
+            return ACCOUNT_MIN_BALANCE
+        if field == "CreatorAddress":
+            return self.app.creator
+        if field == "OpcodeBudget":
+            return self.budget.limit - self.budget.used
+        if field == "GroupID":
+            return bytes(32)
+        raise TealError(f"unsupported global field {field}")
+
+    # ----- boxes -----
+
+    def _box(self, name):
+        if not 0 < len(name) <= 64:
+            raise TealError("box name must be 1-64 bytes")
+        self.boxes.check(self.app.app_id, name)
+        return self.app.boxes.get(name)
+
+    def _touch_box(self, name, size):
+        touched = self.result.boxes_touched
+        touched[name] = max(touched.get(name, 0), size)
+        self.boxes.charge(self.app.app_id, name, size)
+
+    def _write_box(self, name, value):
+        self.ledger._set(self.app.boxes, name, value)
+        self._touch_box(name, len(value))
+
+
+_STOP = object()
+_HANDLERS = {}
+
+
+def opcode(*names):
+    """Register an opcode handler"""
+    def register(fn):
+        for name in names:
+            _HANDLERS[name] = fn
+        return fn
+    return register
+
+
+# ----- constants -----
+
+@opcode("pushint", "pushbytes")
+def _op_push(vm, imm):
+    vm.stack.append(imm)
+
+
+@opcode("pushints", "pushbytess")
+def _op_pushn(vm, imm):
+    vm.stack.extend(imm)
+
+
+@opcode("intcblock")
+def _op_intcblock(vm, imm):
+    vm.intc = imm
+
+
+@opcode("bytecblock")
+def _op_bytecblock(vm, imm):
+    vm.bytec = imm
+
+
+@opcode("intc")
+def _op_intc(vm, imm):
+    vm.stack.append(vm.intc[imm])
+
+
+@opcode("bytec")
+def _op_bytec(vm, imm):
+    vm.stack.append(vm.bytec[imm])
+
+
+# ----- arithmetic and logic -----
+
+def _binary(fn):
+    def handler(vm, imm):
+        b = vm.pop_int()
+        a = vm.pop_int()
+        vm.push(int(fn(a, b)))
+    return handler
+
+
+for _name, _fn in {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: _checked_sub(a, b),
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a // _nonzero(b),
+    "%": lambda a, b: a % _nonzero(b),
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+    "&&": lambda a, b: bool(a) and bool(b),
+    "||": lambda a, b: bool(a) or bool(b),
+    "&": lambda a, b: a & b,
+    "|": lambda a, b: a | b,
+    "^": lambda a, b: a ^ b,
+    "shl": lambda a, b: (a << b) % 2 ** 64,
+    "shr": lambda a, b: a >> b,
+}.items():
+    _HANDLERS[_name] = _binary(_fn)
+
+
+def _checked_sub(a, b):
+    if b > a:
+        raise TealError("- would result negative")
+    return a - b
+
+
+def _nonzero(b):
+    if b == 0:
+        raise TealError("division by zero")
+    return b
+
+
+def _equal(vm):
+    b = vm.pop()
+    a = vm.pop()
+    if isinstance(a, int) != isinstance(b, int):
+        raise TealError("cannot compare uint64 to bytes")
+    return a == b
+
+
+@opcode("==")
+def _op_eq(vm, imm):
+    vm.stack.append(int(_equal(vm)))
+
+
+@opcode("!=")
+def _op_ne(vm, imm):
+    vm.stack.append(int(not _equal(vm)))
+
+
+@opcode("!")
+def _op_not(vm, imm):
+    vm.stack.append(int(vm.pop_int() == 0))
+
+
+@opcode("~")
+def _op_bitnot(vm, imm):
+    vm.stack.append(vm.pop_int() ^ (2 ** 64 - 1))
+
+
+# ----- byte strings -----
+
+@opcode("len")
+def _op_len(vm, imm):
+    vm.stack.append(len(vm.pop_bytes()))
+
+
+@opcode("itob")
+def _op_itob(vm, imm):
+    vm.stack.append(vm.pop_int().to_bytes(8, "big"))
+
+
+@opcode("btoi")
+def _op_btoi(vm, imm):
+    value = vm.pop_bytes()
+    if len(value) > 8:
+        raise TealError("btoi arg too long")
+    vm.stack.append(int.from_bytes(value, "big"))
+
+
+@opcode("concat")
+def _op_concat(vm, imm):
+    b = vm.pop_bytes()
+    a = vm.pop_bytes()
+    vm.push(a + b)
+
+
+def _slice(value, start, end):
+    if start > end or end > len(value):
+        raise TealError(f"extraction {start}:{end} out of range for {len(value)} bytes")
+    return value[start:end]
+
+
+@opcode("substring")
+def _op_substring(vm, imm):
+    start, end = imm
+    vm.stack.append(_slice(vm.pop_bytes(), start, end))
+
+
+@opcode("substring3")
+def _op_substring3(vm, imm):
+    end = vm.pop_int()
+    start = vm.pop_int()
+    vm.stack.append(_slice(vm.pop_bytes(), start, end))
+
+
+@opcode("extract")
+def _op_extract(vm, imm):
+    start, length = imm
+    value = vm.pop_bytes()
+    end = len(value) if length == 0 else start + length
+    vm.stack.append(_slice(value, start, end))
+
+
+@opcode("extract3")
+def _op_extract3(vm, imm):
+    length = vm.pop_int()
+    start = vm.pop_int()
+    vm.stack.append(_slice(vm.pop_bytes(), start, start + length))
+
+
+def _extract_uint(width):
+    def handler(vm, imm):
+        start = vm.pop_int()
+        value = _slice(vm.pop_bytes(), start, start + width)
+        vm.stack.append(int.from_bytes(value, "big"))
+    return handler
+
+
+_HANDLERS["extract_uint16"] = _extract_uint(2)
+_HANDLERS["extract_uint32"] = _extract_uint(4)
+_HANDLERS["extract_uint64"] = _extract_uint(8)
+
+
+@opcode("replace2")
+def _op_replace2(vm, imm):
+    new = vm.pop_bytes()
+    value = vm.pop_bytes()
+    _slice(value, imm, imm + len(new))
+    vm.stack.append(value[:imm] + new + value[imm + len(new):])
+
+
+@opcode("replace3")
+def _op_replace3(vm, imm):
+    new = vm.pop_bytes()
+    start = vm.pop_int()
+    value = vm.pop_bytes()
+    _slice(value, start, start + len(new))
+    vm.stack.append(value[:start] + new + value[start + len(new):])
+
+
+@opcode("getbyte")
+def _op_getbyte(vm, imm):
+    index = vm.pop_int()
+    vm.stack.append(_slice(vm.pop_bytes(), index, index + 1)[0])
+
+
+@opcode("setbyte")
+def _op_setbyte(vm, imm):
+    byte = vm.pop_int()
+    index = vm.pop_int()
+    value = vm.pop_bytes()
+    _slice(value, index, index + 1)
+    vm.stack.append(value[:index] + bytes([byte]) + value[index + 1:])
+
+
+@opcode("bzero")
+def _op_bzero(vm, imm):
+    size = vm.pop_int()
+    if size > 4096:
+        raise TealError("bzero size exceeds 4096")
+    vm.stack.append(bytes(size))
+
+
+@opcode("sha256")
+def _op_sha256(vm, imm):
+    vm.stack.append(hashlib.sha256(vm.pop_bytes()).digest())
+
+
+@opcode("sha512_256")
+def _op_sha512_256(vm, imm):
+    vm.stack.append(sha512_256(vm.pop_bytes()))
+
+
+# ----- flow control -----
+
+@opcode("err")
+def _op_err(vm, imm):
+    raise TealError("err opcode executed")
+
+
+@opcode("assert")
+def _op_assert(vm, imm):
+    if vm.pop_int() == 0:
+        raise TealError("assert failed")
+
+
+@opcode("return")
+def _op_return(vm, imm):
+    vm.result.approved = vm.pop_int() != 0
+    return _STOP
+
+
+@opcode("b")
+def _op_b(vm, imm):
+    vm.pc = imm
+
+
+@opcode("bz")
+def _op_bz(vm, imm):
+    if vm.pop_int() == 0:
+        vm.pc = imm
+
+
+@opcode("bnz")
+def _op_bnz(vm, imm):
+    if vm.pop_int() != 0:
+        vm.pc = imm
+
+
+@opcode("callsub")
+def _op_callsub(vm, imm):
+    if len(vm.frames) >= 2048:
+        raise TealError("callsub depth exceeded")
+    vm.frames.append([vm.pc, None, 0, 0])
+    vm.pc = imm
+
+
+@opcode("proto")
+def _op_proto(vm, imm):
+    args, rets = imm
+    frame = vm.frames[-1]
+    if len(vm.stack) < args:
+        raise TealError("proto arguments missing")
+    frame[1] = len(vm.stack)
+    frame[2] = args
+    frame[3] = rets
+
+
+@opcode("retsub")
+def _op_retsub(vm, imm):
+    if not vm.frames:
+        raise TealError("retsub with empty callstack")
+    return_pc, frame_pointer, args, rets = vm.frames.pop()
+    if frame_pointer is not None:
+        if len(vm.stack) < frame_pointer + rets:
+            raise TealError("retsub with too few return values")
+        values = vm.stack[len(vm.stack) - rets:] if rets else []
+        del vm.stack[frame_pointer - args:]
+        vm.stack.extend(values)
+    vm.pc = return_pc
+
+
+def _frame_pointer(vm):
+    if not vm.frames or vm.frames[-1][1] is None:
+        raise TealError("frame access without proto")
+    return vm.frames[-1][1]
+
+
+@opcode("frame_dig")
+def _op_frame_dig(vm, imm):
+    vm.stack.append(vm.stack[_frame_pointer(vm) + imm])
+
+
+@opcode("frame_bury")
+def _op_frame_bury(vm, imm):
+    value = vm.pop()
+    vm.stack[_frame_pointer(vm) + imm] = value
+
+
+@opcode("match")
+def _op_match(vm, imm):
+    count = len(imm)
+    target = vm.pop()
+    candidates = vm.stack[len(vm.stack) - count:]
+    del vm.stack[len(vm.stack) - count:]
+    for i, candidate in enumerate(candidates):
+        if candidate == target and isinstance(candidate, int) == isinstance(target, int):
+            vm.pc = imm[i]
+            return
+
+
+@opcode("switch")
+def _op_switch(vm, imm):
+    index = vm.pop_int()
+    if index < len(imm):
+        vm.pc = imm[index]
+
+
+# ----- stack manipulation -----
+
+@opcode("pop")
+def _op_pop(vm, imm):
+    vm.pop()
+
+
+@opcode("popn")
+def _op_popn(vm, imm):
+    for _ in range(imm):
+        vm.pop()
+
+
+@opcode("dup")
+def _op_dup(vm, imm):
+    vm.stack.append(vm.stack[-1])
+
+
+@opcode("dup2")
+def _op_dup2(vm, imm):
+    vm.stack.extend(vm.stack[-2:])
+
+
+@opcode("dupn")
+def _op_dupn(vm, imm):
+    vm.stack.extend([vm.stack[-1]] * imm)
+
+
+@opcode("dig")
+def _op_dig(vm, imm):
+    vm.stack.append(vm.stack[-1 - imm])
+
+
+@opcode("bury")
+def _op_bury(vm, imm):
+    value = vm.pop()
+    vm.stack[-imm] = value
+
+
+@opcode("swap")
+def _op_swap(vm, imm):
+    vm.stack[-1], vm.stack[-2] = vm.stack[-2], vm.stack[-1]
+
+
+@opcode("cover")
+def _op_cover(vm, imm):
+    value = vm.pop()
+    vm.stack.insert(len(vm.stack) - imm, value)
+
+
+@opcode("uncover")
+def _op_uncover(vm, imm):
+    vm.stack.append(vm.stack.pop(-1 - imm))
+
+
+@opcode("select")
+def _op_select(vm, imm):
+    condition = vm.pop_int()
+    b = vm.pop()
+    a = vm.pop()
+    vm.stack.append(b if condition else a)
+
+
+# ----- scratch space -----
+
+@opcode("load")
+def _op_load(vm, imm):
+    vm.stack.append(vm.scratch[imm])
+
+
+@opcode("store")
+def _op_store(vm, imm):
+    vm.scratch[imm] = vm.pop()
+
+
+@opcode("loads")
+def _op_loads(vm, imm):
+    vm.stack.append(vm.scratch[vm.pop_int()])
+
+
+@opcode("stores")
+def _op_stores(vm, imm):
+    value = vm.pop()
+    vm.scratch[vm.pop_int()] = value
+
+
+# ----- transaction and global fields -----
+
+@opcode("txn")
+def _op_txn(vm, imm):
+    vm.stack.append(vm.txn_field(vm.txn, *imm))
+
+
+@opcode("txna")
+def _op_txna(vm, imm):
+    vm.stack.append(vm.txn_field(vm.txn, imm[0], imm[1]))
+
+
+@opcode("txnas")
+def _op_txnas(vm, imm):
+    vm.stack.append(vm.txn_field(vm.txn, imm[0], vm.pop_int()))
+
+
+@opcode("gtxn")
+def _op_gtxn(vm, imm):
+    vm.stack.append(vm.txn_field(_group_txn(vm, imm[0]), *imm[1:]))
+
+
+@opcode("gtxna")
+def _op_gtxna(vm, imm):
+    vm.stack.append(vm.txn_field(_group_txn(vm, imm[0]), imm[1], imm[2]))
+
+
+@opcode("gtxns")
+def _op_gtxns(vm, imm):
+    vm.stack.append(vm.txn_field(_group_txn(vm, vm.pop_int()), *imm))
+
+
+@opcode("gtxnsa")
+def _op_gtxnsa(vm, imm):
+    vm.stack.append(vm.txn_field(_group_txn(vm, vm.pop_int()), imm[0], imm[1]))
+
+
+def _group_txn(vm, index):
+    if index >= len(vm.group):
+        raise TealError(f"gtxn index {index} beyond group of {len(vm.group)}")
+    return vm.group[index]
+
+
+@opcode("global")
+def _op_global(vm, imm):
+    vm.stack.append(vm.global_field(imm[0]))
+
+
+# ----- application state -----
+
+@opcode("app_global_get")
+def _op_app_global_get(vm, imm):
+    vm.stack.append(vm.app.global_state.get(vm.pop_bytes(), 0))
+
+
+@opcode("app_global_put")
+def _op_app_global_put(vm, imm):
+    value = vm.pop()
+    key = vm.pop_bytes()
+    vm.ledger._set(vm.app.global_state, key, value)
+
+
+@opcode("app_global_del")
+def _op_app_global_del(vm, imm):
+    key = vm.pop_bytes()
+    if key in vm.app.global_state:
+        vm.ledger._set(vm.app.global_state, key, _MISSING)
+
+
+@opcode("balance")
+def _op_balance(vm, imm):
+    vm.stack.append(vm.ledger.balance(vm.pop_bytes()))
+
+
+@opcode("min_balance")
+def _op_min_balance(vm, imm):
+    vm.stack.append(vm.ledger.min_balance(vm.pop_bytes()))
+
+
+# ----- boxes -----
+
+@opcode("box_create")
+def _op_box_create(vm, imm):
+    size = vm.pop_int()
+    name = vm.pop_bytes()
+    existing = vm._box(name)
+    if size > MAX_BOX_SIZE:
+        raise TealError(f"box size {size} exceeds {MAX_BOX_SIZE}")
+    if existing is not None:
+        if len(existing) != size:
+            raise TealError("box_create with size different from existing box")
+        vm._touch_box(name, size)
+        vm.stack.append(0)
+        return
+    vm._write_box(name, bytes(size))
+    vm.result.box_bytes_written += size
+    vm.stack.append(1)
+
+
+def _existing_box(vm, name):
+    value = vm._box(name)
+    if value is None:
+        raise TealError(f"no such box {name!r}")
+    return value
+
+
+@opcode("box_extract")
+def _op_box_extract(vm, imm):
+    length = vm.pop_int()
+    start = vm.pop_int()
+    name = vm.pop_bytes()
+    value = _existing_box(vm, name)
+    vm._touch_box(name, len(value))
+    vm.stack.append(_slice(value, start, start + length))
+    vm.result.box_bytes_read += length
+
+
+@opcode("box_replace")
+def _op_box_replace(vm, imm):
+    new = vm.pop_bytes()
+    start = vm.pop_int()
+    name = vm.pop_bytes()
+    value = _existing_box(vm, name)
+    _slice(value, start, start + len(new))
+    vm._write_box(name, value[:start] + new + value[start + len(new):])
+    vm.result.box_bytes_written += len(new)
+
+
+@opcode("box_get")
+def _op_box_get(vm, imm):
+    name = vm.pop_bytes()
+    value = vm._box(name)
+    if value is None:
+        vm.stack.extend((b"", 0))
+        return
+    vm._touch_box(name, len(value))
+    vm.push(value)
+    vm.stack.append(1)
+    vm.result.box_bytes_read += len(value)
+
+
+@opcode("box_put")
+def _op_box_put(vm, imm):
+    value = vm.pop_bytes()
+    name = vm.pop_bytes()
+    existing = vm._box(name)
+    if existing is not None and len(existing) != len(value):
+        raise TealError("box_put wrong size")
+    vm._write_box(name, value)
+    vm.result.box_bytes_written += len(value)
+
+
+@opcode("box_len")
+def _op_box_len(vm, imm):
+    name = vm.pop_bytes()
+    value = vm._box(name)
+    if value is None:
+        vm.stack.extend((0, 0))
+        return
+    vm._touch_box(name, len(value))
+    vm.stack.extend((len(value), 1))
+
+
+@opcode("box_del")
+def _op_box_del(vm, imm):
+    name = vm.pop_bytes()
+    if vm._box(name) is None:
+        vm.stack.append(0)
+        return
+    vm._touch_box(name, 0)
+    vm.ledger._set(vm.app.boxes, name, _MISSING)
+    vm.stack.append(1)
+
+
+@opcode("box_resize")
+def _op_box_resize(vm, imm):
+    size = vm.pop_int()
+    name = vm.pop_bytes()
+    value = _existing_box(vm, name)
+    vm._write_box(name, value[:size] + bytes(max(0, size - len(value))))
+
+
+# ----- logs and inner transactions -----
+
+@opcode("log")
+def _op_log(vm, imm):
+    value = vm.pop_bytes()
+    logs = vm.result.logs
+    if len(logs) >= 32 or sum(map(len, logs)) + len(value) > 1024:
+        raise TealError("too many log calls or bytes")
+    logs.append(value)
+
+
+@opcode("itxn_begin")
+def _op_itxn_begin(vm, imm):
+    if vm.pending_itxn is not None:
+        raise TealError("itxn_begin without itxn_submit")
+    vm.pending_itxn = {"Sender": app_address(vm.app.app_id), "Fee": MIN_TXN_FEE}
+
+
+@opcode("itxn_field")
+def _op_itxn_field(vm, imm):
+    if vm.pending_itxn is None:
+        raise TealError("itxn_field without itxn_begin")
+    vm.pending_itxn[imm[0]] = vm.pop()
+
+
+@opcode("itxn_submit")
+def _op_itxn_submit(vm, imm):
+    inner = vm.pending_itxn
+    if inner is None:
+        raise TealError("itxn_submit without itxn_begin")
+    vm.pending_itxn = None
+    if inner.get("TypeEnum") != PAY:
+        raise TealError("only payment inner transactions are supported")
+    if len(vm.result.inner_txns) >= 256:
+        raise TealError("too many inner transactions")
+    sender = inner["Sender"]
+    if sender != app_address(vm.app.app_id):
+        raise TealError("inner transaction sender must be the application")
+    vm.ledger.charge_fee(sender, inner["Fee"])
+    vm.ledger.transfer(sender, inner.setdefault("Receiver", ZERO_ADDRESS), inner.get("Amount", 0))
+    vm.result.inner_txns.append(inner)
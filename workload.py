@@ -0,0 +1,619 @@
+"""
+Synthetic workload generator and replayer for load-testing BountyBoard
+generate() turns a seeded WorkloadConfig into a stream of method calls
+with bursts of create_task, several freelancers racing to claim the same
+task, reject/resubmit loops and refunds once deadlines pass. replay()
+sends a stream through any algod client, open-loop at a target rate or
+closed-loop at a fixed concurrency, and saturation() sweeps either knob
+to find where throughput stops scaling.
+"""
+
+import argparse
+import heapq
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Tuple
+
+from algosdk import account, error, transaction
+from algosdk.logic import get_application_address
+
+import bounty_client
+from local_algod import LocalAlgodClient, make_algod_client
+from params_cache import params_provider
+
+
+CLAIMER = "@claimer"  # actor placeholder: whoever won the task's claim race
+KEEPER = "keeper"     # third party that refunds tasks past their deadline
+
+OPEN_LOOP = "open"
+CLOSED_LOOP = "closed"
+
+DEFAULT_GRACE = 5  # seconds past a deadline before the keeper refunds (block time lags the clock)
+DEFAULT_MAX_IN_FLIGHT = 256
+ACTOR_RESERVE = 1_000_000  # microAlgos each actor keeps for its minimum balance and spare fees
+
+
+class WorkloadConfig(NamedTuple):
+    """Distributions of a synthetic workload; times are in logical seconds"""
+    seed: int = 0
+    tasks: int = 200
+    clients: int = 10
+    freelancers: int = 20
+    burst_mean: float = 5.0          # tasks per create burst (geometric)
+    burst_gap: float = 2.0           # mean time between bursts (exponential)
+    think_time: float = 1.0          # mean time between two steps of one task (exponential)
+    contention: int = 3              # up to this many freelancers race to claim each task
+    reject_rate: float = 0.3         # chance each submission is rejected
+    max_rejections: int = 2
+    abandon_rate: float = 0.1        # tasks left to expire and be refunded by the keeper
+    client_refund_rate: float = 0.05  # tasks the client refunds before anyone claims them
+    amount_mean: int = 1_000_000     # median escrow in microAlgos (log-normal)
+    amount_sigma: float = 0.5
+    title_len: Tuple[int, int] = (8, 48)
+    description_mean: int = 160      # median description length in bytes (log-normal, capped at 1024)
+    deadline: int = 86_400           # seconds from creation for tasks that complete
+    abandon_deadline: int = 10       # seconds from creation for tasks that expire
+
+
+class Op(NamedTuple):
+    """One method call of a workload
+
+    `args` leave out the task id, which only exists once the replay has
+    created the task; create_task's deadline is an offset from the time
+    the call is sent. `after` are the seqs that must finish first.
+    """
+    seq: int
+    at: float
+    task: int
+    method: str
+    actor: str
+    args: list
+    payment: int = 0
+    after: Tuple[int, ...] = ()
+    contended: bool = False       # a claim racing others for the same task; losing is expected
+    after_deadline: bool = False  # held until the task's deadline has passed
+
+
+def _task_steps(config, rng, task, clients, freelancers):
+    """(delay, method, actor, args, payment, contended, after_deadline) of one task's calls
+
+    Steps with the same delay of 0 after a previous step run side by
+    side (the claim race); every other step waits for the previous ones.
+    """
+    client = rng.choice(clients)
+    roll = rng.random()
+    abandoned = roll < config.abandon_rate
+    client_refund = not abandoned and roll < config.abandon_rate + config.client_refund_rate
+
+    title = f"Task {task} ".ljust(rng.randint(*config.title_len), "x")
+    description = "d" * min(1024, max(1, int(rng.lognormvariate(0, 0.6) * config.description_mean)))
+    amount = max(1000, int(rng.lognormvariate(0, config.amount_sigma) * config.amount_mean))
+    deadline = config.abandon_deadline if abandoned else config.deadline
+    steps = [[("create_task", client, [title, description, deadline], amount, False, False)]]
+
+    def think():
+        return rng.expovariate(1 / config.think_time) if config.think_time else 0.0
+
+    def claims():
+        racers = rng.sample(freelancers, min(len(freelancers), rng.randint(1, max(1, config.contention))))
+        contended = len(racers) > 1
+        steps.append([("claim_task", name, [], 0, contended, False) for name in racers])
+
+    if client_refund:
+        steps.append([("refund_task", client, [], 0, False, False)])
+    elif abandoned:
+        if rng.random() < 0.5:
+            claims()
+        steps.append([("refund_task", KEEPER, [], 0, False, True)])
+    else:
+        claims()
+        rejections = 0
+        while True:
+            steps.append([("submit_work", CLAIMER, [f"bafy{rng.getrandbits(160):040x}"], 0, False, False)])
+            if rejections < config.max_rejections and rng.random() < config.reject_rate:
+                steps.append([("reject_task", client, [], 0, False, False)])
+                rejections += 1
+                continue
+            steps.append([("approve_task", client, [], 0, False, False)])
+            break
+    return [(think() if index else 0.0, calls) for index, calls in enumerate(steps)]
+
+
+def generate(config=WorkloadConfig()):
+    """The call stream of a workload, ordered by logical time; same config, same stream"""
+    rng = random.Random(config.seed)
+    clients = [f"client-{i}" for i in range(config.clients)]
+    freelancers = [f"freelancer-{i}" for i in range(config.freelancers)]
+
+    pending = []  # (at, order, task, step index, call) before seqs are known
+    now = 0.0
+    task = 0
+    while task < config.tasks:
+        burst = 1
+        while burst < config.tasks - task and rng.random() > 1 / max(1.0, config.burst_mean):
+            burst += 1
+        for _ in range(burst):
+            at = now + rng.uniform(0, 0.1)
+            for index, (delay, calls) in enumerate(_task_steps(config, rng, task, clients, freelancers)):
+                at += delay
+                for call in calls:
+                    pending.append((at, len(pending), task, index, call))
+            task += 1
+        now += rng.expovariate(1 / config.burst_gap) if config.burst_gap else 0.0
+
+    pending.sort()
+    seqs = {}  # (task, step index) -> seqs of that step
+    for seq, (_, _, task, index, _) in enumerate(pending):
+        seqs.setdefault((task, index), []).append(seq)
+    ops = []
+    for seq, (at, _, task, index, call) in enumerate(pending):
+        method, actor, args, payment, contended, after_deadline = call
+        after = tuple(seqs[(task, index - 1)]) if index else ()
+        ops.append(Op(seq, round(at, 6), task, method, actor, args, payment, after,
+                      contended, after_deadline))
+    return ops
+
+
+def dump_ops(ops, path):
+    """Write a stream as JSON lines"""
+    with open(path, "w") as f:
+        for op in ops:
+            f.write(json.dumps(op._asdict()) + "\n")
+
+
+def load_ops(path):
+    """Read a stream written by dump_ops()"""
+    with open(path, "r") as f:
+        return [Op(**dict(entry, after=tuple(entry["after"]))) for entry in map(json.loads, f)]
+
+
+def funding_needed(ops, runs=1):
+    """microAlgos each actor needs to replay `ops` `runs` times: escrow, fees and a reserve"""
+    needed = {}
+    for op in ops:
+        fee = 1000 * (1 + bounty_client.INNER_TXNS.get(op.method, 0) + (1 if op.payment else 0))
+        if op.actor == CLAIMER:
+            continue  # submissions are paid by freelancers, who all get the submit budget below
+        needed[op.actor] = needed.get(op.actor, 0) + runs * (op.payment + fee)
+    submits = sum(1 for op in ops if op.actor == CLAIMER)
+    for actor in needed:
+        if actor.startswith("freelancer-"):
+            needed[actor] += runs * submits * 1000
+    return {actor: amount + ACTOR_RESERVE for actor, amount in needed.items()}
+
+
+# ----- backend -----
+
+class AlgodBackend:
+    """Sends workload calls through any algod client (local stand-in or a real node)
+
+    Calls are built from CONTRACT_ABI with bounty_client and confirmed
+    one by one; share one backend across the replay's threads. create_task
+    calls are sent in the order of locally reserved ids (see
+    bounty_client.TaskIds) and reference MAX_BOX_REFS task boxes around
+    theirs, so concurrent creates from different clients still find
+    their box if the node reorders them a little.
+    """
+
+    def __init__(self, algod_client, app_id, keys, wait_rounds=4):
+        self.algod = algod_client
+        self.app_id = app_id
+        self.keys = keys
+        self.addresses = {name: account.address_from_private_key(key) for name, key in keys.items()}
+        self.wait_rounds = wait_rounds
+        self._params = params_provider(algod_client)
+        self._task_ids = bounty_client.TaskIds()
+        self._lock = threading.Lock()
+
+    def _release_task_id(self, task_id, landed):
+        with self._lock:
+            self._task_ids.release(task_id, landed=landed)
+
+    def _create_txns(self, params, sender, task_id, args, payment):
+        # The node may still order creates sent back to back differently
+        low = max(0, task_id - bounty_client.MAX_BOX_REFS // 2)
+        call = transaction.ApplicationNoOpTxn(
+            sender=sender,
+            sp=params,
+            index=self.app_id,
+            app_args=bounty_client.encode_args("create_task", args),
+            boxes=bounty_client.task_box_refs(self.app_id, *range(low, low + bounty_client.MAX_BOX_REFS)),
+        )
+        pay = transaction.PaymentTxn(sender, params, get_application_address(self.app_id), payment)
+        return transaction.assign_group_id([pay, call])
+
+    def _send_create(self, key, sender, params, args, payment):
+        """Reserve a task id and send its create; returns (reserved id, signed txns)
+
+        Reserving and sending under one lock sends creates in id order,
+        so each lands on (or next to) the id it reserved.
+        """
+        with self._lock:
+            counter = None
+            if self._task_ids.needs_counter():
+                counter = bounty_client.read_task_counter(self.algod, self.app_id)
+            reserved = self._task_ids.reserve(counter=counter)
+            signed = [txn.sign(key) for txn in self._create_txns(params, sender, reserved, args, payment)]
+            try:
+                self.algod.send_transactions(signed)
+            except Exception as e:
+                refused = isinstance(e, error.AlgodHTTPError) and e.code is not None and e.code < 500
+                # A box reference miss means the reservations drifted: resync when idle
+                landed = False if refused and "invalid Box reference" not in str(e) else None
+                self._task_ids.release(reserved, landed=landed)
+                raise
+        return reserved, signed
+
+    def call(self, actor, method_name, args, payment=0):
+        """Send one call and return its confirmed tx info (create_task: the new task id)"""
+        key = self.keys[actor]
+        sender = self.addresses[actor]
+        params = self._params.get()
+        reserved = None
+        try:
+            if method_name == "create_task":
+                reserved, signed = self._send_create(key, sender, params, args, payment)
+            else:
+                txns = bounty_client.build_method_call(params, sender, self.app_id, method_name,
+                                                       args, args[0], payment)
+                signed = [txn.sign(key) for txn in txns]
+                self.algod.send_transactions(signed)
+        except Exception as e:
+            if "txn dead" in str(e):
+                self._params.invalidate()
+            raise
+        try:
+            info = transaction.wait_for_confirmation(self.algod, signed[-1].get_txid(), self.wait_rounds)
+        except Exception:
+            if reserved is not None:
+                self._release_task_id(reserved, None)
+            raise
+        self._params.observe_round(info.get("confirmed-round", 0))
+        if reserved is not None:
+            self._release_task_id(reserved, True)
+            return bounty_client.task_id_from_logs(info)
+        return info
+
+
+def make_actors(ops):
+    """A fresh account for every actor of a stream: {name: private key}"""
+    names = sorted({op.actor for op in ops if op.actor != CLAIMER})
+    return {name: account.generate_account()[0] for name in names}
+
+
+def fund_actors(algod_client, funder_private_key, keys, amounts, wait_rounds=4):
+    """Pay every actor its amount from one funder, 16 payments per atomic group
+
+    The local stand-in mints the amounts instead.
+    """
+    if isinstance(algod_client, LocalAlgodClient):
+        for name, amount in amounts.items():
+            algod_client.dispense(account.address_from_private_key(keys[name]), amount)
+        return
+    from deploy import wait_for_confirmations
+    funder = account.address_from_private_key(funder_private_key)
+    params = params_provider(algod_client).get()
+    payments = [(account.address_from_private_key(keys[name]), amount) for name, amount in amounts.items()]
+    txids = []
+    for start in range(0, len(payments), bounty_client.MAX_GROUP_SIZE):
+        txns = [transaction.PaymentTxn(funder, params, address, amount)
+                for address, amount in payments[start:start + bounty_client.MAX_GROUP_SIZE]]
+        if len(txns) > 1:
+            transaction.assign_group_id(txns)
+        txids.append(algod_client.send_transactions([txn.sign(funder_private_key) for txn in txns]))
+    for txid, outcome in wait_for_confirmations(algod_client, txids, wait_rounds).items():
+        if isinstance(outcome, Exception):
+            raise outcome
+
+
+# ----- replay -----
+
+class ReplayReport(NamedTuple):
+    mode: str
+    level: float                 # target rate (open) or concurrency (closed)
+    operations: int
+    ok: int
+    lost: int                    # contended claims that lost the race, as expected
+    skipped: int                 # calls whose task was never created or claimed
+    failed: int
+    seconds: float
+    throughput: float            # calls per second, lost races included; deadline refunds (paced by wall time) left out
+    latency: Dict[str, float]    # service time p50/p99, ms
+    response: Dict[str, float]   # from the intended send time (open loop: includes queueing), ms
+    methods: Dict[str, dict]
+    errors: List[str]
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"p50_ms": None, "p99_ms": None}
+    ordered = sorted(samples)
+    pick = lambda fraction: round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 2)
+    return {"p50_ms": pick(0.50), "p99_ms": pick(0.99)}
+
+
+class _Task:
+    __slots__ = ("task_id", "claimer", "deadline", "failed")
+
+    def __init__(self):
+        self.task_id = None
+        self.claimer = None
+        self.deadline = None
+        self.failed = False
+
+
+class _Replay:
+    def __init__(self, backend, ops, mode, rate, concurrency, max_in_flight, grace, wall, clock):
+        if mode not in (OPEN_LOOP, CLOSED_LOOP):
+            raise ValueError(f"mode must be '{OPEN_LOOP}' or '{CLOSED_LOOP}'")
+        if mode == OPEN_LOOP and not rate:
+            raise ValueError("open-loop replay needs a target rate")
+        self.backend = backend
+        self.ops = ops
+        self.mode = mode
+        self.rate = rate
+        self.concurrency = concurrency
+        self.max_in_flight = max_in_flight
+        self.grace = grace
+        self.wall = wall
+        self.clock = clock
+        self.tasks = {op.task: _Task() for op in ops}
+        self.waiting = [len(op.after) for op in ops]
+        self.children = [[] for _ in ops]
+        for op in ops:
+            for parent in op.after:
+                self.children[parent].append(op.seq)
+        self.ready = []  # (ready at, seq)
+        self.intended = [None] * len(ops)
+        self.outcomes = [None] * len(ops)
+        self.service = [None] * len(ops)
+        self.in_flight = 0
+        self.completed = 0
+        self.cond = threading.Condition()
+
+    def _schedule(self, start):
+        """Intended send time of every op: arrival-scaled (open loop) or as soon as ready"""
+        if self.mode == CLOSED_LOOP:
+            return
+        span = self.ops[-1].at if self.ops else 0
+        for op in self.ops:
+            if span:
+                offset = op.at / span * len(self.ops) / self.rate
+            else:
+                offset = op.seq / self.rate
+            self.intended[op.seq] = start + offset
+
+    def _push(self, seq, now):
+        op = self.ops[seq]
+        ready_at = max(now, self.intended[seq] or now)
+        if op.after_deadline:
+            task = self.tasks[op.task]
+            if task.deadline is not None:
+                ready_at = max(ready_at, now + task.deadline + self.grace - self.wall())
+        if self.intended[seq] is None or ready_at > self.intended[seq]:
+            self.intended[seq] = ready_at
+        heapq.heappush(self.ready, (ready_at, seq))
+
+    def run(self):
+        start = self.clock()
+        self._schedule(start)
+        with self.cond:
+            for op in self.ops:
+                if not op.after:
+                    self._push(op.seq, start)
+        workers = self.max_in_flight if self.mode == OPEN_LOOP else self.concurrency
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workload") as executor:
+            with self.cond:
+                while self.completed < len(self.ops):
+                    now = self.clock()
+                    limited = self.mode == CLOSED_LOOP and self.in_flight >= self.concurrency
+                    if self.ready and self.ready[0][0] <= now and not limited:
+                        _, seq = heapq.heappop(self.ready)
+                        early = self._early(self.ops[seq])
+                        if early > 0:
+                            heapq.heappush(self.ready, (now + early, seq))
+                            continue
+                        self.in_flight += 1
+                        executor.submit(self._execute, self.ops[seq])
+                        continue
+                    timeout = None
+                    if self.ready and not limited:
+                        timeout = self.ready[0][0] - now
+                    self.cond.wait(timeout)
+        return self._report(start, self.clock())
+
+    def _early(self, op):
+        """Seconds a deadline op still has to wait by the wall clock (waits can wake early)"""
+        task = self.tasks[op.task]
+        if not op.after_deadline or task.deadline is None:
+            return 0
+        return task.deadline + self.grace - self.wall()
+
+    def _execute(self, op):
+        task = self.tasks[op.task]
+        outcome = None
+        started = self.clock()
+        try:
+            actor = task.claimer if op.actor == CLAIMER else op.actor
+            if task.failed or actor is None or (op.method != "create_task" and task.task_id is None):
+                outcome = "skipped"
+            elif op.method == "create_task":
+                title, description, deadline = op.args
+                deadline = int(self.wall()) + deadline
+                task.task_id = self.backend.call(actor, op.method, [title, description, deadline], op.payment)
+                task.deadline = deadline
+                outcome = "ok"
+            else:
+                self.backend.call(actor, op.method, [task.task_id] + list(op.args), op.payment)
+                if op.method == "claim_task":
+                    task.claimer = actor
+                outcome = "ok"
+        except Exception as e:
+            if op.contended and op.method == "claim_task" and "logic eval error" in str(e):
+                outcome = "lost"
+            else:
+                outcome = e
+                if not op.contended:
+                    task.failed = True
+        finished = self.clock()
+        with self.cond:
+            self.outcomes[op.seq] = outcome
+            self.service[op.seq] = (finished - started, finished - self.intended[op.seq], finished)
+            self.in_flight -= 1
+            self.completed += 1
+            for child in self.children[op.seq]:
+                self.waiting[child] -= 1
+                if self.waiting[child] == 0:
+                    self._push(child, finished)
+            self.cond.notify_all()
+
+    def _report(self, start, end):
+        counts = {"ok": 0, "lost": 0, "skipped": 0}
+        errors = []
+        service, response = [], []
+        methods = {}
+        paced, paced_end = 0, start  # calls not held back for a deadline, and when the last one finished
+        for op, outcome, timing in zip(self.ops, self.outcomes, self.service):
+            stats = methods.setdefault(op.method, {"calls": 0, "ok": 0, "failed": 0, "_samples": []})
+            if isinstance(outcome, Exception):
+                errors.append(f"{op.method} #{op.seq}: {outcome}")
+                stats["failed"] += 1
+            else:
+                counts[outcome] += 1
+                if outcome == "ok":
+                    stats["ok"] += 1
+            if outcome == "skipped":
+                continue
+            stats["calls"] += 1
+            stats["_samples"].append(timing[0])
+            service.append(timing[0])
+            response.append(timing[1])
+            if not op.after_deadline:
+                paced += 1
+                paced_end = max(paced_end, timing[2])
+        for stats in methods.values():
+            stats.update(_percentiles(stats.pop("_samples")))
+        return ReplayReport(
+            mode=self.mode,
+            level=self.rate if self.mode == OPEN_LOOP else self.concurrency,
+            operations=len(self.ops),
+            ok=counts["ok"],
+            lost=counts["lost"],
+            skipped=counts["skipped"],
+            failed=len(errors),
+            seconds=round(end - start, 3),
+            throughput=round(paced / (paced_end - start), 1) if paced_end > start else 0.0,
+            latency=_percentiles(service),
+            response=_percentiles(response),
+            methods=methods,
+            errors=errors[:20],
+        )
+
+
+def replay(backend, ops, mode=CLOSED_LOOP, rate=None, concurrency=8,
+           max_in_flight=DEFAULT_MAX_IN_FLIGHT, grace=DEFAULT_GRACE, wall=time.time, clock=time.monotonic):
+    """Send a stream through `backend` and measure it; returns a ReplayReport
+
+    Open loop sends each call at its arrival time, scaled so the stream
+    averages `rate` calls per second, whether or not earlier calls have
+    finished (up to `max_in_flight` at once); response times then include
+    any queueing. Closed loop keeps `concurrency` calls in flight and
+    sends the next ready call as soon as one finishes. Either way a call
+    waits for the earlier steps of its task, and keeper refunds wait for
+    the task's deadline (by `wall`) plus `grace`.
+    """
+    return _Replay(backend, ops, mode, rate, concurrency, max_in_flight, grace, wall, clock).run()
+
+
+def saturation(backend, ops, mode, levels, scaling=0.9, **kwargs):
+    """Replay `ops` at each rate (open loop) or concurrency (closed loop) in `levels`
+
+    Returns (reports, saturated level or None). Open loop saturates once
+    throughput falls below `scaling` of the target rate; closed loop once
+    a level adds less than 1 - `scaling` throughput over the previous one.
+    """
+    reports = []
+    saturated = None
+    for level in levels:
+        if mode == OPEN_LOOP:
+            report = replay(backend, ops, mode, rate=level, **kwargs)
+            hit = report.throughput < scaling * level
+        else:
+            report = replay(backend, ops, mode, concurrency=level, **kwargs)
+            hit = bool(reports) and report.throughput < reports[-1].throughput * (2 - scaling)
+        reports.append(report)
+        if hit and saturated is None:
+            saturated = level
+    return reports, saturated
+
+
+def main():
+    from fleet import resolve_signer
+    DEFAULTS = WorkloadConfig()
+    parser = argparse.ArgumentParser(description="Generate a BountyBoard workload and replay it under load")
+    parser.add_argument("--network", help="network name (defaults to BOUNTYBOARD_NETWORK)")
+    parser.add_argument("--app-id", type=int, help="application to load (deployed fresh on the local stand-in)")
+    parser.add_argument("--funder", help="env:VAR or file:PATH holding the mnemonic that funds the actors")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tasks", type=int, default=DEFAULTS.tasks)
+    parser.add_argument("--contention", type=int, default=DEFAULTS.contention)
+    parser.add_argument("--reject-rate", type=float, default=DEFAULTS.reject_rate)
+    parser.add_argument("--abandon-rate", type=float, default=DEFAULTS.abandon_rate)
+    parser.add_argument("--emit", metavar="FILE", help="write the stream as JSON lines and exit")
+    parser.add_argument("--ops", metavar="FILE", help="replay a stream written with --emit")
+    parser.add_argument("--mode", choices=(OPEN_LOOP, CLOSED_LOOP), default=CLOSED_LOOP)
+    parser.add_argument("--levels", type=float, nargs="+", default=[1, 4, 16],
+                        help="target rates (open) or concurrencies (closed) to sweep")
+    parser.add_argument("--output", help="write the reports as JSON to this file")
+    options = parser.parse_args()
+
+    if options.ops:
+        ops = load_ops(options.ops)
+    else:
+        ops = generate(WorkloadConfig(seed=options.seed, tasks=options.tasks, contention=options.contention,
+                                      reject_rate=options.reject_rate, abandon_rate=options.abandon_rate))
+    if options.emit:
+        dump_ops(ops, options.emit)
+        print(f"✓ {len(ops)} calls written to {options.emit}")
+        return
+
+    client = make_algod_client(options.network)
+    local = isinstance(client, LocalAlgodClient)
+    if options.app_id is None and not local:
+        parser.error("--app-id is required outside the local stand-in")
+    if options.funder is None and not local:
+        parser.error("--funder is required outside the local stand-in")
+    funder = resolve_signer(options.funder) if options.funder else None
+    app_id = options.app_id
+    if app_id is None:
+        from bounty_contract import approval_teal, clear_teal
+        from deploy import deploy_and_fund
+        funder, address = account.generate_account()
+        client.dispense(address, 10 ** 12)
+        result = deploy_and_fund(client, funder, 1, approval_teal(), clear_teal())
+        app_id = result.app_id
+        client.dispense(get_application_address(app_id), 10 ** 11)
+
+    keys = make_actors(ops)
+    fund_actors(client, funder, keys, funding_needed(ops, runs=len(options.levels)))
+    backend = AlgodBackend(client, app_id, keys)
+    levels = [level if options.mode == OPEN_LOOP else int(level) for level in options.levels]
+    reports, saturated = saturation(backend, ops, options.mode, levels)
+
+    for report in reports:
+        print(f"{report.mode} {report.level}: {report.throughput} calls/s, ok {report.ok}, lost {report.lost}, "
+              f"skipped {report.skipped}, failed {report.failed}, p50 {report.latency['p50_ms']} ms, "
+              f"p99 {report.latency['p99_ms']} ms, response p99 {report.response['p99_ms']} ms")
+    print(f"Saturated at {saturated}" if saturated is not None else "No saturation within the levels tried")
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump({"app_id": app_id, "saturated_at": saturated,
+                       "reports": [report._asdict() for report in reports]}, f, indent=2)
+        print(f"✓ Reports written to {options.output}")
+
+
+if __name__ == "__main__":
+    main()